@@ -1,5 +1,6 @@
 # <-- التغيير هنا: استيراد المكتبات اللازمة لإدارة متغيرات البيئة
 import os
+import threading
 from dotenv import load_dotenv
 
 # <-- التغيير هنا: تحميل المتغيرات من ملف .env في بداية تشغيل التطبيق
@@ -17,6 +18,10 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from werkzeug.utils import secure_filename
 from flask_admin import Admin
 from flask_admin.contrib.sqla import ModelView
+from src.services.write_batcher import WriteBatcher
+from src.services.deadlines import DeadlineIndex
+from src.services.workers import is_deferred, start_background, dispose_after_fork
+from src.models.money import Money, MoneyType
 
 # -----------------------------------------------------------------------------
 # 1. إعداد التطبيق (App Setup)
@@ -31,6 +36,11 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'a-default-secret-key-for-dev
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'uploads')
+# تجميع مزايدات الطلبات المتزامنة في معاملة واحدة بدلاً من commit لكل مزايدة
+app.config['BID_BATCHING_ENABLED'] = os.getenv('BID_BATCHING_ENABLED', 'True').lower() in ['true', '1', 't']
+# الإغلاق المرن: مزايدة في آخر SOFT_CLOSE_WINDOW ثانية تمدد المزاد SOFT_CLOSE_EXTENSION ثانية
+app.config['SOFT_CLOSE_WINDOW'] = int(os.getenv('SOFT_CLOSE_WINDOW', 120))
+app.config['SOFT_CLOSE_EXTENSION'] = int(os.getenv('SOFT_CLOSE_EXTENSION', 120))
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
 def allowed_file(filename):
@@ -63,7 +73,7 @@ class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    starting_price = db.Column(db.Float, nullable=False)
+    starting_price = db.Column(MoneyType, nullable=False)
     image_url = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     status = db.Column(db.String(20), nullable=False, default='draft')
@@ -74,7 +84,7 @@ class Auction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=False)
-    current_price = db.Column(db.Float, nullable=False)
+    current_price = db.Column(MoneyType, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')
     item_id = db.Column(db.Integer, db.ForeignKey('item.id'), unique=True, nullable=False)
     winner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -82,7 +92,7 @@ class Auction(db.Model):
 
 class Bid(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(MoneyType, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     auction_id = db.Column(db.Integer, db.ForeignKey('auction.id'), nullable=False)
     bidder_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -102,6 +112,23 @@ admin.add_view(AdminModelView(Bid, db.session))
 # -----------------------------------------------------------------------------
 # 4. المهمة المجدولة (Scheduled Job)
 # -----------------------------------------------------------------------------
+# فهرس مواعيد انتهاء المزادات النشطة في الذاكرة: يغلق المؤقت كل مزاد عند موعده بالضبط،
+# والفحص الدوري check_auctions يبقى احتياطياً فقط
+auction_deadlines = DeadlineIndex()
+
+def utc_naive(value):
+    # التواريخ في القاعدة بتوقيت UTC بدون منطقة زمنية
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def finish_auction(auction):
+    auction.status = 'ended'
+    highest_bid = Bid.query.filter_by(auction_id=auction.id).order_by(Bid.amount.desc(), Bid.created_at.asc()).first()
+    if highest_bid:
+        auction.winner_id = highest_bid.bidder_id
+        auction.item.status = 'sold'
+    else:
+        auction.item.status = 'ended'
+
 def check_auctions():
     with app.app_context():
         now = datetime.now(timezone.utc)
@@ -111,14 +138,103 @@ def check_auctions():
             auction.item.status = 'active'
         active_auctions = Auction.query.filter_by(status='active').filter(Auction.end_time <= now).all()
         for auction in active_auctions:
-            auction.status = 'ended'
-            highest_bid = Bid.query.filter_by(auction_id=auction.id).order_by(Bid.amount.desc()).first()
-            if highest_bid:
-                auction.winner_id = highest_bid.bidder_id
-                auction.item.status = 'sold'
-            else:
-                auction.item.status = 'ended'
+            finish_auction(auction)
         db.session.commit()
+        for auction in pending_auctions:
+            auction_deadlines.schedule(auction.id, utc_naive(auction.end_time))
+
+def load_auction_deadlines():
+    with app.app_context():
+        for auction_id, end_time in db.session.query(Auction.id, Auction.end_time).filter_by(status='active'):
+            auction_deadlines.schedule(auction_id, utc_naive(end_time))
+
+def close_due_auctions_loop():
+    while True:
+        due = auction_deadlines.wait_due(timeout=30)
+        if not due:
+            continue
+        with app.app_context():
+            try:
+                now = utc_naive(datetime.now(timezone.utc))
+                auctions = Auction.query.filter(Auction.id.in_([key for key, _ in due])).filter_by(status='active').all()
+                for auction in auctions:
+                    # قد يكون المزاد مُدد بعد إضافته للفهرس؛ الموعد في القاعدة هو المرجع
+                    if utc_naive(auction.end_time) > now:
+                        auction_deadlines.schedule(auction.id, utc_naive(auction.end_time))
+                    else:
+                        finish_auction(auction)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f'Closing auctions failed: {e}')
+            finally:
+                db.session.remove()
+
+def run_scheduler():
+    # الجدولة ومؤقت الإغلاق يملكهما عملية واحدة فقط، وإلا أُغلق كل مزاد مرة لكل عامل
+    scheduler = BackgroundScheduler(daemon=True)
+    scheduler.add_job(check_auctions, 'interval', seconds=60)
+    scheduler.start()
+    load_auction_deadlines()
+    close_due_auctions_loop()
+
+# -----------------------------------------------------------------------------
+# 4.1 تجميع كتابة المزايدات (Bid Write Batching)
+# -----------------------------------------------------------------------------
+def write_bids_batch(items):
+    # يعاد التحقق من السعر داخل المعاملة وبترتيب الوصول لأن مزايدات الدفعة نفسها قد ترفعه
+    now = utc_naive(datetime.now(timezone.utc))
+    window = timedelta(seconds=app.config['SOFT_CLOSE_WINDOW'])
+    extension = timedelta(seconds=app.config['SOFT_CLOSE_EXTENSION'])
+    extended = {}
+    with app.app_context():
+        try:
+            auction_ids = {item['auction_id'] for item in items}
+            auctions = {auction.id: auction for auction in Auction.query.filter(Auction.id.in_(auction_ids)).all()}
+            results = []
+            for item in items:
+                auction = auctions.get(item['auction_id'])
+                if not auction or auction.status != 'active':
+                    results.append(('inactive', auction.status if auction else None))
+                    continue
+                if utc_naive(auction.end_time) <= now:
+                    results.append(('inactive', 'ended'))
+                    continue
+                if item['amount'] <= auction.current_price:
+                    results.append(('too_low', auction.current_price))
+                    continue
+                new_bid = Bid(amount=item['amount'], auction_id=auction.id, bidder_id=item['bidder_id'])
+                auction.current_price = item['amount']
+                # الإغلاق المرن: مزايدة في النافذة الأخيرة تمدد المزاد حتى لا ينجح القنص
+                if extension and utc_naive(auction.end_time) - now <= window:
+                    auction.end_time = utc_naive(auction.end_time) + extension
+                    extended[auction.id] = auction.end_time
+                db.session.add(new_bid)
+                results.append(('accepted', new_bid))
+            db.session.flush()
+            results = [
+                (status, {'id': value.id, 'amount': value.amount.to_json(), 'auction_id': value.auction_id,
+                          'auction_end_time': utc_naive(value.auction.end_time).isoformat()}
+                 if status == 'accepted' else value)
+                for status, value in results
+            ]
+            db.session.commit()
+            for auction_id, end_time in extended.items():
+                auction_deadlines.schedule(auction_id, end_time)
+            return results
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+bid_batcher = WriteBatcher(write_bids_batch, name='bid-writer', enabled=app.config['BID_BATCHING_ENABLED'])
+
+# تحت gunicorn (gunicorn.conf.py): مجمع اتصالات لكل عامل بعد fork، والجدولة في العامل المنتخب فقط
+with app.app_context():
+    dispose_after_fork(db.engine)
+if is_deferred():
+    start_background(run_scheduler, 'auction-scheduler', leader_only=True)
 
 # -----------------------------------------------------------------------------
 # 5. الديكورات (Decorators)
@@ -216,7 +332,7 @@ def get_all_items():
     for item in items:
         item_data = {
             'id': item.id, 'name': item.name, 'description': item.description,
-            'starting_price': item.starting_price, 'status': item.status,
+            'starting_price': item.starting_price.to_json(), 'status': item.status,
             'owner_id': item.owner_id,
             'image_url': f"/uploads/{item.image_url}" if item.image_url else None
         }
@@ -229,6 +345,10 @@ def get_all_items():
 def create_item(current_user):
     if 'name' not in request.form or 'starting_price' not in request.form:
         return jsonify({'message': 'Name and starting price are required in the form data!'}), 400
+    try:
+        starting_price = Money.parse(request.form['starting_price'])
+    except ValueError:
+        return jsonify({'message': 'Invalid starting price!'}), 400
     if 'image' not in request.files:
         return jsonify({'message': 'No image file part!'}), 400
     file = request.files['image']
@@ -245,7 +365,7 @@ def create_item(current_user):
     new_item = Item(
         name=request.form['name'],
         description=request.form.get('description'),
-        starting_price=float(request.form['starting_price']),
+        starting_price=starting_price,
         owner_id=current_user.id,
         image_url=image_filename
     )
@@ -309,7 +429,7 @@ def get_auction_details(auction_id):
     for bid in bids:
         bids_output.append({
             'id': bid.id,
-            'amount': bid.amount,
+            'amount': bid.amount.to_json(),
             'created_at': bid.created_at.isoformat(),
             'bidder_username': bid.bidder.username
         })
@@ -317,13 +437,13 @@ def get_auction_details(auction_id):
         'id': auction.id,
         'start_time': auction.start_time.isoformat(),
         'end_time': auction.end_time.isoformat(),
-        'current_price': auction.current_price,
+        'current_price': auction.current_price.to_json(),
         'status': auction.status,
         'item': {
             'id': auction.item.id,
             'name': auction.item.name,
             'description': auction.item.description,
-            'starting_price': auction.item.starting_price,
+            'starting_price': auction.item.starting_price.to_json(),
             'image_url': f"/uploads/{auction.item.image_url}" if auction.item.image_url else None
         },
         'owner_username': auction.item.owner.username,
@@ -347,22 +467,29 @@ def place_bid(current_user):
         return jsonify({'message': f'This auction is not active! Its status is {auction.status}.'}), 403
     if auction.item.owner_id == current_user.id:
         return jsonify({'message': 'You cannot bid on your own item!'}), 403
-    if float(amount) <= auction.current_price:
+    try:
+        amount = Money.parse(amount)
+    except ValueError:
+        return jsonify({'message': 'Invalid bid amount!'}), 400
+    if amount <= auction.current_price:
         return jsonify({'message': f'Your bid must be higher than the current price of {auction.current_price}!'}), 400
-    new_bid = Bid(
-        amount=float(amount), auction_id=auction.id,
-        bidder_id=current_user.id
-    )
-    auction.current_price = float(amount)
-    db.session.add(new_bid)
-    db.session.commit()
+    # تحرير اتصال الطلب قبل انتظار الكاتب حتى لا يستنزف المنتظرون مجمع الاتصالات
+    db.session.close()
+    status, result = bid_batcher.submit({
+        'amount': amount, 'auction_id': auction.id, 'bidder_id': current_user.id
+    })
+    if status == 'inactive':
+        return jsonify({'message': f'This auction is not active! Its status is {result}.'}), 403
+    if status == 'too_low':
+        return jsonify({'message': f'Your bid must be higher than the current price of {result}!'}), 400
     return jsonify({
         'message': 'Bid placed successfully!',
         'bid': {
-            'id': new_bid.id, 'amount': new_bid.amount,
-            'auction_id': new_bid.auction_id, 'bidder': current_user.username
+            'id': result['id'], 'amount': result['amount'],
+            'auction_id': result['auction_id'], 'bidder': current_user.username
         },
-        'new_current_price': auction.current_price
+        'new_current_price': result['amount'],
+        'auction_end_time': result['auction_end_time']
     }), 201
 
 # -----------------------------------------------------------------------------
@@ -374,9 +501,7 @@ if __name__ == '__main__':
             os.makedirs(app.config['UPLOAD_FOLDER'])
         db.create_all()
 
-    scheduler = BackgroundScheduler(daemon=True)
-    scheduler.add_job(check_auctions, 'interval', seconds=60)
-    scheduler.start()
+    threading.Thread(target=run_scheduler, name='auction-scheduler', daemon=True).start()
     
     print("--- Starting Flask App with Admin Panel and Scheduler ---")
     
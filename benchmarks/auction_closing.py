@@ -0,0 +1,137 @@
+"""دقة توقيت إغلاق المزادات: مؤقت فهرس المواعيد مقابل الفحص الدوري
+
+ينشئ آلاف المزادات التي تنتهي خلال ثوانٍ، مع مزايدات قنص في اللحظات الأخيرة
+تمدد بعضها (الإغلاق المرن)، ثم يقيس تأخر الإغلاق = وقت الإغلاق - موعد الانتهاء.
+
+التشغيل:
+    python benchmarks/auction_closing.py --auctions 5000 --spread 10 --snipes 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from src.models.user import db, User
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.ids import new_id
+from src.services.auction_lifecycle import init_auction_lifecycle
+from src.services.bid_writer import write_bids
+from src.services.settlement import close_expired_auctions
+
+WINDOW = 3  # ثوانٍ
+EXTENSION = 3  # ثوانٍ
+
+
+def create_app(database_path):
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 60}},
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "SOFT_CLOSE_WINDOW": WINDOW,
+        "SOFT_CLOSE_EXTENSION": EXTENSION
+    })
+    db.init_app(app)
+    return app
+
+
+def seed(count, spread, lead):
+    merchant_id = new_id()
+    db.session.execute(insert(User), [{
+        'id': merchant_id, 'username': 'merchant', 'email': 'm@example.com',
+        'full_name': 'Merchant', 'password_hash': 'x'
+    }])
+    start = datetime.utcnow() + timedelta(seconds=lead)
+    products = [{'id': new_id(), 'user_id': merchant_id, 'name': 'Lamp', 'starting_price': 1} for _ in range(count)]
+    auctions = [{
+        'id': new_id(), 'product_id': product['id'], 'user_id': merchant_id, 'starting_price': 1,
+        'status': 'active', 'end_time': start + timedelta(seconds=spread * i / count)
+    } for i, product in enumerate(products)]
+    db.session.execute(insert(Product), products)
+    db.session.execute(insert(Auction), auctions)
+    db.session.commit()
+    return auctions
+
+
+def snipe(app, auctions, snipes):
+    """مزايدات تصل في آخر ثانية قبل موعد الانتهاء الأصلي"""
+    rng = random.Random(3)
+    plan = sorted(
+        (auction['end_time'] - timedelta(seconds=rng.uniform(0.05, 1.0)), auction['id'])
+        for auction in rng.sample(auctions, snipes)
+    )
+    accepted = rejected = 0
+    with app.app_context():
+        for fire_at, auction_id in plan:
+            delay = (fire_at - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                time.sleep(delay)
+            status, _ = write_bids([{
+                'auction_id': auction_id, 'bidder_name': 'Sniper', 'bidder_phone': '0599', 'bid_amount': 2
+            }])[0]
+            accepted += status == 'accepted'
+            rejected += status != 'accepted'
+            db.session.remove()
+    return accepted, rejected
+
+
+def sweep_loop(app, interval, stop):
+    with app.app_context():
+        while not stop.wait(interval):
+            close_expired_auctions()
+            db.session.remove()
+
+
+def run_scenario(mode, count, spread, snipes, sweep_interval):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            auctions = seed(count, spread, lead=2)
+
+        stop = threading.Event()
+        if mode == 'deadline index':
+            init_auction_lifecycle(app)
+        else:
+            threading.Thread(target=sweep_loop, args=(app, sweep_interval, stop), daemon=True).start()
+
+        accepted, rejected = snipe(app, auctions, snipes)
+        with app.app_context():
+            while Auction.query.filter_by(status='active').count():
+                time.sleep(0.2)
+            rows = db.session.execute(db.select(Auction.id, Auction.end_time, Auction.updated_at)).all()
+            db.session.remove()
+            db.engine.dispose()
+        stop.set()
+
+    seeded = {auction['id']: auction['end_time'] for auction in auctions}
+    extended = sum(1 for auction_id, end_time, _ in rows if end_time != seeded[auction_id])
+    lateness = sorted((updated_at - end_time).total_seconds() * 1000 for _, end_time, updated_at in rows)
+    pick = lambda q: lateness[min(len(lateness) - 1, int(q * len(lateness)))]
+    return accepted, rejected, extended, pick(0.5), pick(0.99), lateness[-1]
+
+
+def run(count, spread, snipes, sweep_interval):
+    print(f"{'mode':>16} {'snipes ok':>10} {'rejected':>9} {'extended':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in (f'sweep {sweep_interval:g}s', 'deadline index'):
+        accepted, rejected, extended, p50, p99, worst = run_scenario(mode, count, spread, snipes, sweep_interval)
+        print(f'{mode:>16} {accepted:>10} {rejected:>9} {extended:>9} {p50:>8.1f} {p99:>8.1f} {worst:>8.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--auctions', type=int, default=5000)
+    parser.add_argument('--spread', type=float, default=10, help='ثوانٍ تتوزع عليها مواعيد الانتهاء')
+    parser.add_argument('--snipes', type=int, default=1000)
+    parser.add_argument('--sweep-interval', type=float, default=5)
+    args = parser.parse_args()
+    run(args.auctions, args.spread, args.snipes, args.sweep_interval)
@@ -0,0 +1,105 @@
+"""منحنى سعر مزاد (OHLC لكل دقيقة): قراءة جدول bids مقابل مخزن السلاسل الزمنية
+
+الطريقة الحالية تقرأ كل صفوف المزاد من جدول المزايدات وتجمعها في بايثون، والمخزن
+يحتفظ بمصفوفتي أوقات ومبالغ لكل مزاد ويجمعها بعمليات NumPy متجهة.
+
+التشغيل:
+    python benchmarks/bid_analytics.py --bids 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from src.models.user import db
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.ids import new_id
+from src.models.money import Money
+from src.services.bid_analytics import BidSeriesStore, ohlc, to_millis
+
+BUCKET_MS = 60_000
+
+
+def create_app(database_path):
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False
+    })
+    db.init_app(app)
+    return app
+
+
+def generate(count, seed=5):
+    rng = random.Random(seed)
+    moment, amount = datetime(2026, 1, 1), 1000
+    for _ in range(count):
+        moment += timedelta(milliseconds=rng.randrange(1, 2000))
+        amount += rng.randrange(0, 50)
+        yield moment, amount
+
+
+def python_ohlc(rows):
+    buckets = {}
+    for bid_time, amount in rows:
+        key = to_millis(bid_time) // BUCKET_MS
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [amount, amount, amount, amount, 1]
+        else:
+            bucket[1] = max(bucket[1], amount)
+            bucket[2] = min(bucket[2], amount)
+            bucket[3] = amount
+            bucket[4] += 1
+    return buckets
+
+
+def run(sizes):
+    print(f"{'bids':>9} {'table scan ms':>14} {'store ms':>9} {'buckets':>8} {'store MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            for size in sizes:
+                auction_id = new_id()
+                points = list(generate(size))
+                for start in range(0, size, 50000):
+                    db.session.execute(insert(Bid), [{
+                        'id': new_id(), 'auction_id': auction_id, 'bidder_name': 'b', 'bidder_phone': '0500',
+                        'bid_amount': Money(amount), 'bid_time': moment
+                    } for moment, amount in points[start:start + 50000]])
+                db.session.commit()
+                store = BidSeriesStore()
+                store.record((auction_id, moment, amount) for moment, amount in points)
+
+                started = time.perf_counter()
+                rows = db.session.execute(
+                    db.select(Bid.bid_time, Bid.bid_amount).where(Bid.auction_id == auction_id).order_by(Bid.bid_time)
+                ).all()
+                expected = python_ohlc(rows)
+                scan_ms = (time.perf_counter() - started) * 1000
+
+                started = time.perf_counter()
+                times, amounts = store.series(auction_id)
+                result = ohlc(times, amounts, BUCKET_MS)
+                store_ms = (time.perf_counter() - started) * 1000
+
+                assert len(result[0]) == len(expected)
+                megabytes = (times.nbytes + amounts.nbytes) / 1e6
+                print(f'{size:>9} {scan_ms:>14.1f} {store_ms:>9.2f} {len(expected):>8} {megabytes:>9.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bids', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    run(args.bids)
@@ -0,0 +1,104 @@
+"""قياس عدد المزايدات المقبولة في الثانية مع وبدون تجميع الكتابة (group commit)
+
+التشغيل:
+    python benchmarks/bid_throughput.py --clients 1 8 64 --bids 200
+
+نافذة التجميع قابلة للتغيير عبر متغير البيئة BID_BATCH_MAX_WAIT (بالثواني).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.models.user import db, User
+from src.models.product import Product
+from src.models.auction import Auction
+from src.routes.auction import auction_bp
+from src.services.bid_writer import init_bid_writer
+
+
+def create_app(database_path, batching):
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 60}},
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "BID_BATCHING_ENABLED": batching,
+        "BID_BATCH_MAX_WAIT": float(os.environ.get("BID_BATCH_MAX_WAIT", 0.003))
+    })
+    db.init_app(app)
+    app.register_blueprint(auction_bp, url_prefix='/api')
+    init_bid_writer(app)
+    return app
+
+
+def seed_auctions(count):
+    merchant = User(username='merchant', email='m@example.com', full_name='Merchant', password_hash='x')
+    db.session.add(merchant)
+    db.session.flush()
+    auctions = []
+    for _ in range(count):
+        product = Product(user_id=merchant.id, name='Lamp', starting_price=1)
+        db.session.add(product)
+        db.session.flush()
+        auction = Auction(product_id=product.id, user_id=merchant.id, starting_price=1, status='active')
+        db.session.add(auction)
+        auctions.append(auction)
+    db.session.commit()
+    return [auction.id for auction in auctions]
+
+
+def run_scenario(clients, bids_per_client, batching):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'), batching)
+        with app.app_context():
+            db.create_all()
+            auction_ids = seed_auctions(clients)
+
+        # كل عميل يزايد بمبالغ متزايدة على مزاده حتى تُقاس الكتابة وليس رفض المزايدات المتسابقة
+        accepted = []
+
+        def client_loop(auction_id):
+            client = app.test_client()
+            count = 0
+            for amount in range(2, bids_per_client + 2):
+                response = client.post(f'/api/auctions/{auction_id}/bid', json={
+                    'bidder_name': 'Bidder', 'bidder_phone': '0500', 'bid_amount': amount
+                })
+                count += response.status_code == 201
+            accepted.append(count)
+
+        threads = [threading.Thread(target=client_loop, args=(auction_id,)) for auction_id in auction_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        return sum(accepted), elapsed
+
+
+def run(client_counts, bids_per_client):
+    print(f"{'clients':>8} {'mode':>10} {'accepted':>9} {'seconds':>8} {'bids/s':>9}")
+    for clients in client_counts:
+        for batching in (False, True):
+            accepted, elapsed = run_scenario(clients, bids_per_client, batching)
+            mode = 'batched' if batching else 'per-commit'
+            print(f'{clients:>8} {mode:>10} {accepted:>9} {elapsed:>8.2f} {accepted / elapsed:>9.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--bids', type=int, default=200, help='عدد المزايدات لكل عميل')
+    args = parser.parse_args()
+    run(args.clients, args.bids)
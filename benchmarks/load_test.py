@@ -0,0 +1,329 @@
+"""اختبار حمل قابل للتكرار لواجهة المزايدات: سيناريوهات ثابتة البذرة، نتائج JSON، ومقارنة بخط أساس
+
+السيناريوهات تعمل على تطبيق داخل العملية (test client بعدة خيوط) بقاعدة SQLite مؤقتة
+أو PostgreSQL محلية (تُحذف جداولها وتُنشأ من جديد، فاستخدم قاعدة مخصصة للقياس):
+
+    bidding_war        عملاء كثيرون يزايدون على مزاد واحد
+    auctions_closing   إغلاق وتسوية آلاف المزادات المنتهية دفعة بعد دفعة
+    dashboard_polling  عاصفة استعلامات لوحات التجار
+    qr_bulk            توليد رموز QR لمزادات كثيرة بالتوازي (يحتاج Pillow، وليس في خط الأساس)
+
+لكل سيناريو: عدد العمليات، والناجحة، والمرفوضة (4xx متوقعة مثل مزايدة منخفضة)،
+والأخطاء، والإنتاجية في الثانية، و p50/p90/p99/max بالملي ثانية.
+
+التشغيل:
+    python benchmarks/load_test.py --output results.json
+    python benchmarks/load_test.py --scenario bidding_war --database-url postgresql://localhost/bench
+    python benchmarks/load_test.py --baseline benchmarks/load_baseline.json   # رمز خروج 1 عند التراجع
+    python benchmarks/load_test.py --baseline benchmarks/load_baseline.json --update-baseline
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from src.models.user import db, User
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.order import Order
+from src.models.outbox import OutboxMessage
+from src.models.merchant_rollup import MerchantRollup, MerchantDailyRevenue
+from src.models.ids import new_id
+from src.models.money import Money
+from src.routes.auction import auction_bp
+from src.routes.bid import bid_bp
+from src.routes.user import user_bp
+from src.routes.qr import qr_bp
+from src.services.bid_writer import init_bid_writer
+from src.services.bid_increments import init_bid_increments
+from src.services.rate_limit import init_rate_limiting
+from src.services.merchant_rollups import reconcile_merchant_rollups
+from src.services.settlement import close_expired_auctions, settle_auctions
+
+DEFAULT_TOLERANCE = 0.25  # تراجع مسموح قبل اعتبار النتيجة فشلاً (نسبة)
+SEED = 7
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        # القياس لكل الخادم وليس لحدود المعدل
+        "RATE_LIMIT_ENABLED": False
+    })
+    if database_url.startswith('sqlite'):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 60}}
+    db.init_app(app)
+    for blueprint, prefix in ((auction_bp, '/api'), (bid_bp, '/api'), (user_bp, '/api'), (qr_bp, '/api/qr')):
+        app.register_blueprint(blueprint, url_prefix=prefix)
+    init_rate_limiting(app)
+    init_bid_increments(app)
+    init_bid_writer(app)
+    return app
+
+
+class Recorder:
+    """زمن كل عملية ونتيجتها من عدة خيوط"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.outcomes = {'ok': 0, 'rejected': 0, 'errors': 0}
+        self.elapsed = 0
+
+    def record(self, seconds, status=200):
+        outcome = 'ok' if status < 400 else 'rejected' if status < 500 else 'errors'
+        with self._lock:
+            self.latencies.append(seconds)
+            self.outcomes[outcome] += 1
+
+    def timed(self, call):
+        started = time.perf_counter()
+        status = call()
+        self.record(time.perf_counter() - started, status)
+
+    def summary(self, **extra):
+        latencies = sorted(self.latencies)
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3) if latencies else None
+        return {
+            'operations': len(latencies),
+            **self.outcomes,
+            'seconds': round(self.elapsed, 3),
+            'throughput': round(len(latencies) / self.elapsed, 1) if self.elapsed else None,
+            'p50_ms': pick(0.5),
+            'p90_ms': pick(0.9),
+            'p99_ms': pick(0.99),
+            'max_ms': round(latencies[-1] * 1000, 3) if latencies else None,
+            **extra
+        }
+
+
+def run_clients(recorder, clients, work):
+    """تشغيل work(client_index) في clients خيطاً وقياس الزمن الكلي"""
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.elapsed = time.perf_counter() - started
+
+
+def seed_merchants(rng, merchants, auctions_per_merchant, status='active', end_time=None, bids=0, price=None):
+    """إدراج تجار ومنتجات ومزادات (ومزايدات اختيارية) بإدراج جماعي"""
+    users, products, auctions, bid_rows = [], [], [], []
+    for index in range(merchants):
+        user_id = new_id()
+        users.append({'id': user_id, 'username': f'merchant{index}', 'email': f'm{index}@example.com',
+                      'full_name': 'Merchant', 'password_hash': 'x'})
+        for _ in range(auctions_per_merchant):
+            product_id, auction_id = new_id(), new_id()
+            amount = price or rng.randrange(100, 10000)
+            products.append({'id': product_id, 'user_id': user_id, 'name': 'Lamp', 'starting_price': Money(amount)})
+            auctions.append({'id': auction_id, 'product_id': product_id, 'user_id': user_id, 'status': status,
+                             'starting_price': Money(amount), 'end_time': end_time,
+                             'current_highest_bid': Money(amount + 100 * bids) if bids else None, 'total_bids': bids})
+            bid_rows.extend({'id': new_id(), 'auction_id': auction_id, 'bidder_name': f'bidder{i}',
+                             'bidder_phone': f'05{rng.randrange(10 ** 8):08d}', 'bid_amount': Money(amount + 100 * (i + 1)),
+                             'bid_time': datetime.utcnow()} for i in range(bids))
+    for model, rows in ((User, users), (Product, products), (Auction, auctions), (Bid, bid_rows)):
+        for start in range(0, len(rows), 5000):
+            db.session.execute(insert(model), rows[start:start + 5000])
+    db.session.commit()
+    return [user['id'] for user in users], [auction['id'] for auction in auctions]
+
+
+def bidding_war(app, scale):
+    """كل العملاء على مزاد واحد؛ المبالغ من عداد مشترك فيتسابقون كما في مزاد حقيقي
+
+    المزايدة التي تصل بعد مزايدة أعلى منها تُرفض (400)، وهذا جزء من السيناريو.
+    """
+    clients, bids_per_client = 32, max(int(50 * scale), 1)
+    with app.app_context():
+        _, (auction_id,) = seed_merchants(random.Random(SEED), 1, 1, price=1)
+    amounts = itertools.count(100, 100)  # أكبر من أي زيادة في السلم الافتراضي
+    amounts_lock = threading.Lock()
+    recorder = Recorder()
+
+    def work(index):
+        client = app.test_client()
+        for _ in range(bids_per_client):
+            with amounts_lock:
+                amount = next(amounts)
+            recorder.timed(lambda: client.post(f'/api/auctions/{auction_id}/bid', json={
+                'bidder_name': f'bidder{index}', 'bidder_phone': f'05{index:08d}', 'bid_amount': amount
+            }).status_code)
+
+    run_clients(recorder, clients, work)
+    with app.app_context():
+        notifications = db.session.query(OutboxMessage).count()
+    return recorder.summary(clients=clients, notifications_enqueued=notifications)
+
+
+def auctions_closing(app, scale):
+    """آلاف المزادات المنتهية بمزايدات: إغلاقها ثم تسويتها (طلب وإشعار لكل مزاد) على دفعات"""
+    count, batch = max(int(10000 * scale), 1), 500
+    with app.app_context():
+        seed_merchants(random.Random(SEED), 100, max(count // 100, 1),
+                       end_time=datetime.utcnow() - timedelta(seconds=1), bids=3)
+    recorder = Recorder()
+    started = time.perf_counter()
+    with app.app_context():
+        expired = []
+        recorder.timed(lambda: expired.extend(close_expired_auctions()) or 200)
+        for start in range(0, len(expired), batch):
+            recorder.timed(lambda: settle_auctions(expired[start:start + batch]) and 200 or 200)
+        orders = db.session.query(Order).count()
+    recorder.elapsed = time.perf_counter() - started
+    # الإنتاجية هنا مزادات في الثانية (العمليات دفعات)
+    return recorder.summary(auctions=len(expired), orders=orders,
+                            throughput=round(len(expired) / recorder.elapsed, 1))
+
+
+def dashboard_polling(app, scale):
+    """عملاء كثيرون يطلبون لوحات تجار عشوائيين باستمرار"""
+    clients, requests_per_client = 32, max(int(100 * scale), 1)
+    with app.app_context():
+        merchant_ids, _ = seed_merchants(random.Random(SEED), 200, 10)
+        reconcile_merchant_rollups()
+    recorder = Recorder()
+
+    def work(index):
+        rng = random.Random(SEED + index)
+        client = app.test_client()
+        for _ in range(requests_per_client):
+            merchant_id = rng.choice(merchant_ids)
+            recorder.timed(lambda: client.get(f'/api/users/{merchant_id}/dashboard').status_code)
+
+    run_clients(recorder, clients, work)
+    return recorder.summary(clients=clients)
+
+
+def qr_bulk(app, scale):
+    """توليد رموز QR لمزادات كثيرة من 8 عملاء"""
+    clients, count = 8, max(int(400 * scale), 1)
+    with app.app_context():
+        _, auction_ids = seed_merchants(random.Random(SEED), 10, max(count // 10, 1))
+    recorder = Recorder()
+
+    def work(index):
+        client = app.test_client()
+        for auction_id in auction_ids[index::clients]:
+            recorder.timed(lambda: client.get(f'/api/qr/auctions/{auction_id}/qr').status_code)
+
+    run_clients(recorder, clients, work)
+    return recorder.summary(clients=clients)
+
+
+SCENARIOS = {
+    'bidding_war': bidding_war,
+    'auctions_closing': auctions_closing,
+    'dashboard_polling': dashboard_polling,
+    'qr_bulk': qr_bulk,
+}
+
+
+def run_scenario(name, database_url, scale):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        try:
+            return SCENARIOS[name](app, scale)
+        finally:
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+
+
+def compare(results, baseline, tolerance):
+    """التراجعات مقارنة بخط الأساس: إنتاجية أقل أو p99 أعلى أو عمليات ناجحة أقل أو أخطاء أكثر
+
+    عدد الناجحة يتغير قليلاً بين التشغيلات (ترتيب الخيوط في bidding_war يحدد أي المزايدات
+    تُرفض)، لذلك يُقارن بنفس السماحية. أما سيناريو ناجحاته صفر فتراجع دائماً.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get('scenarios', {}).get(name)
+        if not expected:
+            continue
+        if expected['throughput'] and result['throughput'] < expected['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']}/s < baseline {expected['throughput']}/s")
+        if expected['p99_ms'] and result['p99_ms'] > expected['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {result['p99_ms']} ms > baseline {expected['p99_ms']} ms")
+        if expected['ok'] and (result['ok'] == 0 or result['ok'] < expected['ok'] * (1 - tolerance)):
+            regressions.append(f"{name}: {result['ok']} ok < baseline {expected['ok']}")
+        if result['errors'] > expected['errors']:
+            regressions.append(f"{name}: {result['errors']} errors > baseline {expected['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--database-url', default=None, help='قاعدة مخصصة للقياس (افتراضياً SQLite مؤقتة)')
+    parser.add_argument('--scale', type=float, default=1.0, help='مضاعف أحجام السيناريوهات')
+    parser.add_argument('--output', default=None, help='ملف JSON للنتائج')
+    parser.add_argument('--baseline', default=None, help='ملف خط الأساس للمقارنة')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true', help='حفظ النتائج كخط أساس جديد')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':>18} {'ops':>7} {'ok':>7} {'rejected':>8} {'errors':>6} {'ops/s':>8} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in args.scenario:
+        result = results[name] = run_scenario(name, args.database_url, args.scale)
+        print(f"{name:>18} {result['operations']:>7} {result['ok']:>7} {result['rejected']:>8} {result['errors']:>6} "
+              f"{result['throughput']:>8} {result['p50_ms']:>8} {result['p90_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8}")
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'database': (args.database_url or 'sqlite').split(':', 1)[0],
+        'scale': args.scale,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'scenarios': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        # سيناريو فشلت طلباته (اعتمادية ناقصة مثلاً) يجعل خط الأساس يقبل الفشل دائماً
+        broken = [name for name, result in results.items() if result['errors']]
+        for name in broken:
+            print(f"Not recording {name} in the baseline: {results[name]['errors']} errors")
+        report['scenarios'] = {name: result for name, result in results.items() if name not in broken}
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline written to {args.baseline}')
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale or baseline.get('database') != report['database']:
+            print('Warning: baseline was recorded with a different scale or database')
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print('No regressions against baseline')
+
+
+if __name__ == '__main__':
+    main()
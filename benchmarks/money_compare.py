@@ -0,0 +1,47 @@
+"""تكلفة التحقق من مبلغ المزايدة: المسار القديم (float و Decimal) مقابل Money
+
+المسار القديم: تحويل المدخل إلى float ومقارنته بقيمة Decimal مقروءة من القاعدة،
+ثم Decimal(str(...)) في سجل المزايدات. المسار الجديد: Money.parse ومقارنة أعداد صحيحة.
+
+التشغيل:
+    python benchmarks/money_compare.py --iterations 1000000
+"""
+import argparse
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.money import Money
+
+
+def run(iterations):
+    payloads = ['125.50', 125.5, 126]
+    stored_decimal = Decimal('125.00')
+    stored_money = Money(12500)
+
+    def legacy():
+        for raw in payloads:
+            amount = float(raw)
+            if amount > stored_decimal:
+                Decimal(str(amount)) > Decimal(str(stored_decimal))
+
+    def money():
+        for raw in payloads:
+            amount = Money.parse(raw)
+            if amount > stored_money:
+                amount > stored_money
+
+    print(f"{'path':>8} {'ns/bid':>8}")
+    for name, func in (('legacy', legacy), ('money', money)):
+        seconds = min(timeit.repeat(func, number=iterations // len(payloads), repeat=3))
+        print(f'{name:>8} {seconds / iterations * 1e9:>8.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=300000)
+    args = parser.parse_args()
+    run(args.iterations)
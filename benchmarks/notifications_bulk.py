@@ -0,0 +1,104 @@
+"""مقارنة أداء واجهات الإشعارات الجماعية مع الواجهات الفردية
+
+التشغيل:
+    python benchmarks/notifications_bulk.py --recipients 10000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from src.models.user import db, User
+from src.models.notification import Notification
+from src.routes.notification import notification_bp
+
+
+def create_app():
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False
+    })
+    db.init_app(app)
+    app.register_blueprint(notification_bp, url_prefix='/api')
+    return app
+
+
+def seed_users(count):
+    user_ids = [str(uuid.uuid4()) for _ in range(count)]
+    db.session.execute(insert(User), [{
+        'id': user_id,
+        'username': f'user{i}',
+        'email': f'user{i}@example.com',
+        'password_hash': 'x',
+        'full_name': f'User {i}'
+    } for i, user_id in enumerate(user_ids)])
+    db.session.commit()
+    return user_ids
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed * 1000:10.1f} ms')
+    return elapsed
+
+
+def run(recipients):
+    app = create_app()
+    client = app.test_client()
+    payload = {'type': 'auction_started', 'title': 'بدأ المزاد', 'message': 'بدأ مزاد جديد'}
+
+    with app.app_context():
+        db.create_all()
+        user_ids = seed_users(recipients)
+
+        def create_single():
+            for user_id in user_ids:
+                client.post('/api/notifications', json={**payload, 'user_id': user_id})
+
+        def create_bulk():
+            client.post('/api/notifications/bulk', json={**payload, 'user_ids': user_ids})
+
+        single_create = timed('create (per item)', create_single)
+        bulk_create = timed('create (bulk)', create_bulk)
+
+        ids = db.session.execute(db.select(Notification.id)).scalars().all()
+        single_ids, bulk_ids = ids[:recipients], ids[recipients:]
+
+        def read_single():
+            for notification_id in single_ids:
+                client.put(f'/api/notifications/{notification_id}/read')
+
+        def read_bulk():
+            client.put('/api/notifications/read', json={'ids': bulk_ids})
+
+        single_read = timed('mark read (per item)', read_single)
+        bulk_read = timed('mark read (bulk)', read_bulk)
+
+        def delete_single():
+            for notification_id in single_ids:
+                client.delete(f'/api/notifications/{notification_id}')
+
+        def delete_bulk():
+            client.delete('/api/notifications', json={'ids': bulk_ids})
+
+        single_delete = timed('delete (per item)', delete_single)
+        bulk_delete = timed('delete (bulk)', delete_bulk)
+
+        print()
+        print(f'speedup create: {single_create / bulk_create:.1f}x, '
+              f'mark read: {single_read / bulk_read:.1f}x, '
+              f'delete: {single_delete / bulk_delete:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--recipients', type=int, default=10000)
+    run(parser.parse_args().recipients)
@@ -0,0 +1,74 @@
+"""مقارنة صيغ المفاتيح الأساسية: سرعة الإدراج وحجم الجدول والفهارس
+
+الصيغ: uuid4 كنص (الوضع القديم)، uuid7 كنص، uuid7 كـ 16 بايت (CompactId)، وعدد صحيح.
+كل صف يشبه صف مزايدة: مفتاح أساسي، مفتاح أجنبي مفهرس للمزاد، ومبلغ.
+
+التشغيل:
+    python benchmarks/primary_keys.py --rows 10000000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.ids import uuid7
+
+BATCH = 10000
+AUCTIONS = 1000
+
+SCHEMES = {
+    'uuid4 text': ('VARCHAR(36)', lambda: str(uuid.uuid4())),
+    'uuid7 text': ('VARCHAR(36)', lambda: str(uuid7())),
+    'uuid7 binary': ('BLOB', lambda: uuid7().bytes),
+    'integer': ('INTEGER', None),
+}
+
+
+def run_scheme(path, column_type, make_id, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(f'CREATE TABLE bids (id {column_type} PRIMARY KEY, auction_id {column_type}, amount NUMERIC)')
+    conn.execute('CREATE INDEX ix_bids_auction_id ON bids (auction_id)')
+    make_key = make_id or (lambda: None)
+    auction_ids = [make_key() for _ in range(AUCTIONS)] if make_id else list(range(1, AUCTIONS + 1))
+
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH):
+        count = min(BATCH, rows - offset)
+        conn.executemany(
+            'INSERT INTO bids (id, auction_id, amount) VALUES (?, ?, ?)',
+            [(make_key(), auction_ids[(offset + i) % AUCTIONS], offset + i) for i in range(count)]
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - start
+
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    try:
+        sizes = dict(conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+        index_size = sum(size for name, size in sizes.items() if name.startswith(('sqlite_autoindex', 'ix_')))
+    except sqlite3.OperationalError:
+        index_size = None  # SQLite بدون dbstat
+    conn.close()
+    return elapsed, page_size * page_count, index_size
+
+
+def run(rows):
+    mb = 1024 * 1024
+    print(f"{'scheme':>14} {'rows/s':>9} {'file MB':>8} {'index MB':>9}")
+    for name, (column_type, make_id) in SCHEMES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, file_size, index_size = run_scheme(os.path.join(directory, 'keys.db'), column_type, make_id, rows)
+        index = f'{index_size / mb:>9.1f}' if index_size is not None else f"{'n/a':>9}"
+        print(f'{name:>14} {rows / elapsed:>9.0f} {file_size / mb:>8.1f} {index}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,83 @@
+"""مقارنة المزايدة اليدوية المتكررة بالمزايدة الآلية لنفس المزايدين
+
+كل مزايد لديه حد أقصى عشوائي. في الوضع اليدوي يعيد كل من تم تجاوزه المزايدة
+بأقل زيادة حتى يصل حده، وفي الوضع الآلي يسجل كل مزايد حده مرة واحدة.
+يُقاس عدد الطلبات والمزايدات المحفوظة وزمن حل كل مزايدة في المحرك.
+
+التشغيل:
+    python benchmarks/proxy_bidding.py --bidders 10 100 1000 --proxies 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.money import Money
+from src.services.proxy_bidding import Proxy, ProxyBook
+
+INCREMENT = Money(100)
+STARTING_PRICE = Money(1000)
+
+
+def increment(amount):
+    return INCREMENT
+
+
+def valuations(count, seed=7):
+    rng = random.Random(seed)
+    return [Money(rng.randrange(2000, 200000, 100)) for _ in range(count)]
+
+
+def manual_war(maxima):
+    """كل مزايد تم تجاوزه يعيد المزايدة بالسعر + الزيادة طالما يسمح حده"""
+    price, leader, requests = STARTING_PRICE, None, 0
+    active = True
+    while active:
+        active = False
+        for bidder, maximum in enumerate(maxima):
+            if bidder != leader and price + INCREMENT <= maximum:
+                price, leader = price + INCREMENT, bidder
+                requests += 1
+                active = True
+    return requests, requests
+
+
+def proxy_war(maxima):
+    book = ProxyBook(STARTING_PRICE)
+    writes = 0
+    for bidder, maximum in enumerate(maxima):
+        book.add(Proxy(bidder, str(bidder), str(bidder), maximum))
+        visible, _ = book.resolve(increment)
+        writes += len(visible)
+    return len(maxima), writes
+
+
+def resolve_rate(count):
+    book = ProxyBook(STARTING_PRICE)
+    maxima = valuations(count, seed=11)
+    start = time.perf_counter()
+    for bidder, maximum in enumerate(maxima):
+        book.add(Proxy(bidder, str(bidder), str(bidder), maximum))
+        book.resolve(increment)
+    return count / (time.perf_counter() - start)
+
+
+def run(bidder_counts, proxies):
+    print(f"{'bidders':>8} {'manual req':>11} {'manual bids':>12} {'proxy req':>10} {'visible bids':>13}")
+    for count in bidder_counts:
+        maxima = valuations(count)
+        manual_requests, manual_writes = manual_war(maxima)
+        proxy_requests, proxy_writes = proxy_war(maxima)
+        print(f'{count:>8} {manual_requests:>11} {manual_writes:>12} {proxy_requests:>10} {proxy_writes:>13}')
+    print(f'\nresolve rate with {proxies} proxies in one auction: {resolve_rate(proxies):.0f} bids/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bidders', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--proxies', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.bidders, args.proxies)
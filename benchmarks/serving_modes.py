@@ -0,0 +1,215 @@
+"""مقارنة وضعي التشغيل تحت آلاف اتصالات long-polling: خيوط (gunicorn gthread) و gevent
+
+لكل وضع يُشغَّل الخادم الحقيقي (src.main:app أو src.wsgi:app) عبر gunicorn.conf.py
+بعامل واحد وقاعدة SQLite مؤقتة (أو --database-url)، ثم:
+
+    - تُفتح --connections جلسة Socket.IO بنقل long-polling وتبقى معلقة كما يفعل
+      متصفح ينتظر تحديثات المزاد (يُرد على ping الخادم فتبقى الجلسات حية)
+    - بعد --ramp ثانية يرسل --clients عميلاً مزايدات وقراءات لأعلى مزايدة على
+      مزادات قليلة لمدة --duration ثانية
+
+ويُقاس: الجلسات المفتوحة، وعمليات المزايدة والقراءة (p50/p90/p99)، والأخطاء؛
+الطلب الذي يتجاوز --timeout ثانية أو يفشل اتصاله يُحسب خطأ. في وضع الخيوط كل
+جلسة معلقة تحجز خيطاً من THREADS، فتصطف المزايدات خلفها؛ في gevent كل اتصال
+greenlet والقاعدة مجمع محدود.
+
+العميل asyncio بمقابس خام، فيحتمل آلاف الاتصالات بخيط واحد.
+
+التشغيل:
+    python benchmarks/serving_modes.py --connections 2000 --output serving.json
+    python benchmarks/serving_modes.py --mode gevent --database-url postgresql://localhost/bench
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import Recorder, create_app, seed_merchants  # noqa: E402
+from src.models.user import db  # noqa: E402
+
+MODES = {
+    'threaded': ('gthread', 'src.main:app'),
+    'gevent': ('gevent', 'src.wsgi:app'),
+}
+POLLING = '/socket.io/?EIO=4&transport=polling'
+FAILED = 599  # حالة تُسجل للمهلة أو فشل الاتصال (تُحسب خطأ)
+SEED = 7
+
+
+async def http(port, method, path, body=b'', content_type='text/plain;charset=UTF-8'):
+    """طلب HTTP/1.0 واحد على اتصال جديد (بلا chunked): (الحالة، الجسم)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'{method} {path} HTTP/1.0\r\nHost: 127.0.0.1\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+        await writer.drain()
+        data = await reader.read()
+    finally:
+        writer.close()
+    head, _, payload = data.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), payload
+
+
+class Sessions:
+    """جلسات long-polling المعلقة"""
+
+    def __init__(self):
+        self.held = 0
+        self.failed = 0
+
+    async def hold(self, port, timeout, stop):
+        try:
+            _, body = await asyncio.wait_for(http(port, 'GET', POLLING), timeout)
+            path = f"{POLLING}&sid={json.loads(body[1:])['sid']}"
+            await asyncio.wait_for(http(port, 'POST', path, b'40'), timeout)
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+            self.failed += 1
+            return
+        self.held += 1
+        try:
+            while not stop.is_set():
+                polled = asyncio.ensure_future(http(port, 'GET', path))
+                stopped = asyncio.ensure_future(stop.wait())
+                await asyncio.wait({polled, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                stopped.cancel()
+                if not polled.done():
+                    polled.cancel()
+                    break
+                _, body = polled.result()
+                if b'2' in body.split(b'\x1e'):
+                    await http(port, 'POST', path, b'3')  # pong
+        except OSError:
+            self.held -= 1
+            self.failed += 1
+
+
+async def bidder(port, auction_ids, amounts, recorder, timeout, stop, index):
+    rng = random.Random(SEED + index)
+    while not stop.is_set():
+        auction_id = rng.choice(auction_ids)
+        if rng.random() < 0.5:
+            body = json.dumps({'bidder_name': f'bidder{index}', 'bidder_phone': f'05{index:08d}',
+                               'bid_amount': next(amounts)}).encode()
+            request = http(port, 'POST', f'/api/auctions/{auction_id}/bid', body, 'application/json')
+        else:
+            request = http(port, 'GET', f'/api/auctions/{auction_id}/bids/highest')
+        started = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(request, timeout)
+        except (OSError, IndexError, ValueError, asyncio.TimeoutError):
+            status = FAILED
+        recorder.record(time.perf_counter() - started, status)
+
+
+async def drive(port, auction_ids, args):
+    stop, sessions, recorder = asyncio.Event(), Sessions(), Recorder()
+    # مبالغ متزايدة مشتركة: المزايدة التي تسبقها أعلى منها تُرفض (400) كما في load_test
+    amounts = itertools.count(100, 100)
+    holders = [asyncio.ensure_future(sessions.hold(port, args.timeout, stop)) for _ in range(args.connections)]
+    await asyncio.sleep(args.ramp)
+    held_at_start = sessions.held
+
+    measured = asyncio.Event()
+    clients = [asyncio.ensure_future(bidder(port, auction_ids, amounts, recorder, args.timeout, measured, index))
+               for index in range(args.clients)]
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    measured.set()
+    await asyncio.gather(*clients)
+    recorder.elapsed = time.perf_counter() - started
+
+    held_at_end = sessions.held
+    stop.set()
+    await asyncio.gather(*holders, return_exceptions=True)
+    return recorder.summary(connections=args.connections, held_at_start=held_at_start,
+                            held_at_end=held_at_end, failed_sessions=sessions.failed)
+
+
+def start_server(mode, database_url, port, threads):
+    worker_class, target = MODES[mode]
+    env = dict(os.environ, DATABASE_URL=database_url, BIND=f'127.0.0.1:{port}', WORKER_CLASS=worker_class,
+               THREADS=str(threads), WEB_CONCURRENCY='1', RATE_LIMIT_ENABLED='0')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', target],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/auctions', timeout=1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def run_mode(mode, database_url, args):
+    with tempfile.TemporaryDirectory() as directory:
+        url = database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app(url)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            _, auction_ids = seed_merchants(random.Random(SEED), 1, args.auctions, price=1)
+            db.engine.dispose()
+
+        server = start_server(mode, url, args.port, args.threads)
+        try:
+            return asyncio.run(drive(args.port, auction_ids, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--database-url', default=None, help='قاعدة مخصصة للقياس (افتراضياً SQLite مؤقتة)')
+    parser.add_argument('--connections', type=int, default=1000, help='جلسات long-polling معلقة')
+    parser.add_argument('--clients', type=int, default=50, help='عملاء المزايدة والقراءة المتزامنون')
+    parser.add_argument('--auctions', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--ramp', type=float, default=5, help='ثوانٍ لفتح الجلسات قبل القياس')
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=32, help='خيوط عامل gthread')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--output', default=None, help='ملف JSON للنتائج')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'mode':>9} {'held':>11} {'ops':>6} {'ok':>6} {'rejected':>8} {'errors':>6} {'ops/s':>7} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for mode in args.mode:
+        result = results[mode] = run_mode(mode, args.database_url, args)
+        held = f"{result['held_at_end']}/{result['connections']}"
+        print(f"{mode:>9} {held:>11} {result['operations']:>6} {result['ok']:>6} {result['rejected']:>8} "
+              f"{result['errors']:>6} {result['throughput']:>7} {result['p50_ms']:>8} {result['p90_ms']:>8} "
+              f"{result['p99_ms']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'database': (args.database_url or 'sqlite').split(':', 1)[0],
+                'threads': args.threads,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'modes': results
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
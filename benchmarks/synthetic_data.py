@@ -0,0 +1,377 @@
+"""توليد بيانات اصطناعية واقعية بأحجام كبيرة لاختبارات الأداء (بذرة ثابتة = نفس البيانات)
+
+مخططان:
+    src     users, products, auctions, bids, orders, notifications (src/models)
+    legacy  user, item, auction, bid (app.py؛ لا توجد فيه طلبات ولا إشعارات)
+
+التوزيعات:
+    - التجار: عدد المنتجات لكل تاجر بتوزيع باريتو (قلة من التجار لديهم أغلب المنتجات)
+    - المزايدات لكل مزاد: توزيع لوغاريتمي طبيعي بذيل طويل (أغلب المزادات هادئة وقليل منها حروب مزايدة)
+    - حرب المزايدة: 2-5 مزايدين أساسيين يتناوبون مع دخول مزايدين جدد أحياناً، والمزايدون
+      النشطون يتكررون عبر المزادات، والمبالغ تتبع سلم الزيادة الافتراضي بقفزات أحياناً
+    - الأوقات: المزايدات تتركز قرب نهاية المزاد (القنص)
+    - المزادات المنتهية بمزايدات لها طلب، والإشعارات لجزء من المزايدات ولكل إغلاق وطلب
+
+الإدراج بـ Core insert على دفعات كبيرة، مع أعمدة بلا معالجة أنواع (NullType) وقيم
+محوّلة مسبقاً لصيغة القاعدة (معرفات UUIDv7 مرتبة زمنياً، مبالغ بالوحدة الصغرى)،
+فلا يمر كل حقل بـ TypeDecorator. الجداول تُنشأ إن لم توجد، والملخصات (لوحة التاجر
+وعدادات غير المقروء) يعيد التطبيق بناءها بالمطابقة الدورية عند التشغيل.
+
+التشغيل:
+    python benchmarks/synthetic_data.py --database-url sqlite:///big.db --auctions 500000 --mean-bids 20
+    python benchmarks/synthetic_data.py --schema legacy --database-url postgresql://localhost/bench --auctions 100000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import MetaData, Table, Column, create_engine, insert
+from sqlalchemy.types import NullType
+from src.models.money import Money
+from src.services.bid_increments import DEFAULT_LADDER, IncrementLadder
+
+BATCH_ROWS = 50000
+AUCTION_CHUNK = 5000  # مزادات تُولد وتُدرج مع مزايداتها في كل دفعة
+EPOCH = datetime(1970, 1, 1)
+LADDER = IncrementLadder(DEFAULT_LADDER)
+FIRST_NAMES = ['Ahmed', 'Sara', 'Omar', 'Layla', 'Yousef', 'Noura', 'Khalid', 'Huda', 'Faisal', 'Mona']
+CATEGORIES = ['electronics', 'fashion', 'home', 'antiques', 'cars', 'art', 'jewelry', 'sports']
+ORDER_STATUSES = [('pending', 0.2), ('confirmed', 0.3), ('shipped', 0.2), ('delivered', 0.25), ('cancelled', 0.05)]
+
+
+class Encoder:
+    """تحويل القيم لصيغة القاعدة مباشرة كما تخزنها CompactId و MoneyType و DateTime"""
+
+    def __init__(self, dialect, rng):
+        self.postgresql = dialect == 'postgresql'
+        self.rng = rng
+
+    def new_id(self, moment):
+        """UUIDv7 بوقت moment: المعرفات مرتبة زمنياً كما يولدها التطبيق"""
+        ms = int((moment - EPOCH) / timedelta(milliseconds=1))
+        rand = self.rng.getrandbits(74)
+        value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | (rand >> 62) << 64 | 0b10 << 62 | rand & ((1 << 62) - 1)
+        if self.postgresql:
+            hexed = f'{value:032x}'
+            return f'{hexed[:8]}-{hexed[8:12]}-{hexed[12:16]}-{hexed[16:20]}-{hexed[20:]}'
+        return value.to_bytes(16, 'big')
+
+    def time(self, moment):
+        if moment is None or self.postgresql:
+            return moment
+        return moment.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    def flag(self, value):
+        return value if self.postgresql else int(value)
+
+
+class Loader:
+    """إدراج جماعي على دفعات BATCH_ROWS في جداول بنفس الأسماء والأعمدة دون معالجة أنواع"""
+
+    def __init__(self, engine, metadata):
+        self.engine = engine
+        raw = MetaData()
+        self.tables = {
+            name: Table(name, raw, *[Column(column.name, NullType()) for column in table.columns])
+            for name, table in metadata.tables.items()
+        }
+        self.counts = {}
+
+    def insert(self, connection, table, rows):
+        for start in range(0, len(rows), BATCH_ROWS):
+            connection.execute(insert(self.tables[table]), rows[start:start + BATCH_ROWS])
+        self.counts[table] = self.counts.get(table, 0) + len(rows)
+
+
+class Generator:
+    """مولد مشترك للمخططين: التجار والمزايدون وحروب المزايدة"""
+
+    def __init__(self, seed, merchants, bidders, auctions, mean_bids, days, notification_rate):
+        self.rng = random.Random(seed)
+        self.merchants = merchants
+        self.bidders = bidders
+        self.auctions = auctions
+        self.mean_bids = mean_bids
+        self.notification_rate = notification_rate
+        self.now = datetime(2026, 1, 1) + timedelta(days=days)
+        self.start = datetime(2026, 1, 1)
+        self.span = (self.now - self.start).total_seconds()
+        # باريتو: وزن كل تاجر، ومنه نصيبه من المنتجات
+        weights = [self.rng.paretovariate(1.2) for _ in range(merchants)]
+        total = sum(weights)
+        self.cumulative = list(self._accumulate(weight / total for weight in weights))
+        sigma = 1.1
+        self.mu = math.log(max(mean_bids, 0.01)) - sigma * sigma / 2
+        self.sigma = sigma
+
+    @staticmethod
+    def _accumulate(values):
+        running = 0
+        for value in values:
+            running += value
+            yield running
+
+    def merchant_index(self):
+        position = self.rng.random()
+        low, high = 0, len(self.cumulative) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.cumulative[middle] < position:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def bidder_index(self):
+        # المزايدون ذوو الأرقام الصغيرة أنشط بكثير (توزيع قوة)
+        return int(self.bidders * self.rng.random() ** 3)
+
+    def auction_shape(self):
+        """حالة المزاد وأوقاته وسعره الابتدائي"""
+        rng = self.rng
+        created = self.start + timedelta(seconds=rng.random() * self.span)
+        duration = timedelta(hours=rng.choice((1, 6, 24, 72, 168)))
+        start_time = created + timedelta(minutes=rng.randrange(0, 120))
+        end_time = start_time + duration
+        if end_time <= self.now:
+            status = 'cancelled' if rng.random() < 0.03 else 'ended'
+        elif start_time <= self.now:
+            status = 'active'
+        else:
+            status = 'pending'
+        price = Money(int(rng.lognormvariate(math.log(5000), 1.2)) + 100)  # بالوحدة الصغرى
+        return created, start_time, end_time, status, price
+
+    def bid_war(self, start_time, end_time, price, status):
+        """[(bid_time, bidder_index, amount)] مرتبة زمنياً لمزاد واحد"""
+        if status in ('pending', 'cancelled'):
+            return []
+        rng = self.rng
+        count = int(rng.lognormvariate(self.mu, self.sigma))
+        if not count:
+            return []
+        horizon = min(end_time, self.now)
+        duration = (horizon - start_time).total_seconds()
+        # المزايدات تتركز قرب النهاية: u^3 يدفع أغلب الأوقات للطرف الأخير
+        times = sorted(horizon - timedelta(seconds=duration * rng.random() ** 3) for _ in range(count))
+        core = [self.bidder_index() for _ in range(rng.randint(2, 5))]
+        amount, previous, bids = price, None, []
+        for moment in times:
+            if rng.random() < 0.1:
+                core.append(self.bidder_index())
+            bidder = rng.choice(core)
+            if bidder == previous:
+                bidder = core[(core.index(bidder) + 1) % len(core)]
+            step = LADDER.increment(amount)
+            # قفزة أكبر من الحد الأدنى أحياناً لإخراج المنافسين
+            amount = Money(amount + step * (1 + (rng.random() < 0.15) * rng.randint(1, 10)))
+            bids.append((moment, bidder, amount))
+            previous = bidder
+        return bids
+
+    def order_status(self):
+        position, running = self.rng.random(), 0
+        for status, share in ORDER_STATUSES:
+            running += share
+            if position < running:
+                return status
+        return ORDER_STATUSES[-1][0]
+
+
+def bidder_name(index):
+    return f'{FIRST_NAMES[index % len(FIRST_NAMES)]} {index}'
+
+
+def bidder_phone(index):
+    return f'05{index:08d}'
+
+
+def generate_src(engine, generator, progress):
+    from src.models.user import db
+    from src.models import product, auction, bid, order, notification  # noqa: F401 تسجيل الجداول
+
+    db.metadata.create_all(engine)
+    loader = Loader(engine, db.metadata)
+    encode = Encoder(engine.dialect.name, generator.rng)
+    rng = generator.rng
+
+    merchant_ids, users = [], []
+    for index in range(generator.merchants):
+        created = generator.start + timedelta(seconds=rng.random() * generator.span * 0.2)
+        merchant_ids.append(encode.new_id(created))
+        users.append({
+            'id': merchant_ids[-1], 'username': f'merchant{index}', 'email': f'merchant{index}@example.com',
+            'password_hash': 'x', 'full_name': bidder_name(index), 'phone_number': bidder_phone(index),
+            'business_name': f'Store {index}', 'subscription_plan': rng.choice(('basic', 'basic', 'pro', 'enterprise')),
+            'is_active': encode.flag(True), 'role': 'merchant',
+            'created_at': encode.time(created), 'updated_at': encode.time(created)
+        })
+    with engine.begin() as connection:
+        loader.insert(connection, 'users', users)
+
+    for chunk_start in range(0, generator.auctions, AUCTION_CHUNK):
+        products, auctions, bids, orders, notifications = [], [], [], [], []
+        for _ in range(min(AUCTION_CHUNK, generator.auctions - chunk_start)):
+            merchant_id = merchant_ids[generator.merchant_index()]
+            created, start_time, end_time, status, price = generator.auction_shape()
+            war = generator.bid_war(start_time, end_time, price, status)
+            ended = status == 'ended'
+            product_id, auction_id = encode.new_id(created), encode.new_id(created)
+            product_status = {'ended': 'sold' if war else 'archived', 'cancelled': 'archived',
+                              'active': 'active', 'pending': 'draft'}[status]
+            products.append({
+                'id': product_id, 'user_id': merchant_id, 'name': f'Item {chunk_start + len(products)}',
+                'description': None, 'starting_price': int(price), 'category': rng.choice(CATEGORIES),
+                'image_url': None, 'qr_code_url': None, 'status': product_status,
+                'created_at': encode.time(created), 'updated_at': encode.time(created)
+            })
+
+            winner_id = None
+            for position, (moment, bidder, amount) in enumerate(war):
+                bid_id = encode.new_id(moment)
+                winning = ended and position == len(war) - 1
+                winner_id = bid_id if winning else winner_id
+                bids.append({
+                    'id': bid_id, 'auction_id': auction_id, 'bidder_name': bidder_name(bidder),
+                    'bidder_phone': bidder_phone(bidder), 'bid_amount': int(amount),
+                    'is_winning_bid': encode.flag(winning), 'bid_time': encode.time(moment),
+                    'ip_address': f'10.{bidder % 256}.{bidder // 256 % 256}.{rng.randrange(1, 255)}', 'user_agent': None
+                })
+                if rng.random() < generator.notification_rate:
+                    notifications.append(notification_row(encode, generator, merchant_id, 'new_bid', moment, auction_id))
+
+            updated = end_time if ended else war[-1][0] if war else created
+            auctions.append({
+                'id': auction_id, 'product_id': product_id, 'user_id': merchant_id, 'status': status,
+                'start_time': encode.time(start_time), 'end_time': encode.time(end_time),
+                'starting_price': int(price), 'current_highest_bid': int(war[-1][2]) if war else None,
+                'winner_bid_id': winner_id, 'total_bids': len(war),
+                'created_at': encode.time(created), 'updated_at': encode.time(updated)
+            })
+            if ended:
+                notifications.append(notification_row(encode, generator, merchant_id, 'auction_ended', end_time, auction_id))
+            if ended and war:
+                moment, bidder, amount = war[-1]
+                order_time = end_time + timedelta(minutes=rng.randrange(1, 600))
+                order_status = generator.order_status()
+                order_id = encode.new_id(order_time)
+                orders.append({
+                    'id': order_id, 'auction_id': auction_id, 'bid_id': winner_id, 'user_id': merchant_id,
+                    'customer_name': bidder_name(bidder), 'customer_phone': bidder_phone(bidder),
+                    'delivery_address': None, 'final_price': int(amount), 'status': order_status,
+                    'payment_status': {'shipped': 'paid', 'delivered': 'paid', 'cancelled': 'refunded'}.get(order_status, 'pending'),
+                    'notes': None, 'created_at': encode.time(order_time), 'updated_at': encode.time(order_time)
+                })
+                if order_status != 'pending':
+                    notifications.append(notification_row(
+                        encode, generator, merchant_id, 'order_confirmed', order_time, auction_id, order_id
+                    ))
+
+        with engine.begin() as connection:
+            for table, rows in (('products', products), ('auctions', auctions), ('bids', bids),
+                                ('orders', orders), ('notifications', notifications)):
+                loader.insert(connection, table, rows)
+        progress(loader.counts)
+    return loader.counts
+
+
+def notification_row(encode, generator, user_id, kind, moment, auction_id, order_id=None):
+    titles = {'new_bid': 'مزايدة جديدة', 'auction_ended': 'انتهى المزاد', 'order_confirmed': 'تم تأكيد الطلب'}
+    moment = min(moment, generator.now)
+    # الإشعارات الأقدم من أسبوع مقروءة غالباً، والأحدث نصفها تقريباً
+    read = generator.rng.random() < (0.95 if generator.now - moment > timedelta(days=7) else 0.5)
+    return {
+        'id': encode.new_id(moment), 'user_id': user_id, 'type': kind, 'title': titles[kind],
+        'message': titles[kind], 'is_read': encode.flag(read), 'related_auction_id': auction_id,
+        'related_order_id': order_id, 'created_at': encode.time(moment)
+    }
+
+
+def generate_legacy(engine, generator, progress):
+    import app as legacy
+
+    legacy.db.metadata.create_all(engine)
+    loader = Loader(engine, legacy.db.metadata)
+    encode = Encoder(engine.dialect.name, generator.rng)
+    rng = generator.rng
+
+    # معرفات صحيحة متسلسلة: التجار أولاً ثم المزايدون (المزايد في هذا المخطط مستخدم)
+    users = [{
+        'id': index + 1, 'username': f'{role}{index}', 'email': f'{role}{index}@example.com', 'password_hash': 'x',
+        'phone_number': bidder_phone(index), 'full_name': bidder_name(index), 'role': role,
+        'created_at': encode.time(generator.start)
+    } for index, role in enumerate(['merchant'] * generator.merchants + ['bidder'] * generator.bidders)]
+    with engine.begin() as connection:
+        loader.insert(connection, 'user', users)
+
+    next_bid_id = 1
+    for chunk_start in range(0, generator.auctions, AUCTION_CHUNK):
+        items, auctions, bids = [], [], []
+        for offset in range(min(AUCTION_CHUNK, generator.auctions - chunk_start)):
+            item_id = chunk_start + offset + 1
+            created, start_time, end_time, status, price = generator.auction_shape()
+            war = generator.bid_war(start_time, end_time, price, status)
+            items.append({
+                'id': item_id, 'name': f'Item {item_id}', 'description': None, 'starting_price': int(price),
+                'image_url': None, 'created_at': encode.time(created), 'owner_id': generator.merchant_index() + 1,
+                'status': 'sold' if status == 'ended' and war else 'active' if status == 'active' else 'draft'
+            })
+            for moment, bidder, amount in war:
+                bids.append({
+                    'id': next_bid_id, 'amount': int(amount), 'created_at': encode.time(moment),
+                    'auction_id': item_id, 'bidder_id': generator.merchants + bidder + 1
+                })
+                next_bid_id += 1
+            auctions.append({
+                'id': item_id, 'start_time': encode.time(start_time), 'end_time': encode.time(end_time),
+                'current_price': int(war[-1][2] if war else price), 'status': status, 'item_id': item_id,
+                'winner_id': generator.merchants + war[-1][1] + 1 if status == 'ended' and war else None
+            })
+        with engine.begin() as connection:
+            for table, rows in (('item', items), ('auction', auctions), ('bid', bids)):
+                loader.insert(connection, table, rows)
+        progress(loader.counts)
+    return loader.counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--schema', choices=('src', 'legacy'), default='src')
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--merchants', type=int, default=1000)
+    parser.add_argument('--bidders', type=int, default=100000)
+    parser.add_argument('--auctions', type=int, default=100000)
+    parser.add_argument('--mean-bids', type=float, default=20, help='متوسط المزايدات لكل مزاد')
+    parser.add_argument('--days', type=int, default=180, help='المدة التي تغطيها البيانات')
+    parser.add_argument('--notification-rate', type=float, default=0.3, help='نسبة المزايدات التي تنشئ إشعاراً')
+    args = parser.parse_args()
+
+    generator = Generator(args.seed, args.merchants, args.bidders, args.auctions,
+                          args.mean_bids, args.days, args.notification_rate)
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+
+    def progress(counts):
+        total = sum(counts.values())
+        elapsed = time.perf_counter() - started
+        print(f'\r{total:>12,} rows  {total / elapsed:>10,.0f} rows/s', end='', flush=True)
+
+    generate = generate_src if args.schema == 'src' else generate_legacy
+    counts = generate(engine, generator, progress)
+    elapsed = time.perf_counter() - started
+    print()
+    for table, count in counts.items():
+        print(f'{table:>15} {count:>12,}')
+    total = sum(counts.values())
+    print(f"{'total':>15} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import pytest
+from flask import Flask
+from src.models.user import db, User
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.routes.auction import auction_bp
+from src.routes.bid import bid_bp
+from src.routes.order import order_bp
+from src.routes.notification import notification_bp
+from src.routes.user import user_bp
+from src.routes.export import export_bp
+from src.routes.admin import admin_bp
+
+pytest_plugins = ['src.services.pytest_query_budget']
+
+# -----------------------------------------------------------------------------
+# إعداد بيئة اختبار مشتركة لتطبيق الـ blueprints (src)
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def app_context():
+    app = Flask(__name__)
+    app.config.update({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False
+    })
+    db.init_app(app)
+    for blueprint in (auction_bp, bid_bp, order_bp, notification_bp, user_bp, export_bp, admin_bp):
+        app.register_blueprint(blueprint, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def client(app_context):
+    return app_context.test_client()
+
+
+@pytest.fixture()
+def make_auction(app_context):
+    """إنشاء تاجر ومنتج ومزاد مع مزايدات بالمبالغ المعطاة"""
+    def create_auction_with_bids(amounts, end_time=None, status=None):
+        count = User.query.count()
+        merchant = User(username=f'merchant{count}', email=f'm{count}@example.com',
+                        full_name='Merchant', password_hash='x')
+        db.session.add(merchant)
+        db.session.flush()
+        product = Product(user_id=merchant.id, name='Lamp', starting_price=10)
+        db.session.add(product)
+        db.session.flush()
+        auction = Auction(product_id=product.id, user_id=merchant.id, starting_price=10,
+                          status=status or ('ended' if end_time is None else 'active'),
+                          end_time=end_time)
+        db.session.add(auction)
+        db.session.flush()
+        for i, amount in enumerate(amounts):
+            db.session.add(Bid(auction_id=auction.id, bidder_name=f'bidder{i}',
+                               bidder_phone=f'050{i}', bid_amount=amount))
+        db.session.commit()
+        return auction
+    return create_auction_with_bids
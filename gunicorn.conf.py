@@ -0,0 +1,65 @@
+"""إعداد gunicorn للإنتاج (يُشغّل عادة عبر python -m src.serve)
+
+    gunicorn -c gunicorn.conf.py src.wsgi:app                        # gevent (الافتراضي)
+    WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py src.main:app   # خيوط
+    WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py app:app        # التطبيق القديم
+
+التطبيق يُحمّل مرة في العملية الرئيسية ثم تُنسخ منه العمال (preload_app)، ولا
+تبدأ الخيوط الخلفية ولا اتصالات القاعدة إلا في كل عامل بعد fork. المهام المجدولة
+(الإغلاق والتسوية الدورية والمطابقات والتنظيف) يملكها عامل واحد منتخب بقفل LEADER_LOCK.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.workers import defer_until_fork, after_fork  # noqa: E402
+
+bind = os.environ.get('BIND', '0.0.0.0:5001')
+worker_class = os.environ.get('WORKER_CLASS', 'gevent')
+# جلسة Socket.IO (long-polling) يجب أن تصل طلباتها لنفس العملية: مع أكثر من عامل
+# يلزم موازن بجلسات لاصقة و SOCKETIO_MESSAGE_QUEUE مشترك. و /metrics لكل عامل وحده
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# اتصالات متزامنة لكل عامل gevent (كل اتصال greenlet)
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 4000))
+# خيوط كل عامل gthread: كل طلب مفتوح يحجز خيطاً طوال انتظاره
+threads = int(os.environ.get('THREADS', 32))
+timeout = int(os.environ.get('WORKER_TIMEOUT', 60))
+keepalive = 30
+
+preload_app = os.environ.get('PRELOAD_APP', '1') == '1'
+# مهلة إنهاء الطلبات الجارية عند الإيقاف أو إعادة التحميل قبل قتل العامل
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+pidfile = os.environ.get('PIDFILE', os.path.join(tempfile.gettempdir(), 'bidflow-gunicorn.pid'))
+# سجل المزايدات وملفات التحليلات يملكهما عامل واحد: كل عامل يحتفظ بأعلى مزايدة
+# وبالسلاسل في ذاكرته، فعدة عمال تعني قبول مزايدات أدنى وسلاسل لا ترى مزايدات غيره
+SINGLE_WORKER_SETTINGS = ('BID_JOURNAL_DIR', 'BID_ANALYTICS_DIR')
+# سلاسل التحليلات في الذاكرة دائماً: مع عدة عمال يلزم أن تُعاد تعبئتها من القاعدة دورياً
+MULTI_WORKER_REQUIRED = ('BID_ANALYTICS_MAX_AGE',)
+# مسار ملف قفل (مضيف واحد) أو postgresql://... (قفل استشاري عبر عدة مضيفات)
+LEADER_LOCK = os.environ.get('LEADER_LOCK', os.path.join(tempfile.gettempdir(), 'bidflow-scheduler.lock'))
+
+defer_until_fork()
+
+
+def on_starting(server):
+    # server.cfg وليس WEB_CONCURRENCY فقط: عدد العمال قد يأتي من -w في سطر الأوامر
+    if server.cfg.workers < 2:
+        return
+    enabled = [name for name in SINGLE_WORKER_SETTINGS if os.environ.get(name)]
+    if enabled:
+        _refuse(server, f'{" and ".join(enabled)} require a single worker (got {server.cfg.workers})')
+    missing = [name for name in MULTI_WORKER_REQUIRED if not os.environ.get(name)]
+    if missing:
+        _refuse(server, f'{" and ".join(missing)} must be set to run {server.cfg.workers} workers')
+
+
+def _refuse(server, message):
+    if server.pidfile is not None:
+        server.pidfile.unlink()
+    sys.exit(message)
+
+
+def post_fork(server, worker):
+    after_fork(LEADER_LOCK)
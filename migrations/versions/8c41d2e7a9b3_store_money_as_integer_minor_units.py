@@ -0,0 +1,38 @@
+"""Store money as integer minor units
+
+Revision ID: 8c41d2e7a9b3
+Revises: 3a6725bf2b2c
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41d2e7a9b3'
+down_revision = '3a6725bf2b2c'
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = (
+    ('item', 'starting_price'),
+    ('auction', 'current_price'),
+    ('bid', 'amount'),
+)
+
+
+def upgrade():
+    for table, column in MONEY_COLUMNS:
+        op.execute(f'UPDATE {table} SET {column} = ROUND({column} * 100)')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.BigInteger(),
+                                  existing_nullable=False, postgresql_using=f'{column}::bigint')
+
+
+def downgrade():
+    for table, column in MONEY_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.BigInteger(), type_=sa.Float(),
+                                  existing_nullable=False)
+        op.execute(f'UPDATE {table} SET {column} = {column} / 100.0')
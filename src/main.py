@@ -12,6 +12,12 @@ from src.models.auction import Auction
 from src.models.bid import Bid
 from src.models.order import Order
 from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.models.unread_counter import UnreadNotificationCounter
+from src.models.bid_journal import BidJournalCheckpoint
+from src.models.proxy_bid import ProxyBid
+from src.models.idempotency import IdempotencyKey
+from src.models.merchant_rollup import MerchantRollup, MerchantDailyRevenue
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.product import product_bp
@@ -20,7 +26,32 @@ from src.routes.bid import bid_bp
 from src.routes.order import order_bp
 from src.routes.notification import notification_bp
 from src.routes.qr import qr_bp
+from src.routes.export import export_bp
+from src.routes.admin import admin_bp
 from src.routes.realtime import realtime_bp, init_socketio
+from src.services.settlement import init_settlement
+from src.services.auction_lifecycle import init_auction_lifecycle
+from src.services.outbox import init_outbox_dispatcher
+from src.services.unread_counter import init_unread_counters
+from src.services.merchant_rollups import init_merchant_rollups
+from src.services.retention import init_notification_retention
+from src.services.bid_journal import init_bid_journal
+from src.services.bid_writer import init_bid_writer
+from src.services.bid_analytics import init_bid_analytics
+from src.services.bid_increments import init_bid_increments
+from src.services.rate_limit import init_rate_limiting
+from src.services.idempotency import init_idempotency
+from src.services.read_replicas import init_read_replicas
+from src.services.metrics import init_metrics
+from src.services.query_inspector import init_query_inspector
+from src.services.analytics_export import init_analytics_export
+from src.services.id_migration import migrate_legacy_ids
+from src.services.money_migration import migrate_money_columns
+from src.services.role_migration import migrate_user_roles
+from src.services.bid_priority_migration import migrate_bid_priority
+from src.services.index_migration import migrate_indexes
+from src.services.cooperative import init_cooperative
+from src.services.workers import dispose_after_fork
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -28,8 +59,14 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 # تمكين CORS لجميع المصادر
 CORS(app)
 
+# وضع التشغيل: gevent عند التشغيل عبر src/wsgi.py أو gunicorn -k gevent، وإلا خيوط
+init_cooperative(app)
+
 # تهيئة SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# عدة عمال: البث يمر عبر طابور مشترك (مثل redis://) ليصل لعملاء كل العمليات
+app.config['SOCKETIO_MESSAGE_QUEUE'] = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=app.config['ASYNC_MODE'],
+                    message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
 init_socketio(app)
 
 # تسجيل جميع الـ blueprints
@@ -41,14 +78,87 @@ app.register_blueprint(bid_bp, url_prefix='/api')
 app.register_blueprint(order_bp, url_prefix='/api')
 app.register_blueprint(notification_bp, url_prefix='/api')
 app.register_blueprint(qr_bp, url_prefix='/api/qr')
+app.register_blueprint(export_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api')
 app.register_blueprint(realtime_bp, url_prefix='/api/realtime')
 
 # uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# نسخ القراءة لمعالجات GET (مفصولة بفواصل)، والكتابة دائماً على القاعدة الأساسية
+app.config['SQLALCHEMY_REPLICA_URIS'] = [uri for uri in os.environ.get('REPLICA_DATABASE_URLS', '').split(',') if uri]
 db.init_app(app)
+init_read_replicas(app)
+# زمن كل مسار وعدد استعلاماته على /metrics بصيغة Prometheus (METRICS_ENABLED=0 لتعطيله)
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+init_metrics(app)
+# فحص عينة من الطلبات بحثاً عن استعلامات N+1 والبطيئة (1 لفحص كل الطلبات أثناء التطوير)
+app.config['QUERY_INSPECTOR_SAMPLE_RATE'] = float(os.environ.get('QUERY_INSPECTOR_SAMPLE_RATE', 0.01))
+init_query_inspector(app)
 with app.app_context():
     db.create_all()
+    # تحويل المعرفات النصية القديمة إلى الصيغة المضغوطة (لا يفعل شيئاً إن تم الترحيل)
+    migrate_legacy_ids(db.engine)
+    # تحويل المبالغ العشرية القديمة إلى أعداد صحيحة بالوحدة الصغرى
+    migrate_money_columns(db.engine)
+    # عمود أدوار المستخدمين (merchant أو admin) للقواعد المنشأة قبله
+    migrate_user_roles(db.engine)
+    # عمود أسبقية المزايدات الآلية الفائزة بالتساوي
+    migrate_bid_priority(db.engine)
+    # فهارس النماذج التي أُضيفت بعد إنشاء جداولها (مثل ix_notifications_*)
+    migrate_indexes(db.engine)
+    # اتصالات الترحيل فُتحت في العملية الرئيسية؛ كل عامل gunicorn ينشئ مجمعه بعد fork
+    dispose_after_fork(*db.engines.values(), *app.extensions['read_replica_engines'])
+
+# سلاسل المزايدات الزمنية للتحليلات (تُحفظ في BID_ANALYTICS_DIR إن ضُبط)
+app.config['BID_ANALYTICS_DIR'] = os.environ.get('BID_ANALYTICS_DIR')
+# مع عدة عمال: كل سلسلة تُعاد تعبئتها من القاعدة بعد هذه المدة (ثوانٍ)
+if os.environ.get('BID_ANALYTICS_MAX_AGE'):
+    app.config['BID_ANALYTICS_MAX_AGE'] = float(os.environ['BID_ANALYTICS_MAX_AGE'])
+init_bid_analytics(app)
+
+# سجل المزايدات الإلحاقي (يُفعّل بضبط BID_JOURNAL_DIR) والاسترجاع من آخر نقطة تطبيق
+app.config['BID_JOURNAL_DIR'] = os.environ.get('BID_JOURNAL_DIR')
+init_bid_journal(app)
+
+# تحديد معدل المزايدات لكل IP ومزايد ومستخدم (دلاء مشتركة بين العمليات عبر redis://)
+app.config['RATE_LIMIT_STORAGE_URL'] = os.environ.get('RATE_LIMIT_STORAGE_URL', 'memory://')
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+init_rate_limiting(app)
+
+# إعادة استجابة الطلب الأول للمحاولات المكررة بنفس ترويسة Idempotency-Key
+init_idempotency(app)
+
+# تجميع كتابة المزايدات المتزامنة في معاملة واحدة (group commit)
+init_bid_writer(app)
+
+# سلالم أقل زيادة للمزايدة (افتراضي، ولكل تصنيف أو تاجر عبر BID_INCREMENT_LADDERS)
+init_bid_increments(app)
+
+# تشغيل خط تسوية المزادات المنتهية
+init_settlement(app)
+
+# مؤقت إغلاق المزادات عند موعدها بالضبط مع تمديد الإغلاق المرن (anti-sniping)
+app.config['SOFT_CLOSE_WINDOW'] = int(os.environ.get('SOFT_CLOSE_WINDOW', 120))
+app.config['SOFT_CLOSE_EXTENSION'] = int(os.environ.get('SOFT_CLOSE_EXTENSION', 120))
+init_auction_lifecycle(app)
+
+# تشغيل موزّع صندوق الصادر للإشعارات الفورية
+init_outbox_dispatcher(app)
+
+# تشغيل المطابقة الدورية لعدادات الإشعارات غير المقروءة
+init_unread_counters(app)
+
+# مطابقة ملخصات لوحة التاجر دورياً وإنشاء ملخصات البيانات السابقة لها
+init_merchant_rollups(app)
+
+# تصدير bids و auctions و orders بصيغة Parquet/Arrow للتحليلات: flask export-analytics
+app.config['ANALYTICS_EXPORT_DIR'] = os.environ.get('ANALYTICS_EXPORT_DIR', os.path.join(app.instance_path, 'exports'))
+init_analytics_export(app)
+
+# تنظيف وأرشفة الإشعارات المقروءة القديمة
+init_notification_retention(app)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
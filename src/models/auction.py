@@ -1,23 +1,29 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
+from src.models.money import MoneyType, to_money
 
 class Auction(db.Model):
     __tablename__ = 'auctions'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    product_id = db.Column(db.String(36), db.ForeignKey('products.id'), nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, active, ended, cancelled
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    product_id = db.Column(CompactId, db.ForeignKey('products.id'), nullable=False)
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), nullable=False)
+    # active_history: القيمة السابقة تُحمّل عند التغيير لتحديث ملخصات التجار
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)  # pending, active, ended, cancelled
     start_time = db.Column(db.DateTime)
     end_time = db.Column(db.DateTime)
-    starting_price = db.Column(db.Numeric(10, 2), nullable=False)
-    current_highest_bid = db.Column(db.Numeric(10, 2))
-    winner_bid_id = db.Column(db.String(36))
+    starting_price = db.Column(MoneyType, nullable=False)
+    current_highest_bid = db.Column(MoneyType)
+    winner_bid_id = db.Column(CompactId)
     total_bids = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @db.validates('starting_price', 'current_highest_bid')
+    def _validate_money(self, key, value):
+        return to_money(value)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -26,8 +32,8 @@ class Auction(db.Model):
             'status': self.status,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
-            'starting_price': float(self.starting_price) if self.starting_price else 0,
-            'current_highest_bid': float(self.current_highest_bid) if self.current_highest_bid else None,
+            'starting_price': self.starting_price.to_json() if self.starting_price is not None else 0,
+            'current_highest_bid': self.current_highest_bid.to_json() if self.current_highest_bid is not None else None,
             'winner_bid_id': self.winner_bid_id,
             'total_bids': self.total_bids,
             'created_at': self.created_at.isoformat() if self.created_at else None,
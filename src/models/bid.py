@@ -1,29 +1,37 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
+from src.models.money import MoneyType, to_money
 
 class Bid(db.Model):
     __tablename__ = 'bids'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    auction_id = db.Column(db.String(36), db.ForeignKey('auctions.id'), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    auction_id = db.Column(CompactId, db.ForeignKey('auctions.id'), nullable=False)
     bidder_name = db.Column(db.String(100), nullable=False)
     bidder_phone = db.Column(db.String(20), nullable=False)
-    bid_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    bid_amount = db.Column(MoneyType, nullable=False)
     is_winning_bid = db.Column(db.Boolean, default=False)
     bid_time = db.Column(db.DateTime, default=datetime.utcnow)
+    # أسبقية مزايدة آلية فازت بالتساوي: وقت تسجيل المزايدة الآلية (bid_time يبقى وقت الحفظ)
+    priority_time = db.Column(db.DateTime)
     ip_address = db.Column(db.String(45))  # IPv6 support
     user_agent = db.Column(db.Text)
     
+    @db.validates('bid_amount')
+    def _validate_money(self, key, value):
+        return to_money(value)
+    
     def to_dict(self):
         return {
             'id': self.id,
             'auction_id': self.auction_id,
             'bidder_name': self.bidder_name,
             'bidder_phone': self.bidder_phone,
-            'bid_amount': float(self.bid_amount) if self.bid_amount else 0,
+            'bid_amount': self.bid_amount.to_json() if self.bid_amount is not None else 0,
             'is_winning_bid': self.is_winning_bid,
             'bid_time': self.bid_time.isoformat() if self.bid_time else None,
+            'priority_time': self.priority_time.isoformat() if self.priority_time else None,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent
         }
@@ -31,3 +39,7 @@ class Bid(db.Model):
     def __repr__(self):
         return f'<Bid {self.bid_amount} by {self.bidder_name}>'
 
+
+# ترتيب تحديد الفائز: الأعلى مبلغاً ثم الأسبق (priority_time إن وُجد وإلا bid_time)
+WINNING_ORDER = (Bid.bid_amount.desc(), db.func.coalesce(Bid.priority_time, Bid.bid_time).asc())
+
@@ -0,0 +1,20 @@
+from src.models.user import db
+from datetime import datetime
+
+class BidJournalCheckpoint(db.Model):
+    __tablename__ = 'bid_journal_checkpoints'
+
+    # آخر رقم تسلسلي من سجل المزايدات تم تطبيقه على جداول bids و auctions
+    name = db.Column(db.String(50), primary_key=True, default='bids')
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_seq': self.last_seq,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<BidJournalCheckpoint {self.name}@{self.last_seq}>'
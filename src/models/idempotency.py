@@ -0,0 +1,24 @@
+from src.models.user import db
+from datetime import datetime
+from src.models.ids import CompactId, new_id
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    scope = db.Column(db.String(50), nullable=False)  # bid, proxy_bid, order
+    key = db.Column(db.String(100), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 للمسار وجسم الطلب
+    status_code = db.Column(db.Integer)  # فارغ أثناء تنفيذ الطلب الأول
+    response_body = db.Column(db.Text)
+    mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_idempotency_keys_scope_key'),
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.scope}:{self.key}>'
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator, LargeBinary, Boolean
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_rand = 0
+
+
+def uuid7():
+    """توليد UUIDv7: أول 48 بت هي الوقت بالملي ثانية، لذلك المعرفات مرتبة زمنياً
+
+    داخل نفس الملي ثانية يُزاد الجزء العشوائي بواحد حتى تبقى المعرفات متزايدة.
+    """
+    global _last_ms, _last_rand
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _last_ms:
+            ms = _last_ms
+            rand = _last_rand + 1
+        else:
+            rand = int.from_bytes(os.urandom(10), 'big') >> 6  # 74 بت
+        _last_ms, _last_rand = ms, rand
+
+    rand_a = (rand >> 62) & 0xFFF
+    rand_b = rand & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | rand_a << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def min_id_at(ms):
+    """أصغر UUIDv7 ممكن عند الملي ثانية ms: حد أدنى لنطاق معرفات حسب وقت إنشائها"""
+    return str(uuid.UUID(int=(ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | 0b10 << 62))
+
+
+class time_ordered(FunctionElement):
+    """شرط SQL: المعرف UUIDv7 مرتب بوقت إنشائه، وليس معرفاً قديماً (uuid4 أو نصاً لم يُرحّل)
+
+    نطاقات min_id_at لا تصلح إلا لهذه المعرفات؛ رقم الإصدار هو الخانة السابعة بعد
+    الشرطة الثانية في النص، والخانة 13 في hex للبايتات.
+    """
+
+    type = Boolean()
+    inherit_cache = True
+
+
+@compiles(time_ordered)
+def _time_ordered(element, compiler, **kw):
+    return f"(substr(hex({compiler.process(element.clauses, **kw)}), 13, 1) = '7')"
+
+
+@compiles(time_ordered, 'postgresql')
+def _time_ordered_postgresql(element, compiler, **kw):
+    return f"(substr(CAST({compiler.process(element.clauses, **kw)} AS TEXT), 15, 1) = '7')"
+
+
+def new_id():
+    """معرف جديد بصيغته النصية المعتادة (يُخزن في القاعدة بصيغة CompactId)"""
+    return str(uuid7())
+
+
+class CompactId(TypeDecorator):
+    """معرف UUID يُخزن كـ 16 بايت ويظهر في بايثون وفي JSON كنص بطول 36
+
+    على PostgreSQL يُستخدم نوع UUID الأصلي، وعلى بقية القواعد BINARY(16)
+    بدلاً من VARCHAR(36)، فتصغر الفهارس والمفاتيح الأجنبية لأقل من النصف.
+    القيم غير الصالحة (مثل معرف خاطئ في الرابط) لا تطابق أي صف بدلاً من
+    رفع خطأ، والصفوف القديمة المخزنة كنص تُقرأ كما هي إلى أن يتم ترحيلها.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        try:
+            parsed = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        except ValueError:
+            return None if dialect.name == 'postgresql' else str(value).encode('utf-8')
+        return str(parsed) if dialect.name == 'postgresql' else parsed.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value if value is None else str(value)
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if len(value) == 16:
+            return str(uuid.UUID(bytes=bytes(value)))
+        return bytes(value).decode('utf-8')
@@ -0,0 +1,52 @@
+from src.models.user import db
+from datetime import datetime
+from src.models.ids import CompactId
+from src.models.money import MoneyType
+
+class MerchantRollup(db.Model):
+    __tablename__ = 'merchant_rollups'
+    
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), primary_key=True)
+    products_draft = db.Column(db.Integer, nullable=False, default=0)
+    products_active = db.Column(db.Integer, nullable=False, default=0)
+    products_sold = db.Column(db.Integer, nullable=False, default=0)
+    products_archived = db.Column(db.Integer, nullable=False, default=0)
+    active_auctions = db.Column(db.Integer, nullable=False, default=0)
+    pending_orders = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'products': {
+                'draft': self.products_draft,
+                'active': self.products_active,
+                'sold': self.products_sold,
+                'archived': self.products_archived
+            },
+            'active_auctions': self.active_auctions,
+            'pending_orders': self.pending_orders,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<MerchantRollup {self.user_id}>'
+
+
+class MerchantDailyRevenue(db.Model):
+    __tablename__ = 'merchant_daily_revenue'
+    
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # تاريخ إنشاء الطلب (UTC)
+    revenue = db.Column(MoneyType, nullable=False, default=0)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'revenue': self.revenue.to_json(),
+            'orders': self.orders
+        }
+    
+    def __repr__(self):
+        return f'<MerchantDailyRevenue {self.user_id} {self.day}>'
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+from sqlalchemy.types import TypeDecorator, BigInteger
+
+
+class Money(int):
+    """مبلغ مالي بالوحدة الصغرى (هللة/سنت) كعدد صحيح
+
+    المقارنة والجمع عمليات أعداد صحيحة فلا توجد أخطاء تقريب ولا كائنات Decimal
+    في المسار الساخن. العمليات الحسابية بالوحدة الصغرى: Money(150) + 50 == Money(200)،
+    ونتيجتها Money دائماً: العدد الصحيح العادي يُعتبر بالوحدة الكبرى عند الحفظ
+    (MoneyType) فيُضرب في 100. القسمة / تبقى float كما في to_json، وقسمة مبلغ على
+    مبلغ (// أو %) نسبة وليست مبلغاً.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        """تحويل مبلغ بالوحدة الكبرى (نص أو رقم كما يصل في JSON) إلى Money
+
+        يرفع ValueError للقيم غير الصالحة أو التي فيها أكثر من منزلتين عشريتين.
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, bool) or value is None:
+            raise ValueError(f'Invalid amount: {value!r}')
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, float):
+            if value != value or value in (float('inf'), float('-inf')):
+                raise ValueError(f'Invalid amount: {value!r}')
+            cents = round(value * 100)
+            if abs(value * 100 - cents) > 1e-6 * max(1, abs(cents)):
+                raise ValueError(f'Amount has more than 2 decimal places: {value!r}')
+            return cls(cents)
+        if isinstance(value, Decimal):
+            cents = value * 100
+            if cents != cents.to_integral_value():
+                raise ValueError(f'Amount has more than 2 decimal places: {value!r}')
+            return cls(int(cents))
+        return cls._parse_str(str(value))
+
+    @classmethod
+    def _parse_str(cls, text):
+        text = text.strip()
+        sign = -1 if text.startswith('-') else 1
+        whole, _, fraction = text.lstrip('+-').partition('.')
+        if (not whole and not fraction) or not (whole or '0').isdigit() or (fraction and not fraction.isdigit()):
+            raise ValueError(f'Invalid amount: {text!r}')
+        fraction = fraction.rstrip('0')
+        if len(fraction) > 2:
+            raise ValueError(f'Amount has more than 2 decimal places: {text!r}')
+        return cls(sign * (int(whole or 0) * 100 + int(fraction.ljust(2, '0'))))
+
+    def to_json(self):
+        """القيمة بالوحدة الكبرى كرقم JSON (نفس صيغة الاستجابات السابقة)"""
+        return self / 100
+
+    def __add__(self, other):
+        return Money(int(self) + other) if isinstance(other, int) else NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Money(int(self) - other) if isinstance(other, int) else NotImplemented
+
+    def __rsub__(self, other):
+        return Money(other - int(self)) if isinstance(other, int) else NotImplemented
+
+    def __mul__(self, other):
+        if isinstance(other, Money):
+            return NotImplemented  # مبلغ × مبلغ ليس مبلغاً
+        return Money(int(self) * other) if isinstance(other, int) else NotImplemented
+
+    __rmul__ = __mul__
+
+    def __floordiv__(self, other):
+        if isinstance(other, Money):
+            return int(self) // int(other)
+        return Money(int(self) // other) if isinstance(other, int) else NotImplemented
+
+    def __mod__(self, other):
+        return Money(int(self) % other) if isinstance(other, int) else NotImplemented
+
+    def __neg__(self):
+        return Money(-int(self))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Money(abs(int(self)))
+
+    def __str__(self):
+        sign = '-' if self < 0 else ''
+        whole, cents = divmod(abs(int(self)), 100)
+        return f'{sign}{whole}.{cents:02d}'
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+
+def to_money(value):
+    """تحويل المدخلات إلى Money مع تمرير None كما هو"""
+    return None if value is None else Money.parse(value)
+
+
+class MoneyType(TypeDecorator):
+    """عمود مبلغ يُخزن كعدد صحيح بالوحدة الصغرى ويُقرأ كـ Money
+
+    القيم غير Money (أرقام أو نصوص) تُعتبر بالوحدة الكبرى وتُحوّل عند الحفظ.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(Money.parse(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Money(value)
@@ -1,20 +1,25 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), nullable=False)
     type = db.Column(db.String(50), nullable=False)  # new_bid, auction_ended, order_confirmed
     title = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
-    related_auction_id = db.Column(db.String(36))
-    related_order_id = db.Column(db.String(36))
+    related_auction_id = db.Column(CompactId)
+    related_order_id = db.Column(CompactId)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notifications_read_created', 'is_read', 'created_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
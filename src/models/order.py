@@ -1,24 +1,30 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
+from src.models.money import MoneyType, to_money
 
 class Order(db.Model):
     __tablename__ = 'orders'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    auction_id = db.Column(db.String(36), db.ForeignKey('auctions.id'), nullable=False)
-    bid_id = db.Column(db.String(36), db.ForeignKey('bids.id'), nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    auction_id = db.Column(CompactId, db.ForeignKey('auctions.id'), nullable=False)
+    bid_id = db.Column(CompactId, db.ForeignKey('bids.id'), nullable=False)
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), nullable=False)
     customer_name = db.Column(db.String(100), nullable=False)
     customer_phone = db.Column(db.String(20), nullable=False)
     delivery_address = db.Column(db.Text)
-    final_price = db.Column(db.Numeric(10, 2), nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, confirmed, shipped, delivered, cancelled
+    final_price = db.Column(MoneyType, nullable=False)
+    # active_history: القيمة السابقة تُحمّل عند التغيير لتحديث ملخصات التجار
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)  # pending, confirmed, shipped, delivered, cancelled
     payment_status = db.Column(db.String(20), default='pending')  # pending, paid, refunded
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @db.validates('final_price')
+    def _validate_money(self, key, value):
+        return to_money(value)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -28,7 +34,7 @@ class Order(db.Model):
             'customer_name': self.customer_name,
             'customer_phone': self.customer_phone,
             'delivery_address': self.delivery_address,
-            'final_price': float(self.final_price) if self.final_price else 0,
+            'final_price': self.final_price.to_json() if self.final_price is not None else 0,
             'status': self.status,
             'payment_status': self.payment_status,
             'notes': self.notes,
@@ -1,29 +1,35 @@
 from src.models.user import db
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
+from src.models.money import MoneyType, to_money
 
 class Product(db.Model):
     __tablename__ = 'products'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    starting_price = db.Column(db.Numeric(10, 2), nullable=False)
+    starting_price = db.Column(MoneyType, nullable=False)
     category = db.Column(db.String(50))
     image_url = db.Column(db.String(500))
     qr_code_url = db.Column(db.String(500))
-    status = db.Column(db.String(20), default='draft')  # draft, active, sold, archived
+    # active_history: القيمة السابقة تُحمّل عند التغيير لتحديث ملخصات التجار
+    status = db.column_property(db.Column(db.String(20), default='draft'), active_history=True)  # draft, active, sold, archived
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @db.validates('starting_price')
+    def _validate_money(self, key, value):
+        return to_money(value)
+    
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
             'name': self.name,
             'description': self.description,
-            'starting_price': float(self.starting_price) if self.starting_price else 0,
+            'starting_price': self.starting_price.to_json() if self.starting_price is not None else 0,
             'category': self.category,
             'image_url': self.image_url,
             'qr_code_url': self.qr_code_url,
@@ -0,0 +1,40 @@
+from src.models.user import db
+from datetime import datetime
+from src.models.ids import CompactId, new_id
+from src.models.money import MoneyType, to_money
+
+class ProxyBid(db.Model):
+    __tablename__ = 'proxy_bids'
+
+    # مزايدة آلية: يزايد المحرك نيابة عن المزايد حتى الحد الأقصى
+    id = db.Column(CompactId, primary_key=True, default=new_id)
+    auction_id = db.Column(CompactId, db.ForeignKey('auctions.id'), nullable=False)
+    bidder_name = db.Column(db.String(100), nullable=False)
+    bidder_phone = db.Column(db.String(20), nullable=False)
+    max_amount = db.Column(MoneyType, nullable=False)
+    status = db.Column(db.String(20), default='active')  # active, outbid, closed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_proxy_bids_auction_status', 'auction_id', 'status'),
+    )
+
+    @db.validates('max_amount')
+    def _validate_money(self, key, value):
+        return to_money(value)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'auction_id': self.auction_id,
+            'bidder_name': self.bidder_name,
+            'bidder_phone': self.bidder_phone,
+            'max_amount': self.max_amount.to_json() if self.max_amount is not None else 0,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ProxyBid {self.max_amount} by {self.bidder_name}>'
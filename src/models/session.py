@@ -0,0 +1,18 @@
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+
+class RoutingSession(Session):
+    """جلسة توجّه القراءات إلى نسخة القراءة المختارة للطلب والكتابات إلى القاعدة الأساسية
+
+    النسخة تُختار فقط في معالجات القراءة المعلّمة (انظر services/read_replicas)،
+    وأي flush أو INSERT/UPDATE/DELETE يذهب دائماً إلى الأساسية.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            engine = has_app_context() and g.get('read_engine')
+            if engine:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
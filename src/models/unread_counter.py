@@ -0,0 +1,20 @@
+from src.models.user import db
+from datetime import datetime
+from src.models.ids import CompactId
+
+class UnreadNotificationCounter(db.Model):
+    __tablename__ = 'unread_notification_counters'
+    
+    user_id = db.Column(CompactId, db.ForeignKey('users.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'unread_count': self.unread_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<UnreadNotificationCounter {self.user_id}: {self.unread_count}>'
@@ -0,0 +1,19 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def upsert(session, table, set_=None):
+    """INSERT ... ON CONFLICT (المفتاح الأساسي) DO UPDATE SET لـ SQLite و Postgres
+
+    الإدراج والتعديل جملة واحدة ذرية: كاتبان متزامنان لنفس المفتاح لا يصطدمان
+    بقيد التفرد، ويُطبق تعديل الثاني على الصف الذي أدرجه الأول.
+    بدون set_ يُتجاهل الصف الموجود (DO NOTHING).
+    """
+    dialect = session.get_bind(clause=table.insert()).dialect.name
+    statement = _INSERTS[dialect](table)
+    if set_ is None:
+        return statement.on_conflict_do_nothing()
+    return statement.on_conflict_do_update(
+        index_elements=list(table.primary_key.columns), set_=set_
+    )
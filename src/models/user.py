@@ -1,14 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-import uuid
+from src.models.ids import CompactId, new_id
+from src.models.session import RoutingSession
 from werkzeug.security import generate_password_hash, check_password_hash
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(CompactId, primary_key=True, default=new_id)
     username = db.Column(db.String(50), unique=True, nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -17,6 +18,7 @@ class User(db.Model):
     business_name = db.Column(db.String(100))
     subscription_plan = db.Column(db.String(20), default='basic')
     is_active = db.Column(db.Boolean, default=True)
+    role = db.Column(db.String(20), nullable=False, default='merchant', server_default='merchant')  # merchant, admin
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -39,6 +41,7 @@ class User(db.Model):
             'business_name': self.business_name,
             'subscription_plan': self.subscription_plan,
             'is_active': self.is_active,
+            'role': self.role,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
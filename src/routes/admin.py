@@ -0,0 +1,29 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from src.routes.auth import token_required, role_required
+from src.services.profiler import ProfilerBusy, DEFAULT_INTERVAL, DEFAULT_MAX_SECONDS, profile
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/profile', methods=['POST'])
+@token_required
+@role_required('admin')
+def profile_worker(current_user):
+    """تحليل إحصائي لهذه العملية لمدة seconds ثانية (للمدير فقط)
+
+    ?seconds=10&interval=0.01&format=collapsed يعيد ملف مكدسات مطوية لـ flamegraph،
+    وبدون format يعيد JSON فيه المكدسات وزمن المعالج لكل خيط.
+    """
+    seconds = request.args.get('seconds', 10, type=float)
+    interval = request.args.get('interval', DEFAULT_INTERVAL, type=float)
+    if seconds is None or seconds <= 0 or interval is None or interval <= 0:
+        return jsonify({'error': 'مدة التحليل أو الفترة غير صالحة'}), 400
+
+    try:
+        result = profile(seconds, interval, current_app.config.get('PROFILER_MAX_SECONDS', DEFAULT_MAX_SECONDS))
+    except ProfilerBusy:
+        return jsonify({'error': 'يوجد تحليل قيد التشغيل على هذه العملية'}), 409
+
+    if request.args.get('format') == 'collapsed':
+        return Response(result.collapsed(), mimetype='text/plain',
+                        headers={'Content-Disposition': 'attachment; filename=profile.collapsed'})
+    return jsonify(result.to_dict()), 200
@@ -2,12 +2,23 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db, User
 from src.models.product import Product
 from src.models.auction import Auction
-from src.models.bid import Bid
-from datetime import datetime
+from src.models.bid import Bid, WINNING_ORDER
+from src.models.ids import new_id
+from src.models.money import Money
+from src.services.settlement import enqueue_settlement
+from src.services.bid_journal import journal_enabled, journal_bid, materialize_pending, close_journal_auctions
+from src.services.bid_writer import submit_bid
+from src.services.auction_lifecycle import track_deadline, untrack_deadline
+from src.services.bid_increments import ladder_for
+from src.services.rate_limit import rate_limited, BID_RATE_LIMITS
+from src.services.idempotency import idempotent
+from src.services.read_replicas import read_replica
+from datetime import datetime, timedelta, timezone
 
 auction_bp = Blueprint('auction', __name__)
 
 @auction_bp.route('/auctions', methods=['GET'])
+@read_replica
 def get_auctions():
     """استرجاع قائمة بالمزادات"""
     try:
@@ -17,6 +28,7 @@ def get_auctions():
         return jsonify({'error': str(e)}), 500
 
 @auction_bp.route('/auctions/<auction_id>', methods=['GET'])
+@read_replica
 def get_auction(auction_id):
     """استرجاع تفاصيل مزاد معين مع المزايدات"""
     try:
@@ -52,13 +64,31 @@ def start_auction(product_id):
         if existing_auction:
             return jsonify({'error': 'يوجد مزاد نشط بالفعل لهذا المنتج'}), 400
         
+        # موعد الانتهاء اختياري: end_time بصيغة ISO (UTC) أو duration_minutes
+        data = request.get_json(silent=True) or {}
+        start_time = datetime.utcnow()
+        end_time = None
+        try:
+            if data.get('end_time'):
+                end_time = datetime.fromisoformat(data['end_time'])
+                # المواعيد مخزنة بتوقيت UTC دون منطقة زمنية: 2026-01-01T12:00:00+03:00 تصبح 09:00
+                if end_time.tzinfo is not None:
+                    end_time = end_time.astimezone(timezone.utc).replace(tzinfo=None)
+            elif data.get('duration_minutes'):
+                end_time = start_time + timedelta(minutes=float(data['duration_minutes']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'موعد انتهاء المزاد غير صالح'}), 400
+        if end_time is not None and end_time <= start_time:
+            return jsonify({'error': 'موعد انتهاء المزاد يجب أن يكون في المستقبل'}), 400
+        
         # إنشاء مزاد جديد
         auction = Auction(
             product_id=product_id,
             user_id=product.user_id,
             starting_price=product.starting_price,
             status='active',
-            start_time=datetime.utcnow()
+            start_time=start_time,
+            end_time=end_time
         )
         
         # تحديث حالة المنتج
@@ -67,6 +97,9 @@ def start_auction(product_id):
         db.session.add(auction)
         db.session.commit()
         
+        # مؤقت الإغلاق ينهي المزاد عند موعده بالضبط
+        track_deadline(auction.id, auction.end_time)
+        
         return jsonify(auction.to_dict()), 201
     except Exception as e:
         db.session.rollback()
@@ -83,8 +116,12 @@ def end_auction(auction_id):
         if auction.status != 'active':
             return jsonify({'error': 'المزاد غير نشط'}), 400
         
-        # العثور على أعلى مزايدة
-        highest_bid = Bid.query.filter_by(auction_id=auction_id).order_by(Bid.bid_amount.desc()).first()
+        # إيقاف مزايدات السجل الجديدة وتطبيق المقبولة منها قبل تحديد الفائز
+        close_journal_auctions([auction.id])
+        materialize_pending(wait=True)
+        
+        # العثور على أعلى مزايدة (الأقدم عند التعادل كما في خط التسوية)
+        highest_bid = Bid.query.filter_by(auction_id=auction_id).order_by(*WINNING_ORDER).first()
         
         # تحديث حالة المزاد
         auction.status = 'ended'
@@ -96,14 +133,13 @@ def end_auction(auction_id):
             
             # تحديث حالة المزايدة الفائزة
             highest_bid.is_winning_bid = True
-            
-            # تحديث حالة المنتج
-            product = Product.query.get(auction.product_id)
-            if product:
-                product.status = 'sold'
         
         db.session.commit()
         
+        # إنشاء الطلب وإشعار التاجر وتحديث المنتج تتم في خط التسوية
+        untrack_deadline(auction.id)
+        enqueue_settlement(auction.id)
+        
         result = auction.to_dict()
         if highest_bid:
             result['winner_bid'] = highest_bid.to_dict()
@@ -113,11 +149,28 @@ def end_auction(auction_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _auction_with_ladder(auction_id):
+    """المزاد وسلم الزيادة الخاص به: تصنيف المنتج يُقرأ مع المزاد في نفس الاستعلام"""
+    row = db.session.execute(
+        db.select(Auction, Product.category)
+        .outerjoin(Product, Product.id == Auction.product_id)
+        .where(Auction.id == auction_id)
+    ).first()
+    if row is None:
+        return None, None
+    auction, category = row
+    return auction, ladder_for(auction.user_id, category)
+
+def _too_low(message, minimum):
+    return jsonify({'error': f'{message} {minimum} على الأقل', 'minimum_next_bid': minimum.to_json()}), 400
+
 @auction_bp.route('/auctions/<auction_id>/bid', methods=['POST'])
+@rate_limited(*BID_RATE_LIMITS)
+@idempotent('bid')
 def place_bid(auction_id):
     """تسجيل مزايدة جديدة"""
     try:
-        auction = Auction.query.get(auction_id)
+        auction, ladder = _auction_with_ladder(auction_id)
         if not auction:
             return jsonify({'error': 'المزاد غير موجود'}), 404
         
@@ -132,36 +185,104 @@ def place_bid(auction_id):
             if field not in data:
                 return jsonify({'error': f'الحقل {field} مطلوب'}), 400
         
-        bid_amount = float(data['bid_amount'])
-        
-        # التحقق من أن المزايدة أكبر من السعر الحالي
-        current_highest = auction.current_highest_bid or auction.starting_price
-        if bid_amount <= current_highest:
-            return jsonify({'error': f'يجب أن تكون المزايدة أكبر من {current_highest}'}), 400
-        
-        # إنشاء المزايدة الجديدة
-        bid = Bid(
-            auction_id=auction_id,
-            bidder_name=data['bidder_name'],
-            bidder_phone=data['bidder_phone'],
-            bid_amount=bid_amount,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent')
-        )
+        try:
+            bid_amount = Money.parse(data['bid_amount'])
+        except ValueError:
+            return jsonify({'error': 'قيمة المزايدة غير صالحة'}), 400
         
-        # تحديث المزاد
-        auction.current_highest_bid = bid_amount
-        auction.total_bids += 1
+        # التحقق من أن المزايدة تبلغ السعر الحالي مضافاً إليه أقل زيادة حسب سلم الزيادة
+        minimum = ladder.minimum_next(auction.current_highest_bid or auction.starting_price)
+        if bid_amount < minimum:
+            return _too_low('يجب أن تكون المزايدة', minimum)
         
-        db.session.add(bid)
-        db.session.commit()
+        # بيانات المزايدة الجديدة
+        new_bid = {
+            'auction_id': auction_id,
+            'bidder_name': data['bidder_name'],
+            'bidder_phone': data['bidder_phone'],
+            'bid_amount': bid_amount,
+            'ip_address': request.remote_addr,
+            'user_agent': request.headers.get('User-Agent')
+        }
+        
+        # تحرير اتصال الطلب قبل انتظار الكتابة، وإلا يستنزف المنتظرون مجمع الاتصالات الذي يحتاجه الكاتب
+        db.session.close()
+        
+        # عند تفعيل سجل المزايدات يكون هو مسار الكتابة، ويُطبق على القاعدة دورياً
+        if journal_enabled():
+            bid = Bid(id=new_id(), is_winning_bid=False, **new_bid)
+            status, result = journal_bid(auction, bid, ladder)
+            if status == 'inactive':
+                return jsonify({'error': 'المزاد غير نشط'}), 400
+            if status == 'too_low':
+                return _too_low('يجب أن تكون المزايدة', result)
+            end_time = result
+            result = bid.to_dict()
+            result['minimum_next_bid'] = ladder.minimum_next(bid_amount).to_json()
+            result['end_time'] = end_time.isoformat() if end_time else None
+            return jsonify(result), 201
+        
+        # الكتابة عبر المجمّع: مزايدات الطلبات المتزامنة تُحفظ في معاملة واحدة
+        status, result = submit_bid(new_bid)
+        if status == 'inactive':
+            return jsonify({'error': 'المزاد غير نشط'}), 400
+        if status == 'too_low':
+            return _too_low('يجب أن تكون المزايدة', result)
+        
+        return jsonify(result), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@auction_bp.route('/auctions/<auction_id>/proxy-bid', methods=['POST'])
+@rate_limited(*BID_RATE_LIMITS)
+@idempotent('proxy_bid')
+def place_proxy_bid(auction_id):
+    """تسجيل مزايدة آلية بحد أقصى (أو رفع الحد)، ويزايد المحرك نيابة عن المزايد"""
+    try:
+        if journal_enabled():
+            return jsonify({'error': 'المزايدة الآلية غير متاحة مع تفعيل سجل المزايدات'}), 400
+        
+        auction = Auction.query.get(auction_id)
+        if not auction:
+            return jsonify({'error': 'المزاد غير موجود'}), 404
+        
+        if auction.status != 'active':
+            return jsonify({'error': 'المزاد غير نشط'}), 400
+        
+        data = request.get_json()
+        
+        # التحقق من البيانات المطلوبة
+        required_fields = ['bidder_name', 'bidder_phone', 'max_amount']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'الحقل {field} مطلوب'}), 400
+        
+        try:
+            max_amount = Money.parse(data['max_amount'])
+        except ValueError:
+            return jsonify({'error': 'الحد الأقصى غير صالح'}), 400
+        
+        db.session.close()
+        
+        status, result = submit_bid({
+            'auction_id': auction_id,
+            'bidder_name': data['bidder_name'],
+            'bidder_phone': data['bidder_phone'],
+            'max_amount': max_amount
+        })
+        if status == 'inactive':
+            return jsonify({'error': 'المزاد غير نشط'}), 400
+        if status == 'too_low':
+            return _too_low('يجب أن يكون الحد الأقصى', result)
         
-        return jsonify(bid.to_dict()), 201
+        return jsonify(result), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auction_bp.route('/users/<user_id>/auctions', methods=['GET'])
+@read_replica
 def get_user_auctions(user_id):
     """استرجاع مزادات مستخدم معين"""
     try:
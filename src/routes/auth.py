@@ -42,6 +42,17 @@ def token_required(f):
     
     return decorated
 
+def role_required(role_name):
+    """ديكوريتر بعد token_required: يرفض المستخدم الذي ليس له الدور المطلوب"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            if current_user.role != role_name:
+                return jsonify({'error': 'غير مصرح: يتطلب صلاحية ' + role_name}), 403
+            return f(current_user, *args, **kwargs)
+        return decorated
+    return decorator
+
 @auth_bp.route('/auth/register', methods=['POST'])
 def register():
     """تسجيل مستخدم جديد"""
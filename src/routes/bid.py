@@ -2,10 +2,14 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.bid import Bid
 from src.models.auction import Auction
+from src.services.read_replicas import read_replica
+from src.services.bid_analytics import auction_series
+from datetime import datetime, timezone
 
 bid_bp = Blueprint('bid', __name__)
 
 @bid_bp.route('/bids', methods=['GET'])
+@read_replica
 def get_bids():
     """استرجاع قائمة بجميع المزايدات"""
     try:
@@ -15,6 +19,7 @@ def get_bids():
         return jsonify({'error': str(e)}), 500
 
 @bid_bp.route('/bids/<bid_id>', methods=['GET'])
+@read_replica
 def get_bid(bid_id):
     """استرجاع تفاصيل مزايدة معينة"""
     try:
@@ -26,6 +31,7 @@ def get_bid(bid_id):
         return jsonify({'error': str(e)}), 500
 
 @bid_bp.route('/auctions/<auction_id>/bids', methods=['GET'])
+@read_replica
 def get_auction_bids(auction_id):
     """استرجاع جميع المزايدات لمزاد معين"""
     try:
@@ -40,7 +46,29 @@ def get_auction_bids(auction_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bid_bp.route('/auctions/<auction_id>/bids/series', methods=['GET'])
+def get_auction_bid_series(auction_id):
+    """منحنى السعر (OHLC لكل فترة) ومعدل المزايدات لمزاد من مخزن التحليلات دون قراءة جدول المزايدات"""
+    try:
+        bucket = request.args.get('bucket', 60, type=int)
+        if not bucket or bucket < 1:
+            return jsonify({'error': 'طول الفترة غير صالح'}), 400
+        try:
+            start = datetime.fromisoformat(request.args['from']) if 'from' in request.args else None
+            end = datetime.fromisoformat(request.args['to']) if 'to' in request.args else None
+        except ValueError:
+            return jsonify({'error': 'صيغة الوقت غير صالحة'}), 400
+        # الأوقات مخزنة بتوقيت UTC دون منطقة زمنية: 12:00+03:00 تصبح 09:00
+        start, end = (moment.astimezone(timezone.utc).replace(tzinfo=None) if moment and moment.tzinfo else moment
+                      for moment in (start, end))
+        return jsonify(auction_series(auction_id, bucket, start, end)), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bid_bp.route('/auctions/<auction_id>/bids/highest', methods=['GET'])
+@read_replica
 def get_highest_bid(auction_id):
     """استرجاع أعلى مزايدة لمزاد معين"""
     try:
@@ -93,6 +121,7 @@ def delete_bid(bid_id):
         return jsonify({'error': str(e)}), 500
 
 @bid_bp.route('/bids/search', methods=['GET'])
+@read_replica
 def search_bids():
     """البحث في المزايدات حسب رقم الهاتف أو الاسم"""
     try:
@@ -0,0 +1,36 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from src.routes.auth import token_required, role_required
+from src.services.analytics_export import TABLES, ARROW_STREAM_MIMETYPE, arrow_stream
+from datetime import datetime, timezone
+
+export_bp = Blueprint('export', __name__)
+
+@export_bp.route('/exports/<table>', methods=['GET'])
+@token_required
+@role_required('admin')
+def export_table(current_user, table):
+    """تدفق Arrow IPC لصفوف bids أو auctions أو orders ضمن [from, to) للتحليلات (للمدير فقط)
+
+    بديل لتحميل /api/bids كاملة بصيغة JSON: الصفوف تُقرأ بمؤشر على الخادم وتُرسل
+    دفعة بدفعة. Parquet يحتاج ملفاً كاملاً قبل قراءته، لذلك يُكتب عبر أمر
+    flask export-analytics بدلاً من هذا المسار.
+    """
+    if table not in TABLES:
+        return jsonify({'error': 'الجدول غير قابل للتصدير'}), 404
+    try:
+        since = datetime.fromisoformat(request.args['from']) if 'from' in request.args else None
+        until = datetime.fromisoformat(request.args['to']) if 'to' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'صيغة الوقت غير صالحة'}), 400
+    # الأوقات مخزنة بتوقيت UTC دون منطقة زمنية: 12:00+03:00 تصبح 09:00
+    since, until = (moment.astimezone(timezone.utc).replace(tzinfo=None) if moment and moment.tzinfo else moment
+                    for moment in (since, until))
+    # التحقق قبل إرسال الترويسات: الخطأ داخل التدفق يقطع الاستجابة بعد 200
+    if since is not None and until is not None and since >= until:
+        return jsonify({'error': 'بداية الفترة يجب أن تسبق نهايتها'}), 400
+
+    return Response(
+        stream_with_context(arrow_stream(table, since, until)),
+        mimetype=ARROW_STREAM_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename={table}.arrows'}
+    )
@@ -1,19 +1,36 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import insert, update, delete
 from src.models.user import db, User
 from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.models.ids import new_id
+from src.services.outbox import enqueue_notification, notification_outbox_rows
+from src.services.unread_counter import adjust_unread_counts, unread_deltas, get_unread_count
+from src.services.read_replicas import read_replica
+from collections import Counter
+from datetime import datetime
 
 notification_bp = Blueprint('notification', __name__)
 
 @notification_bp.route('/notifications', methods=['GET'])
+@read_replica
 def get_notifications():
     """استرجاع قائمة بجميع الإشعارات"""
     try:
-        notifications = Notification.query.order_by(Notification.created_at.desc()).all()
+        query = Notification.query.order_by(Notification.created_at.desc())
+        
+        # تحديد عدد النتائج اختيارياً حتى لا يتم تحميل السجل كاملاً
+        limit = request.args.get('limit', type=int)
+        if limit:
+            query = query.offset(request.args.get('offset', 0, type=int)).limit(limit)
+        
+        notifications = query.all()
         return jsonify([notification.to_dict() for notification in notifications]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @notification_bp.route('/notifications/<notification_id>', methods=['GET'])
+@read_replica
 def get_notification(notification_id):
     """استرجاع تفاصيل إشعار معين"""
     try:
@@ -52,6 +69,9 @@ def create_notification():
         )
         
         db.session.add(notification)
+        db.session.flush()
+        enqueue_notification(notification)
+        adjust_unread_counts({notification.user_id: 1})
         db.session.commit()
         
         return jsonify(notification.to_dict()), 201
@@ -59,6 +79,123 @@ def create_notification():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@notification_bp.route('/notifications/bulk', methods=['POST'])
+def create_notifications_bulk():
+    """إنشاء نفس الإشعار لمجموعة من المستخدمين بعملية إدراج واحدة"""
+    try:
+        data = request.get_json()
+        
+        # التحقق من البيانات المطلوبة
+        required_fields = ['type', 'title', 'message']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'الحقل {field} مطلوب'}), 400
+        
+        # تحديد المستلمين: قائمة معرفات أو فلتر على المستخدمين
+        if 'user_ids' in data:
+            query = db.select(User.id).where(User.id.in_(data['user_ids']))
+        elif 'user_filter' in data:
+            user_filter = data['user_filter']
+            query = db.select(User.id)
+            if 'subscription_plan' in user_filter:
+                query = query.where(User.subscription_plan == user_filter['subscription_plan'])
+            if 'is_active' in user_filter:
+                # bool("false") صحيح في بايثون: القيمة يجب أن تكون true أو false في JSON
+                if not isinstance(user_filter['is_active'], bool):
+                    return jsonify({'error': 'is_active يجب أن تكون true أو false'}), 400
+                query = query.where(User.is_active == user_filter['is_active'])
+        else:
+            return jsonify({'error': 'الحقل user_ids أو user_filter مطلوب'}), 400
+        
+        user_ids = db.session.execute(query).scalars().all()
+        
+        now = datetime.utcnow()
+        notification_rows = [{
+            'id': new_id(),
+            'user_id': user_id,
+            'type': data['type'],
+            'title': data['title'],
+            'message': data['message'],
+            'is_read': False,
+            'related_auction_id': data.get('related_auction_id'),
+            'related_order_id': data.get('related_order_id'),
+            'created_at': now
+        } for user_id in user_ids]
+        
+        if notification_rows:
+            db.session.execute(insert(Notification), notification_rows)
+            db.session.execute(insert(OutboxMessage), notification_outbox_rows(notification_rows))
+            adjust_unread_counts(Counter(user_ids))
+        db.session.commit()
+        
+        response = {'created_count': len(notification_rows)}
+        if 'user_ids' in data:
+            found = set(user_ids)
+            response['missing_user_ids'] = [user_id for user_id in data['user_ids'] if user_id not in found]
+        
+        return jsonify(response), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notification_bp.route('/notifications/read', methods=['PUT'])
+def mark_notifications_read_bulk():
+    """تحديد قائمة من الإشعارات كمقروءة بعملية تحديث واحدة"""
+    try:
+        data = request.get_json()
+        
+        if 'ids' not in data:
+            return jsonify({'error': 'الحقل ids مطلوب'}), 400
+        
+        deltas = unread_deltas(Notification.id.in_(data['ids']))
+        result = db.session.execute(
+            update(Notification)
+            .where(Notification.id.in_(data['ids']), Notification.is_read == False)
+            .values(is_read=True)
+        )
+        adjust_unread_counts(deltas)
+        db.session.commit()
+        
+        return jsonify({'updated_count': result.rowcount}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notification_bp.route('/notifications', methods=['DELETE'])
+def delete_notifications_bulk():
+    """حذف الإشعارات المطابقة لفلتر معين بعملية حذف واحدة"""
+    try:
+        data = request.get_json() or {}
+        
+        conditions = []
+        if 'ids' in data:
+            conditions.append(Notification.id.in_(data['ids']))
+        if 'user_id' in data:
+            conditions.append(Notification.user_id == data['user_id'])
+        if 'type' in data:
+            conditions.append(Notification.type == data['type'])
+        if 'is_read' in data:
+            # bool("false") صحيح في بايثون: القيمة يجب أن تكون true أو false في JSON
+            if not isinstance(data['is_read'], bool):
+                return jsonify({'error': 'is_read يجب أن تكون true أو false'}), 400
+            conditions.append(Notification.is_read == data['is_read'])
+        if 'before' in data:
+            conditions.append(Notification.created_at < datetime.fromisoformat(data['before']))
+        
+        # منع حذف جميع الإشعارات بالخطأ
+        if not conditions:
+            return jsonify({'error': 'يجب تحديد فلتر واحد على الأقل للحذف'}), 400
+        
+        deltas = unread_deltas(*conditions)
+        result = db.session.execute(delete(Notification).where(*conditions))
+        adjust_unread_counts(deltas)
+        db.session.commit()
+        
+        return jsonify({'deleted_count': result.rowcount}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @notification_bp.route('/notifications/<notification_id>/read', methods=['PUT'])
 def mark_notification_read(notification_id):
     """تحديد إشعار كمقروء"""
@@ -67,7 +204,9 @@ def mark_notification_read(notification_id):
         if not notification:
             return jsonify({'error': 'الإشعار غير موجود'}), 404
         
-        notification.is_read = True
+        if not notification.is_read:
+            notification.is_read = True
+            adjust_unread_counts({notification.user_id: -1})
         db.session.commit()
         
         return jsonify(notification.to_dict()), 200
@@ -84,6 +223,8 @@ def delete_notification(notification_id):
             return jsonify({'error': 'الإشعار غير موجود'}), 404
         
         db.session.delete(notification)
+        if not notification.is_read:
+            adjust_unread_counts({notification.user_id: -1})
         db.session.commit()
         
         return jsonify({'message': 'تم حذف الإشعار بنجاح'}), 200
@@ -92,6 +233,7 @@ def delete_notification(notification_id):
         return jsonify({'error': str(e)}), 500
 
 @notification_bp.route('/users/<user_id>/notifications', methods=['GET'])
+@read_replica
 def get_user_notifications(user_id):
     """استرجاع إشعارات مستخدم معين"""
     try:
@@ -107,15 +249,26 @@ def get_user_notifications(user_id):
             is_read_bool = is_read.lower() == 'true'
             query = query.filter_by(is_read=is_read_bool)
         
-        notifications = query.order_by(Notification.created_at.desc()).all()
+        query = query.order_by(Notification.created_at.desc())
+        limit = request.args.get('limit', type=int)
+        if limit:
+            query = query.offset(request.args.get('offset', 0, type=int)).limit(limit)
+        
+        notifications = query.all()
         return jsonify([notification.to_dict() for notification in notifications]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @notification_bp.route('/users/<user_id>/notifications/unread/count', methods=['GET'])
+@read_replica
 def get_unread_notifications_count(user_id):
     """استرجاع عدد الإشعارات غير المقروءة لمستخدم معين"""
     try:
+        # العداد محفوظ ومحدث تدريجياً، لذا القراءة بالمفتاح الأساسي فقط
+        count = get_unread_count(user_id)
+        if count is not None:
+            return jsonify({'unread_count': count}), 200
+        
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'المستخدم غير موجود'}), 404
@@ -135,6 +288,7 @@ def mark_all_notifications_read(user_id):
         
         # تحديث جميع الإشعارات غير المقروءة
         updated_count = Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+        adjust_unread_counts({user_id: -updated_count})
         db.session.commit()
         
         return jsonify({'message': f'تم تحديد {updated_count} إشعار كمقروء'}), 200
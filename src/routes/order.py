@@ -3,10 +3,14 @@ from src.models.user import db, User
 from src.models.order import Order
 from src.models.auction import Auction
 from src.models.bid import Bid
+from src.models.money import Money
+from src.services.idempotency import idempotent
+from src.services.read_replicas import read_replica
 
 order_bp = Blueprint('order', __name__)
 
 @order_bp.route('/orders', methods=['GET'])
+@read_replica
 def get_orders():
     """استرجاع قائمة بجميع الطلبات"""
     try:
@@ -16,6 +20,7 @@ def get_orders():
         return jsonify({'error': str(e)}), 500
 
 @order_bp.route('/orders/<order_id>', methods=['GET'])
+@read_replica
 def get_order(order_id):
     """استرجاع تفاصيل طلب معين"""
     try:
@@ -27,6 +32,7 @@ def get_order(order_id):
         return jsonify({'error': str(e)}), 500
 
 @order_bp.route('/orders', methods=['POST'])
+@idempotent('order')
 def create_order():
     """إنشاء طلب جديد من مزايدة فائزة"""
     try:
@@ -120,6 +126,7 @@ def delete_order(order_id):
         return jsonify({'error': str(e)}), 500
 
 @order_bp.route('/users/<user_id>/orders', methods=['GET'])
+@read_replica
 def get_user_orders(user_id):
     """استرجاع طلبات مستخدم معين"""
     try:
@@ -133,6 +140,7 @@ def get_user_orders(user_id):
         return jsonify({'error': str(e)}), 500
 
 @order_bp.route('/auctions/<auction_id>/orders', methods=['GET'])
+@read_replica
 def get_auction_orders(auction_id):
     """استرجاع طلبات مزاد معين"""
     try:
@@ -146,6 +154,7 @@ def get_auction_orders(auction_id):
         return jsonify({'error': str(e)}), 500
 
 @order_bp.route('/orders/manifest/<auction_id>', methods=['GET'])
+@read_replica
 def get_auction_manifest(auction_id):
     """إنشاء قائمة الطلبات النهائية لمزاد معين"""
     try:
@@ -160,7 +169,7 @@ def get_auction_manifest(auction_id):
             'auction_id': auction_id,
             'auction_status': auction.status,
             'total_orders': len(orders),
-            'total_value': sum(float(order.final_price) for order in orders),
+            'total_value': Money(sum(order.final_price for order in orders)).to_json(),
             'orders': [order.to_dict() for order in orders]
         }
         
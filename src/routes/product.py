@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User
 from src.models.product import Product
+from src.services.read_replicas import read_replica
 import uuid
 
 product_bp = Blueprint('product', __name__)
 
 @product_bp.route('/products', methods=['GET'])
+@read_replica
 def get_products():
     """استرجاع قائمة بجميع المنتجات"""
     try:
@@ -16,6 +18,7 @@ def get_products():
         return jsonify({'error': str(e)}), 500
 
 @product_bp.route('/products/<product_id>', methods=['GET'])
+@read_replica
 def get_product(product_id):
     """استرجاع تفاصيل منتج معين"""
     try:
@@ -109,6 +112,7 @@ def delete_product(product_id):
         return jsonify({'error': str(e)}), 500
 
 @product_bp.route('/users/<user_id>/products', methods=['GET'])
+@read_replica
 def get_user_products(user_id):
     """استرجاع منتجات مستخدم معين"""
     try:
@@ -87,8 +87,8 @@ def get_qr_info(auction_id):
             'auction_url': auction_url,
             'product_name': product.name,
             'product_description': product.description,
-            'starting_price': float(auction.starting_price),
-            'current_highest_bid': float(auction.current_highest_bid) if auction.current_highest_bid else None,
+            'starting_price': auction.starting_price.to_json(),
+            'current_highest_bid': auction.current_highest_bid.to_json() if auction.current_highest_bid is not None else None,
             'status': auction.status,
             'qr_download_url': f"/api/qr/auctions/{auction_id}/qr",
             'qr_base64_url': f"/api/qr/auctions/{auction_id}/qr?format=base64"
@@ -2,7 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from ..models.notification import Notification
 from ..models.user import db
-import json
+from ..services.outbox import enqueue_notification, notification_payload
+from ..services.unread_counter import adjust_unread_counts
+from ..services.read_replicas import read_replica
+from ..services.cooperative import async_mode
 from datetime import datetime
 
 realtime_bp = Blueprint('realtime', __name__)
@@ -12,7 +15,8 @@ socketio = None
 
 def init_socketio(app):
     global socketio
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode=app.config.get('ASYNC_MODE') or async_mode(),
+                        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'))
     
     @socketio.on('connect')
     def handle_connect():
@@ -61,24 +65,18 @@ def send_notification():
             user_id=data['user_id'],
             title=data['title'],
             message=data['message'],
-            type=data.get('type', 'info'),
-            data=json.dumps(data.get('data', {}))
+            type=data.get('type', 'info')
         )
         
         db.session.add(notification)
-        db.session.commit()
+        db.session.flush()
         
-        # إرسال الإشعار في الوقت الفعلي
-        notification_data = {
-            'id': notification.id,
-            'title': notification.title,
-            'message': notification.message,
-            'type': notification.type,
-            'created_at': notification.created_at.isoformat(),
-            'data': json.loads(notification.data) if notification.data else {}
-        }
+        # الإرسال الفعلي يتم عبر موزّع صندوق الصادر بعد نجاح المعاملة
+        enqueue_notification(notification, data.get('data', {}))
+        adjust_unread_counts({notification.user_id: 1})
+        db.session.commit()
         
-        send_notification_to_merchant(data['user_id'], notification_data)
+        notification_data = notification_payload(notification, data.get('data', {}))
         
         return jsonify({
             'success': True,
@@ -86,6 +84,7 @@ def send_notification():
         })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @realtime_bp.route('/notifications/broadcast', methods=['POST'])
@@ -120,6 +119,7 @@ def join_auction_room(auction_id):
         return jsonify({'error': str(e)}), 500
 
 @realtime_bp.route('/system/stats', methods=['GET'])
+@read_replica
 def get_system_stats():
     """إحصائيات النظام في الوقت الفعلي"""
     try:
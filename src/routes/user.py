@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.services.read_replicas import read_replica
+from src.services.merchant_rollups import merchant_dashboard, compute_merchant_dashboard, DEFAULT_DASHBOARD_DAYS
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/users', methods=['GET'])
+@read_replica
 def get_users():
     users = User.query.all()
     return jsonify([user.to_dict() for user in users])
@@ -18,6 +21,7 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
+@read_replica
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
@@ -37,3 +41,18 @@ def delete_user(user_id):
     db.session.delete(user)
     db.session.commit()
     return '', 204
+
+@user_bp.route('/users/<user_id>/dashboard', methods=['GET'])
+@read_replica
+def get_merchant_dashboard(user_id):
+    """ملخص لوحة التاجر: المنتجات حسب الحالة والمزادات النشطة والطلبات المعلقة والإيراد اليومي
+
+    يُقرأ من جداول الملخصات باستعلام واحد مهما كان حجم تاريخ التاجر.
+    """
+    days = min(max(request.args.get('days', DEFAULT_DASHBOARD_DAYS, type=int), 1), 366)
+    summary = merchant_dashboard(user_id, days)
+    if summary is None:
+        if not db.session.get(User, user_id):
+            return jsonify({'error': 'المستخدم غير موجود'}), 404
+        summary = compute_merchant_dashboard(user_id, days)
+    return jsonify(summary)
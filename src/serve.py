@@ -0,0 +1,141 @@
+"""مشغّل الإنتاج: عمال gunicorn مسبقة التحميل وإعادة تحميل الكود دون انقطاع
+
+    python -m src.serve start --workers 4                  # src بـ gevent
+    python -m src.serve start --mode threaded --workers 4  # src بخيوط gthread
+    python -m src.serve start --app legacy --workers 4     # app.py (خيوط فقط)
+    python -m src.serve reload                              # كود جديد دون إسقاط أي طلب
+    python -m src.serve stop                                # إيقاف بعد إنهاء الطلبات الجارية
+
+الإعدادات الأخرى من البيئة كما في gunicorn.conf.py (BIND, PIDFILE, LEADER_LOCK, ...).
+
+إعادة التحميل: USR2 يشغّل عملية رئيسية جديدة تحمّل الكود الجديد وتنسخ عمالها على
+نفس المقبس المفتوح، وبعد جاهزية عمالها تتلقى القديمة TERM فتتوقف عن القبول وتنهي
+طلباتها الجارية خلال GRACEFUL_TIMEOUT. قفل القيادة ينتقل لأحد العمال الجدد بعد
+خروج القائد القديم، فلا تعمل المهام المجدولة مرتين في أي لحظة.
+"""
+import argparse
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = {
+    ('src', 'gevent'): ('gevent', 'src.wsgi:app'),
+    ('src', 'threaded'): ('gthread', 'src.main:app'),
+    ('legacy', 'threaded'): ('gthread', 'app:app'),
+}
+
+
+def pidfile():
+    return os.environ.get('PIDFILE', os.path.join(tempfile.gettempdir(), 'bidflow-gunicorn.pid'))
+
+
+def read_pid(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def children(pid):
+    """العمليات الفرعية لـ pid (من /proc)"""
+    found = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # الحقل الرابع بعد اسم الأمر (الاسم بين قوسين وقد يحوي مسافات)
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            found.append(int(entry))
+    return found
+
+
+def start(args):
+    if (args.app, args.mode) not in TARGETS:
+        sys.exit('The legacy app only runs in threaded mode')
+    worker_class, target = TARGETS[(args.app, args.mode)]
+    env = dict(os.environ, WORKER_CLASS=worker_class)
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+    # السكربت وليس python -m gunicorn: USR2 يعيد تنفيذ sys.argv، و __main__.py داخل حزمة
+    # gunicorn يضع مجلدها أول sys.path فتحجب gunicorn/http مكتبة http القياسية
+    executable = shutil.which('gunicorn', path=os.pathsep.join([os.path.dirname(sys.executable), os.environ['PATH']]))
+    if executable is None:
+        sys.exit('gunicorn is not installed')
+    os.chdir(ROOT)
+    os.execve(executable, [executable, '-c', 'gunicorn.conf.py', target], env)
+
+
+def reload(args):
+    path = pidfile()
+    old = read_pid(path)
+    if old is None or not alive(old):
+        sys.exit(f'No running master in {path}')
+    expected = len(children(old))
+
+    # العملية الجديدة تكتب PIDFILE.2 حتى تخرج القديمة ثم تعيد تسميته إلى PIDFILE
+    os.kill(old, signal.SIGUSR2)
+    deadline = time.monotonic() + args.timeout
+    new = None
+    while time.monotonic() < deadline:
+        new = read_pid(path + '.2')
+        if new is not None and len(children(new)) >= expected:
+            break
+        time.sleep(0.2)
+    else:
+        # العملية الجديدة لم تجهز (خطأ في الكود الجديد مثلاً): القديمة تبقى تخدم
+        if new is not None and alive(new):
+            os.kill(new, signal.SIGTERM)
+        sys.exit('New master did not become ready; old master keeps serving')
+
+    os.kill(old, signal.SIGTERM)
+    print(f'Reloaded: master {old} -> {new} ({expected} workers)')
+
+
+def stop(args):
+    pid = read_pid(pidfile())
+    if pid is None or not alive(pid):
+        sys.exit('No running master')
+    os.kill(pid, signal.SIGTERM)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest='command', required=True)
+    start_parser = commands.add_parser('start')
+    start_parser.add_argument('--app', choices=('src', 'legacy'), default='src')
+    start_parser.add_argument('--mode', choices=('gevent', 'threaded'), default=None,
+                              help='افتراضياً gevent لـ src و threaded للتطبيق القديم')
+    start_parser.add_argument('--workers', type=int, default=None)
+    reload_parser = commands.add_parser('reload')
+    reload_parser.add_argument('--timeout', type=float, default=60, help='ثوانٍ لجاهزية العملية الجديدة')
+    commands.add_parser('stop')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        args.mode = args.mode or ('gevent' if args.app == 'src' else 'threaded')
+        start(args)
+    elif args.command == 'reload':
+        reload(args)
+    else:
+        stop(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import io
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import click
+import pyarrow as pa
+import pyarrow.dataset as ds
+from flask import current_app
+from sqlalchemy import and_, not_, or_, select
+
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.order import Order
+from src.models.ids import CompactId, min_id_at, time_ordered
+from src.models.money import MoneyType
+from src.services.bid_analytics import to_millis
+from src.services.read_replicas import next_replica
+
+DEFAULT_CHUNK_ROWS = 50000
+DEFAULT_SETTLE_SECONDS = 60  # لا تُصدّر صفوف أحدث من هذا حتى تنتهي المعاملات الجارية
+FORMATS = {'parquet': 'parquet', 'ipc': 'arrow'}
+WATERMARKS_FILE = '_watermarks.json'
+PARTITIONING = pa.schema([('date', pa.date32()), ('merchant_id', pa.string())])
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def _arrow_type(column_type):
+    # المبالغ أعداد صحيحة بالوحدة الصغرى كما في القاعدة، والمعرفات نصوص UUID
+    if isinstance(column_type, MoneyType):
+        return pa.int64()
+    if isinstance(column_type, CompactId):
+        return pa.string()
+    if isinstance(column_type, db.DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, db.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, db.Integer):
+        return pa.int64()
+    if isinstance(column_type, db.Float):
+        return pa.float64()
+    return pa.string()
+
+
+class ExportTable:
+    """جدول قابل للتصدير: أعمدته، وعمود التاجر، وعمود التاريخ للتقسيم، وعمود العلامة المائية
+
+    bids جدول إلحاقي فعلامته المائية هي المعرف (UUIDv7 مرتب بوقت الإنشاء، لأن
+    bid_time لمزايدات الوكيل القديمة الفائزة بالتساوي هو وقت تسجيل الوكيل لا
+    وقت إدراجها). المعرفات القديمة (uuid4) لا ترتيب زمني لها، فتُحدد بعمود
+    legacy (bid_time) بدلاً من المعرف. auctions و orders تتغير حالتها فعلامتها
+    updated_at، والصف المعدل يُصدّر مرة أخرى: آخر نسخة لكل id هي الحالية.
+    """
+
+    def __init__(self, model, merchant, date, watermark, join=None, legacy=None):
+        self.name = model.__tablename__
+        self.columns = list(model.__table__.columns)
+        self.merchant = merchant
+        self.date = date
+        self.watermark = watermark
+        self.join = join
+        self.legacy = legacy
+        self.schema = pa.schema([pa.field(column.name, _arrow_type(column.type)) for column in self.columns] + [
+            pa.field('merchant_id', pa.string()),
+            pa.field('date', pa.date32())
+        ])
+
+    def bound(self, moment):
+        if isinstance(self.watermark.type, CompactId):
+            return min_id_at(to_millis(moment))
+        return moment
+
+    def query(self, since, until):
+        query = select(*self.columns, self.merchant.label('merchant_id'), self.date.label('partition_date'))
+        if self.join is not None:
+            query = query.join(*self.join)
+        return query.where(self.window(since, until))
+
+    def window(self, since, until):
+        condition = self.watermark < self.bound(until)
+        if since is not None:
+            condition = and_(self.watermark >= self.bound(since), condition)
+        if self.legacy is None:
+            return condition
+        legacy = self.legacy < until
+        if since is not None:
+            legacy = and_(self.legacy >= since, legacy)
+        return or_(and_(time_ordered(self.watermark), condition), and_(not_(time_ordered(self.watermark)), legacy))
+
+
+TABLES = {
+    'bids': ExportTable(Bid, Auction.user_id, Bid.bid_time, Bid.id, join=(Auction, Auction.id == Bid.auction_id),
+                        legacy=Bid.bid_time),
+    'auctions': ExportTable(Auction, Auction.user_id, Auction.created_at, Auction.updated_at),
+    'orders': ExportTable(Order, Order.user_id, Order.created_at, Order.updated_at),
+}
+
+
+def _export_engine():
+    """نسخة قراءة إن وُجدت حتى لا يزاحم التصدير الطويل القاعدة الأساسية"""
+    return next_replica(current_app) or db.engine
+
+
+def record_batches(table, since=None, until=None, chunk_rows=None):
+    """صفوف الجدول ضمن [since, until) كدفعات Arrow بحجم chunk_rows، بمؤشر على الخادم
+
+    الصفوف لا تُحمّل كلها في الذاكرة: stream_results يفتح مؤشراً على الخادم
+    (server-side cursor في PostgreSQL و MySQL) ويُقرأ منه دفعة بعد أخرى. المحرك
+    والإعدادات تُحدد هنا لأن المولّد قد يُستهلك في خيط آخر خارج سياق التطبيق.
+    """
+    chunk_rows = chunk_rows or current_app.config.get('ANALYTICS_EXPORT_CHUNK_ROWS', DEFAULT_CHUNK_ROWS)
+    export = TABLES[table]
+    query = export.query(since, until or datetime.utcnow())
+    return _stream(_export_engine(), query, export.schema, chunk_rows)
+
+
+def _stream(engine, query, schema, chunk_rows):
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=chunk_rows).execute(query)
+        for rows in result.partitions(chunk_rows):
+            columns = list(zip(*rows))
+            arrays = [pa.array(values, type=field.type) for values, field in zip(columns[:-1], schema)]
+            arrays.append(pa.array(columns[-1], type=pa.timestamp('us')).cast(pa.date32()))
+            yield pa.RecordBatch.from_arrays(arrays, names=schema.names)
+
+
+def load_watermarks(directory):
+    path = os.path.join(directory, WATERMARKS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {table: datetime.fromisoformat(value) for table, value in json.load(f).items()}
+
+
+def _save_watermarks(directory, watermarks):
+    path = os.path.join(directory, WATERMARKS_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({table: value.isoformat() for table, value in watermarks.items()}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def export_tables(directory, tables=None, fmt='parquet', full=False, now=None):
+    """تصدير الجداول إلى ملفات Parquet أو Arrow IPC مقسمة حسب date و merchant_id
+
+    المسار: <directory>/<table>/date=YYYY-MM-DD/merchant_id=<id>/part-<run>-<n>.<ext>
+    كل تشغيل يصدّر الصفوف منذ العلامة المائية المحفوظة في <directory>/_watermarks.json
+    حتى (الآن - ANALYTICS_EXPORT_SETTLE_SECONDS)، ثم يحفظ العلامة الجديدة بعد اكتمال
+    الكتابة. إن فشل التشغيل تُعاد نفس الصفوف في المرة التالية (ولا تضيع).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt!r}')
+    settle = current_app.config.get('ANALYTICS_EXPORT_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+    until = (now or datetime.utcnow()) - timedelta(seconds=settle)
+    run = uuid.uuid4().hex[:12]
+    os.makedirs(directory, exist_ok=True)
+    watermarks = {} if full else load_watermarks(directory)
+
+    summary = {}
+    for table in tables or TABLES:
+        since = watermarks.get(table)
+        if since is not None and since >= until:
+            continue
+        rows = 0
+
+        def counted(batches):
+            nonlocal rows
+            for batch in batches:
+                rows += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            counted(record_batches(table, since, until)),
+            os.path.join(directory, table),
+            schema=TABLES[table].schema,
+            format=fmt,
+            partitioning=ds.partitioning(PARTITIONING, flavor='hive'),
+            basename_template=f'part-{run}-{{i}}.{FORMATS[fmt]}',
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        watermarks[table] = until
+        _save_watermarks(directory, watermarks)
+        summary[table] = {
+            'rows': rows,
+            'since': since.isoformat() if since else None,
+            'until': until.isoformat()
+        }
+    return summary
+
+
+def arrow_stream(table, since=None, until=None):
+    """الجدول كتدفق Arrow IPC (بايتات) يُرسل دفعة بدفعة دون تجميع الاستجابة في الذاكرة"""
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, TABLES[table].schema)
+    for batch in record_batches(table, since, until):
+        writer.write_batch(batch)
+        yield _drain(buffer)
+    writer.close()
+    yield _drain(buffer)
+
+
+def _drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def init_analytics_export(app):
+    """إعدادات التصدير وأمر CLI: flask export-analytics [--table bids] [--format ipc] [--full]"""
+    app.config.setdefault('ANALYTICS_EXPORT_DIR', os.path.join(app.instance_path, 'exports'))
+    app.config.setdefault('ANALYTICS_EXPORT_FORMAT', 'parquet')
+    app.config.setdefault('ANALYTICS_EXPORT_CHUNK_ROWS', DEFAULT_CHUNK_ROWS)
+    app.config.setdefault('ANALYTICS_EXPORT_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+
+    @app.cli.command('export-analytics')
+    @click.option('--table', 'tables', multiple=True, type=click.Choice(list(TABLES)))
+    @click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), default=None)
+    @click.option('--directory', default=None)
+    @click.option('--full', is_flag=True, help='تجاهل العلامات المائية وتصدير كل الصفوف')
+    def export_analytics(tables, fmt, directory, full):
+        summary = export_tables(
+            directory or app.config['ANALYTICS_EXPORT_DIR'],
+            tables=tables or None,
+            fmt=fmt or app.config['ANALYTICS_EXPORT_FORMAT'],
+            full=full
+        )
+        for table, result in summary.items():
+            click.echo(f"{table}: {result['rows']} rows [{result['since']}, {result['until']})")
@@ -0,0 +1,168 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from src.models.user import db
+from src.models.auction import Auction
+from src.services.deadlines import DeadlineIndex
+from src.services.outbox import outbox_row
+from src.services.bid_journal import materialize_pending
+from src.services.settlement import enqueue_settlement
+from src.services.merchant_rollups import RollupDeltas, adjust_merchant_rollups
+from src.services.workers import start_background, is_leader
+
+DEFAULT_SOFT_CLOSE_WINDOW = 120  # ثوانٍ: مزايدة في آخر هذه المدة تمدد المزاد
+DEFAULT_SOFT_CLOSE_EXTENSION = 120  # ثوانٍ
+MAX_IDLE = 30  # ثوانٍ: أقصى نوم للمؤقت عند خلو الفهرس
+DEFAULT_DEADLINE_RESCAN_INTERVAL = 5  # ثوانٍ: بحث القائد عن مواعيد سجلتها عمليات أخرى
+RETRY_DELAY = timedelta(seconds=1)
+
+_index = DeadlineIndex()
+_app = None
+_window = timedelta(seconds=DEFAULT_SOFT_CLOSE_WINDOW)
+_extension = timedelta(seconds=DEFAULT_SOFT_CLOSE_EXTENSION)
+
+
+def init_auction_lifecycle(app):
+    """تحميل مواعيد انتهاء المزادات النشطة وتشغيل مؤقت الإغلاق"""
+    global _app, _window, _extension
+    _app = app
+    app.config.setdefault('SOFT_CLOSE_WINDOW', DEFAULT_SOFT_CLOSE_WINDOW)
+    app.config.setdefault('SOFT_CLOSE_EXTENSION', DEFAULT_SOFT_CLOSE_EXTENSION)
+    app.config.setdefault('AUCTION_LIFECYCLE_ENABLED', True)
+    app.config.setdefault('DEADLINE_RESCAN_INTERVAL', DEFAULT_DEADLINE_RESCAN_INTERVAL)
+    _window = timedelta(seconds=app.config['SOFT_CLOSE_WINDOW'])
+    _extension = timedelta(seconds=app.config['SOFT_CLOSE_EXTENSION'])
+
+    if app.config['AUCTION_LIFECYCLE_ENABLED']:
+        start_background(_lifecycle_loop, 'auction-lifecycle', leader_only=True)
+
+
+def load_deadlines(until=None):
+    """إضافة المزادات النشطة ذات موعد انتهاء (حتى until إن أُعطي) إلى الفهرس"""
+    query = db.select(Auction.id, Auction.end_time).where(Auction.status == 'active', Auction.end_time != None)
+    if until is not None:
+        query = query.where(Auction.end_time <= until)
+    rows = db.session.execute(query).all()
+    for auction_id, end_time in rows:
+        _index.schedule(auction_id, end_time)
+    return len(rows)
+
+
+def track_deadline(auction_id, end_time):
+    # الفهرس يقرؤه مؤقت القائد وحده؛ مزادات العمال الآخرين يجدها بالبحث الدوري
+    if end_time is not None and is_leader():
+        _index.schedule(auction_id, end_time)
+
+
+def untrack_deadline(auction_id):
+    _index.discard(auction_id)
+
+
+def is_past_deadline(auction, now):
+    return auction.end_time is not None and auction.end_time <= now
+
+
+def soft_close_end_time(end_time, now):
+    """موعد الانتهاء الجديد لمزايدة في now داخل النافذة الأخيرة، أو None إن لم تمدد"""
+    if end_time is None or not _extension or end_time - now > _window:
+        return None
+    return end_time + _extension
+
+
+def extend_for_bid(auction, now):
+    """تمديد المزاد إذا وصلت المزايدة في النافذة الأخيرة (soft close)
+
+    يعيد موعد الانتهاء السابق عند التمديد، أو None.
+    """
+    extended = soft_close_end_time(auction.end_time, now)
+    if extended is None:
+        return None
+    previous = auction.end_time
+    auction.end_time = extended
+    return previous
+
+
+def extension_outbox_row(auction, previous_end_time):
+    """حدث تمديد المزاد لمتابعي غرفة المزاد"""
+    return outbox_row('auction_extended', f'auction_{auction.id}', {
+        'auction_id': auction.id,
+        'end_time': auction.end_time.isoformat(),
+        'previous_end_time': previous_end_time.isoformat(),
+        'extended_by': (auction.end_time - previous_end_time).total_seconds()
+    })
+
+
+def close_due_auctions(due, now=None):
+    """إنهاء المزادات المستحقة من الفهرس وإرسالها للتسوية
+
+    موعد القاعدة هو المرجع: المزاد الذي مُدد من عملية أخرى يعاد جدولته فقط.
+    مزايدات السجل المقبولة قبل now تُطبق أولاً فتصل تمديداتها للقاعدة، وما بعد
+    now يرفضه السجل نفسه للمزادات التي حان موعدها.
+    """
+    now = now or datetime.utcnow()
+    materialize_pending(wait=True)
+    rows = db.session.execute(
+        db.select(Auction.id, Auction.end_time, Auction.user_id)
+        .where(Auction.id.in_([key for key, _ in due]), Auction.status == 'active')
+    ).all()
+    closing = [auction_id for auction_id, end_time, _ in rows if end_time is not None and end_time <= now]
+    for auction_id, end_time, _ in rows:
+        if end_time is not None and end_time > now:
+            _index.schedule(auction_id, end_time)
+
+    if closing:
+        db.session.execute(
+            update(Auction)
+            .where(Auction.id.in_(closing), Auction.status == 'active', Auction.end_time <= now)
+            .values(status='ended', updated_at=now)
+        )
+        deltas = RollupDeltas()
+        for auction_id, end_time, user_id in rows:
+            if auction_id in closing:
+                deltas.auction(user_id, 'active', -1)
+        adjust_merchant_rollups(deltas)
+        db.session.commit()
+        for auction_id in closing:
+            enqueue_settlement(auction_id)
+    return closing
+
+
+def _lifecycle_loop():
+    """المؤقت: ينام حتى أقرب موعد انتهاء بالضبط ثم يغلق المزادات المستحقة
+
+    يعمل في القائد فقط، والمزادات التي أنشأها أو مددها عامل آخر لا تصل لفهرسه،
+    لذلك يبحث كل DEADLINE_RESCAN_INTERVAL في القاعدة عن المزادات التي تنتهي قبل
+    البحث التالي بهامش. موعد القاعدة هو المرجع دائماً عند الإغلاق.
+    """
+    interval = _app.config['DEADLINE_RESCAN_INTERVAL']
+    horizon = timedelta(seconds=2 * interval)
+    with _app.app_context():
+        load_deadlines()
+        db.session.remove()
+    next_scan = time.monotonic() + interval
+    while True:
+        due = _index.wait_due(timeout=max(min(MAX_IDLE, next_scan - time.monotonic()), 0))
+        if time.monotonic() >= next_scan:
+            next_scan = time.monotonic() + interval
+            with _app.app_context():
+                try:
+                    load_deadlines(until=datetime.utcnow() + horizon)
+                except Exception as e:
+                    print(f'Loading auction deadlines failed: {e}')
+                finally:
+                    db.session.remove()
+        if not due:
+            continue
+        with _app.app_context():
+            try:
+                close_due_auctions(due)
+            except Exception as e:
+                print(f'Closing auctions failed: {e}')
+                db.session.rollback()
+                retry_at = datetime.utcnow() + RETRY_DELAY
+                for auction_id, _ in due:
+                    _index.schedule(auction_id, retry_at)
+            finally:
+                db.session.remove()
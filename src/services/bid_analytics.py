@@ -0,0 +1,338 @@
+import fcntl
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.services.read_replicas import next_replica
+from src.services.workers import start_background
+
+DEFAULT_MAX_SERIES = 10000  # مزادات في الذاكرة قبل إخراج الأقل استخداماً
+DEFAULT_FLUSH_INTERVAL = 30  # ثوانٍ
+MAX_RATE_BUCKETS = 10000
+BACKFILL_OVERLAP_SECONDS = 5  # مزايدات حُفظت قبل التعبئة ولم تُسجل بعد تصل خلال هذه المدة
+LOCK_FILE = '.lock'
+EPOCH = datetime(1970, 1, 1)
+
+_app = None
+
+
+def to_millis(moment):
+    return int((moment - EPOCH) / timedelta(milliseconds=1))
+
+
+def from_millis(millis):
+    return EPOCH + timedelta(milliseconds=int(millis))
+
+
+class BidSeries:
+    """سلسلة مزايدات مزاد واحد بصيغة عمودية: مصفوفتا أوقات (ms) ومبالغ (وحدة صغرى) int64
+
+    الإضافة في نهاية مصفوفة تتضاعف سعتها عند الامتلاء (تكلفة ثابتة في المتوسط)، و16
+    بايتاً لكل مزايدة. المزايدات تصل غالباً بالترتيب، وإلا تُرتب مرة واحدة عند القراءة.
+    """
+
+    __slots__ = ('times', 'amounts', 'size', 'ordered', 'dirty', 'overlap', 'overlap_until', 'loaded_at')
+
+    def __init__(self, times=None, amounts=None):
+        self.times = np.asarray(times, dtype=np.int64) if times is not None else np.empty(16, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=np.int64) if amounts is not None else np.empty(16, dtype=np.int64)
+        self.size = 0 if times is None else len(times)
+        self.ordered = True
+        self.dirty = False
+        self.overlap = None
+        self.overlap_until = 0
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, times, amounts):
+        count = len(times)
+        needed = self.size + count
+        if needed > len(self.times):
+            capacity = max(needed, 2 * len(self.times))
+            self.times = np.resize(self.times, capacity)
+            self.amounts = np.resize(self.amounts, capacity)
+        end = self.size
+        self.times[end:needed] = times
+        self.amounts[end:needed] = amounts
+        if self.ordered and (end and self.times[end - 1] > self.times[end] or np.any(np.diff(times) < 0)):
+            self.ordered = False
+        self.size = needed
+        self.dirty = True
+
+    def view(self):
+        """الأوقات والمبالغ مرتبة زمنياً (بدون نسخ إذا كانت مرتبة)"""
+        if not self.ordered:
+            order = np.argsort(self.times[:self.size], kind='stable')
+            self.times[:self.size] = self.times[:self.size][order]
+            self.amounts[:self.size] = self.amounts[:self.size][order]
+            self.ordered = True
+        return self.times[:self.size], self.amounts[:self.size]
+
+    def without_overlap(self, times, amounts):
+        """حذف المزايدات التي جاءت في التعبئة من جدول bids ثم وصلت للتسجيل بعدها
+
+        record_bids يُستدعى بعد commit، فمزايدة حُفظت قبل استعلام التعبئة بلحظة قد
+        تُسجل مرة ثانية. لا تتكرر نفس (الوقت، المبلغ) في مزاد واحد لأن كل مزايدة
+        تتجاوز سابقتها، فالمطابقة بهما كافية.
+        """
+        if self.overlap is None:
+            return times, amounts
+        if time.monotonic() > self.overlap_until:
+            self.overlap = None
+            return times, amounts
+        kept = [(moment, amount) for moment, amount in zip(times, amounts) if (moment, amount) not in self.overlap]
+        return [moment for moment, _ in kept], [amount for _, amount in kept]
+
+
+def merge_series(times, amounts, other_times, other_amounts):
+    """اتحاد سلسلتين مرتب زمنياً دون تكرار نفس (الوقت، المبلغ)"""
+    times = np.concatenate((times, other_times))
+    amounts = np.concatenate((amounts, other_amounts))
+    order = np.lexsort((amounts, times))
+    times, amounts = times[order], amounts[order]
+    keep = np.concatenate(([True], (times[1:] != times[:-1]) | (amounts[1:] != amounts[:-1])))
+    return times[keep], amounts[keep]
+
+
+class BidSeriesStore:
+    """سلاسل المزايدات لكل مزاد في الذاكرة، مع حفظ اختياري في ملفات npz
+
+    القراءات التحليلية تأتي من هنا ولا تلمس جدول bids إلا مرة لكل مزاد غير موجود
+    في الذاكرة ولا على القرص: loader(auction_id) يعيد (الأوقات، المبالغ) من الجدول،
+    وإلا بدأت السلسلة من آخر تشغيل فقط. عند ضبط directory تُحفظ السلاسل المعدلة
+    دورياً وتُحمّل عند الحاجة، والحفظ يدمج مع الملف الموجود تحت قفل حتى لا تمحو
+    عملية (العمال القدامى أثناء إعادة التحميل مثلاً) مزايدات كتبتها أخرى.
+
+    مع max_age (عدة عمال، كل منهم يسجل مزايداته فقط) تُعاد تعبئة السلسلة من loader
+    عند قراءتها إذا مضى على تحميلها أكثر من max_age ثانية.
+    """
+
+    def __init__(self, directory=None, max_series=DEFAULT_MAX_SERIES, loader=None, max_age=None):
+        self.directory = directory
+        self.max_series = max_series
+        self.loader = loader
+        self.max_age = max_age
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._series)
+
+    def _path(self, auction_id):
+        # المعرف يأتي من مسار الطلب: أحرف وأرقام وشرطات فقط حتى لا يخرج عن المجلد
+        if not auction_id.replace('-', '').isalnum():
+            raise ValueError(f'Invalid auction id: {auction_id!r}')
+        return os.path.join(self.directory, f'{auction_id}.npz')
+
+    def _get(self, auction_id, create):
+        series = self._series.get(auction_id)
+        if series is None:
+            if self.directory and os.path.exists(self._path(auction_id)):
+                with np.load(self._path(auction_id)) as data:
+                    series = BidSeries(data['times'], data['amounts'])
+            elif self.loader is not None:
+                series = self._backfill(auction_id)
+            if series is None:
+                # لا مزاد بهذا المعرف في القاعدة (أو لا loader)
+                if not create:
+                    return None
+                series = BidSeries()
+            self._series[auction_id] = series
+            while len(self._series) > self.max_series:
+                evicted_id, evicted = self._series.popitem(last=False)
+                self._save(evicted_id, evicted)
+        self._series.move_to_end(auction_id)
+        return series
+
+    def _backfill(self, auction_id):
+        loaded = self.loader(auction_id)
+        if loaded is None:
+            return None
+        series = BidSeries(*loaded)
+        series.dirty = bool(len(series))
+        series.overlap = set(zip(series.times.tolist(), series.amounts.tolist()))
+        series.overlap_until = time.monotonic() + BACKFILL_OVERLAP_SECONDS
+        return series
+
+    def _save(self, auction_id, series):
+        if not self.directory or not series.dirty:
+            return
+        path = self._path(auction_id)
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            times, amounts = series.view()
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    times, amounts = merge_series(data['times'], data['amounts'], times, amounts)
+                series.times, series.amounts, series.size = times, amounts, len(times)
+            temporary = path + '.tmp.npz'
+            np.savez(temporary, times=times, amounts=amounts)
+            os.replace(temporary, path)
+        series.dirty = False
+
+    def record(self, events):
+        """إضافة مزايدات [(auction_id, bid_time, amount)] مجمّعة حسب المزاد"""
+        grouped = {}
+        for auction_id, bid_time, amount in events:
+            times, amounts = grouped.setdefault(auction_id, ([], []))
+            times.append(to_millis(bid_time))
+            amounts.append(int(amount))
+        with self._lock:
+            for auction_id, (times, amounts) in grouped.items():
+                series = self._get(auction_id, create=True)
+                times, amounts = series.without_overlap(times, amounts)
+                if times:
+                    series.extend(times, amounts)
+
+    def series(self, auction_id, start=None, end=None):
+        """نسخة من الأوقات والمبالغ ضمن [start, end) بالبحث الثنائي على الأوقات المرتبة"""
+        with self._lock:
+            series = self._get(auction_id, create=False)
+            if series is not None and self._expired(series):
+                refreshed = self._backfill(auction_id)
+                if refreshed is not None:
+                    series = self._series[auction_id] = refreshed
+            if series is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            times, amounts = series.view()
+            low = np.searchsorted(times, to_millis(start)) if start else 0
+            high = np.searchsorted(times, to_millis(end)) if end else len(times)
+            return times[low:high].copy(), amounts[low:high].copy()
+
+    def _expired(self, series):
+        return (self.max_age is not None and self.loader is not None
+                and time.monotonic() - series.loaded_at > self.max_age)
+
+    def flush(self):
+        with self._lock:
+            for auction_id, series in self._series.items():
+                self._save(auction_id, series)
+
+
+def ohlc(times, amounts, bucket_ms):
+    """افتتاح/أعلى/أدنى/إغلاق وعدد المزايدات لكل فترة غير فارغة، محسوبة بعمليات متجهة
+
+    الفترات محاذاة لمضاعفات bucket_ms من بداية epoch. المدخلات مرتبة زمنياً.
+    """
+    if not len(times):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty, empty
+    buckets = times // bucket_ms
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(times))
+    return (
+        buckets[starts] * bucket_ms,
+        amounts[starts],
+        np.maximum.reduceat(amounts, starts),
+        np.minimum.reduceat(amounts, starts),
+        amounts[ends - 1],
+        ends - starts
+    )
+
+
+def bid_rate(times, bucket_ms, start_ms, end_ms):
+    """عدد المزايدات في كل فترة من start_ms إلى end_ms بما فيها الفترات الفارغة"""
+    origin = start_ms // bucket_ms * bucket_ms
+    count = max((end_ms - origin + bucket_ms - 1) // bucket_ms, 0)
+    indexes = (times - origin) // bucket_ms
+    return origin, np.bincount(indexes[(indexes >= 0) & (indexes < count)], minlength=count)
+
+
+_store = BidSeriesStore()
+
+
+def init_bid_analytics(app):
+    """تجهيز مخزن السلاسل الزمنية، وحفظه دورياً إذا ضُبط BID_ANALYTICS_DIR
+
+    المخزن في ذاكرة كل عملية ويرى مزايداتها فقط. مع عدة عمال gunicorn يلزم ضبط
+    BID_ANALYTICS_MAX_AGE فتُعاد تعبئة كل سلسلة من القاعدة بعد هذه المدة (ثوانٍ).
+    """
+    global _app, _store
+    _app = app
+    app.config.setdefault('BID_ANALYTICS_DIR', None)
+    app.config.setdefault('BID_ANALYTICS_MAX_SERIES', DEFAULT_MAX_SERIES)
+    app.config.setdefault('BID_ANALYTICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    app.config.setdefault('BID_ANALYTICS_MAX_AGE', None)
+    _store = BidSeriesStore(app.config['BID_ANALYTICS_DIR'], app.config['BID_ANALYTICS_MAX_SERIES'],
+                            loader=_load_from_bids, max_age=app.config['BID_ANALYTICS_MAX_AGE'])
+
+    if app.config['BID_ANALYTICS_DIR']:
+        start_background(_flush_loop, 'bid-analytics-flush')
+
+
+def _load_from_bids(auction_id):
+    """مزايدات المزاد المحفوظة (قبل هذا التشغيل أو من عملية أخرى) لتعبئة سلسلة ناقصة
+
+    تُقرأ من نسخة قراءة إن وُجدت، ويُعاد None دون قراءة bids لمعرف لا مزاد له.
+    """
+    with (next_replica(_app) or db.engine).connect() as connection:
+        if connection.execute(db.select(Auction.id).where(Auction.id == auction_id)).first() is None:
+            return None
+        rows = connection.execute(
+            db.select(Bid.bid_time, Bid.bid_amount)
+            .where(Bid.auction_id == auction_id, Bid.bid_time.isnot(None))
+            .order_by(Bid.bid_time)
+        ).all()
+    return [to_millis(bid_time) for bid_time, _ in rows], [int(amount) for _, amount in rows]
+
+
+def record_bids(events):
+    """إضافة مزايدات محفوظة (بعد commit) إلى السلاسل: [(auction_id, bid_time, amount)]"""
+    if events:
+        _store.record(events)
+
+
+def auction_series(auction_id, bucket_seconds=60, start=None, end=None):
+    """سلسلة مزاد مختزلة: OHLC لكل فترة ومعدل المزايدات لكل فترة"""
+    times, amounts = _store.series(auction_id, start, end)
+    bucket_ms = bucket_seconds * 1000
+    opens_at, opens, highs, lows, closes, counts = ohlc(times, amounts, bucket_ms)
+    result = {
+        'auction_id': auction_id,
+        'bucket_seconds': bucket_seconds,
+        'total_bids': len(times),
+        'ohlc': [{
+            'time': from_millis(moment).isoformat(),
+            'open': int(first) / 100,
+            'high': int(high) / 100,
+            'low': int(low) / 100,
+            'close': int(last) / 100,
+            'bids': int(count)
+        } for moment, first, high, low, last, count in zip(opens_at, opens, highs, lows, closes, counts)],
+        'rate': None
+    }
+    if len(times):
+        start_ms = to_millis(start) if start else int(times[0])
+        end_ms = to_millis(end) if end else int(times[-1]) + 1
+        rate_bucket_ms = bucket_ms
+        # فترات أكبر للمعدل إذا كان المدى طويلاً حتى يبقى حجم الاستجابة محدوداً
+        while (end_ms - start_ms) // rate_bucket_ms > MAX_RATE_BUCKETS:
+            rate_bucket_ms *= 2
+        origin, rate = bid_rate(times, rate_bucket_ms, start_ms, end_ms)
+        result['rate'] = {
+            'start': from_millis(origin).isoformat(),
+            'bucket_seconds': rate_bucket_ms / 1000,
+            'bids': rate.tolist()
+        }
+    return result
+
+
+def _flush_loop():
+    interval = _app.config['BID_ANALYTICS_FLUSH_INTERVAL']
+
+    while True:
+        time.sleep(interval)
+        try:
+            _store.flush()
+        except Exception as e:
+            print(f'Bid analytics flush failed: {e}')
@@ -0,0 +1,71 @@
+from bisect import bisect_right
+
+from src.models.money import Money
+
+# سلم الزيادة الافتراضي: (من مبلغ، أقل زيادة) بالوحدة الكبرى
+DEFAULT_LADDER = [
+    ('0', '0.05'),
+    ('1', '0.25'),
+    ('5', '0.50'),
+    ('25', '1.00'),
+    ('100', '2.50'),
+    ('250', '5.00'),
+    ('500', '10.00'),
+    ('1000', '25.00'),
+    ('2500', '50.00'),
+    ('5000', '100.00'),
+]
+
+
+class IncrementLadder:
+    """سلم زيادات مجمّع مسبقاً: البحث عن درجة المبلغ بـ bisect في O(log k)"""
+
+    __slots__ = ('_thresholds', '_increments')
+
+    def __init__(self, steps):
+        compiled = sorted((Money.parse(start), Money.parse(step)) for start, step in steps)
+        if not compiled or compiled[0][0] > 0:
+            raise ValueError('Increment ladder must start at 0')
+        if any(step <= 0 for _, step in compiled):
+            raise ValueError('Increments must be positive')
+        self._thresholds = [start for start, _ in compiled]
+        self._increments = [step for _, step in compiled]
+
+    def increment(self, amount):
+        """أقل زيادة مسموحة فوق المبلغ الحالي"""
+        return self._increments[bisect_right(self._thresholds, amount) - 1]
+
+    def minimum_next(self, amount):
+        """أقل مبلغ مقبول للمزايدة التالية"""
+        return amount + self.increment(amount)
+
+
+_default = IncrementLadder(DEFAULT_LADDER)
+_by_category = {}
+_by_merchant = {}
+
+
+def init_bid_increments(app):
+    """تجميع سلالم الزيادة من الإعدادات
+
+    BID_INCREMENT_LADDERS = {
+        'default': [['0', '0.05'], ['25', '1.00'], ...],
+        'categories': {'electronics': [...]},
+        'merchants': {'<user_id>': [...]}
+    }
+    سلم التاجر يسبق سلم التصنيف، وكلاهما يسبق السلم الافتراضي.
+    """
+    global _default, _by_category, _by_merchant
+    app.config.setdefault('BID_INCREMENT_LADDERS', {})
+    ladders = app.config['BID_INCREMENT_LADDERS']
+    _default = IncrementLadder(ladders.get('default', DEFAULT_LADDER))
+    _by_category = {name: IncrementLadder(steps) for name, steps in ladders.get('categories', {}).items()}
+    _by_merchant = {str(user_id): IncrementLadder(steps) for user_id, steps in ladders.get('merchants', {}).items()}
+
+
+def ladder_for(merchant_id, category=None):
+    """سلم الزيادة للمزاد من الذاكرة فقط، بدون أي قراءة من القاعدة"""
+    ladder = _by_merchant.get(merchant_id)
+    if ladder is None and category:
+        ladder = _by_category.get(category)
+    return ladder or _default
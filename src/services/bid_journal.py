@@ -0,0 +1,447 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, update, bindparam, case
+
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.product import Product
+from src.models.bid import Bid
+from src.models.bid_journal import BidJournalCheckpoint
+from src.models.outbox import OutboxMessage
+from src.models.money import Money
+from src.services.bid_analytics import record_bids
+from src.services.bid_increments import ladder_for
+from src.services.workers import start_background
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024  # بايت
+DEFAULT_GROUP_COMMIT_WINDOW = 0.002  # ثوانٍ
+DEFAULT_SNAPSHOT_INTERVAL = 1.0  # ثوانٍ
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+
+
+class BidJournal:
+    """سجل مزايدات إلحاقي مقسم إلى ملفات segments مع تجميع fsync (group commit)
+
+    كل سجل سطر JSON يحمل رقماً تسلسلياً متزايداً. اسم كل segment هو أول رقم
+    تسلسلي فيه، لذلك يمكن حذف الملفات التي تم تطبيقها بالكامل دون قراءتها.
+    خيط واحد يكتب كل السجلات المتراكمة خلال نافذة قصيرة ثم ينفذ fsync واحداً
+    ويوقظ جميع الطلبات المنتظرة.
+    """
+
+    def __init__(self, directory, segment_size=DEFAULT_SEGMENT_SIZE,
+                 group_commit_window=DEFAULT_GROUP_COMMIT_WINDOW):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.group_commit_window = group_commit_window
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._buffer = []
+        self._last_seq = 0
+        self._durable_seq = 0
+        self._error = None
+        self._closed = False
+        self._segment = None
+        self._segment_bytes = 0
+        self._flusher_running = False
+        self._flusher_done = threading.Event()
+
+    @property
+    def durable_seq(self):
+        return self._durable_seq
+
+    def open(self):
+        """قراءة جميع السجلات الموجودة ثم فتح آخر segment للإلحاق
+
+        السطر الأخير غير المكتمل (توقف أثناء الكتابة) يتم قصه من الملف.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        records = []
+        segments = self._segment_paths()
+        for path in segments:
+            good_offset = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+                    good_offset += len(line)
+            if good_offset < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(good_offset)
+
+        self._last_seq = self._durable_seq = records[-1]['seq'] if records else 0
+        if segments and os.path.getsize(segments[-1]) < self.segment_size:
+            self._segment = open(segments[-1], 'ab')
+            self._segment_bytes = os.path.getsize(segments[-1])
+        else:
+            self._roll_segment(self._last_seq + 1)
+
+        # تحت gunicorn يبدأ الخيط في العامل بعد fork، وإلا بقي في العملية الرئيسية
+        # وانتظرت مزايدات العمال fsync لا يحدث أبداً
+        start_background(self._flush_loop, 'bid-journal-flusher')
+        return records
+
+    def append(self, record):
+        """إضافة سجل للمخزن المؤقت وإرجاعه مع رقمه التسلسلي دون انتظار الكتابة"""
+        with self._lock:
+            if self._error:
+                raise self._error
+            self._last_seq += 1
+            record = dict(record, seq=self._last_seq)
+            self._buffer.append(json.dumps(record, ensure_ascii=False) + '\n')
+            self._changed.notify_all()
+            return record
+
+    def wait_durable(self, seq):
+        """الانتظار حتى يُكتب السجل على القرص (بعد fsync)"""
+        with self._lock:
+            while self._durable_seq < seq and self._error is None:
+                self._changed.wait()
+            if self._durable_seq < seq:
+                raise self._error
+
+    def drop_segments_through(self, seq):
+        """حذف ملفات segments التي تم تطبيق كل سجلاتها (عدا الملف النشط)"""
+        segments = self._segment_paths()
+        for path, next_path in zip(segments, segments[1:]):
+            if self._first_seq(next_path) - 1 <= seq:
+                os.remove(path)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+            running = self._flusher_running
+        if running:
+            self._flusher_done.wait()
+        if self._segment:
+            self._segment.close()
+
+    def _flush_loop(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flusher_running = True
+        try:
+            self._flush()
+        finally:
+            self._flusher_done.set()
+
+    def _flush(self):
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._changed.wait()
+                if not self._buffer:
+                    return
+
+            # تجميع المزايدات المتزامنة في كتابة و fsync واحد
+            time.sleep(self.group_commit_window)
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                last_seq = self._last_seq
+
+            try:
+                if self._segment_bytes >= self.segment_size:
+                    self._roll_segment(self._durable_seq + 1)
+                data = ''.join(lines).encode('utf-8')
+                self._segment.write(data)
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+                self._segment_bytes += len(data)
+            except OSError as e:
+                with self._lock:
+                    self._error = e
+                    self._changed.notify_all()
+                return
+
+            with self._lock:
+                self._durable_seq = last_seq
+                self._changed.notify_all()
+
+    def _roll_segment(self, first_seq):
+        if self._segment:
+            self._segment.close()
+        path = os.path.join(self.directory, f'{SEGMENT_PREFIX}{first_seq:020d}{SEGMENT_SUFFIX}')
+        self._segment = open(path, 'ab')
+        self._segment_bytes = 0
+
+    def _segment_paths(self):
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def _first_seq(path):
+        return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+_app = None
+_journal = None
+_state_lock = threading.Lock()
+_materialize_lock = threading.Lock()  # تطبيق واحد على القاعدة في كل مرة
+_highest = {}  # معرف المزاد -> أعلى مبلغ مقبول في السجل
+_end_times = {}  # معرف المزاد -> موعد الانتهاء بعد تمديدات السجل التي لم تصل للقاعدة بالضرورة
+_pending = []  # سجلات لم تُطبق بعد على قاعدة البيانات
+
+
+def init_bid_journal(app):
+    """تفعيل سجل المزايدات إذا تم ضبط BID_JOURNAL_DIR، مع الاسترجاع من آخر نقطة تطبيق"""
+    global _app, _journal, _pending
+    app.config.setdefault('BID_JOURNAL_DIR', None)
+    app.config.setdefault('BID_JOURNAL_SEGMENT_SIZE', DEFAULT_SEGMENT_SIZE)
+    app.config.setdefault('BID_JOURNAL_GROUP_COMMIT_WINDOW', DEFAULT_GROUP_COMMIT_WINDOW)
+    app.config.setdefault('BID_JOURNAL_SNAPSHOT_INTERVAL', DEFAULT_SNAPSHOT_INTERVAL)
+    app.config.setdefault('BID_JOURNAL_SNAPSHOTS_ENABLED', True)
+    if not app.config['BID_JOURNAL_DIR']:
+        return
+
+    _app = app
+    _journal = BidJournal(
+        app.config['BID_JOURNAL_DIR'],
+        segment_size=app.config['BID_JOURNAL_SEGMENT_SIZE'],
+        group_commit_window=app.config['BID_JOURNAL_GROUP_COMMIT_WINDOW']
+    )
+    records = _journal.open()
+
+    with app.app_context():
+        checkpoint = db.session.get(BidJournalCheckpoint, 'bids')
+        last_seq = checkpoint.last_seq if checkpoint else 0
+        _pending = [record for record in records if record['seq'] > last_seq]
+        for record in _pending:
+            amount = Money.parse(record['bid_amount'])
+            _highest[record['auction_id']] = max(amount, _highest.get(record['auction_id'], amount))
+            if record.get('end_time'):
+                _end_times[record['auction_id']] = datetime.fromisoformat(record['end_time'])
+        materialize_pending()
+        db.session.remove()
+
+    if app.config['BID_JOURNAL_SNAPSHOTS_ENABLED']:
+        start_background(_snapshot_loop, 'bid-journal-snapshots')
+
+
+def shutdown_bid_journal():
+    """إيقاف السجل (للاختبارات وإعادة التشغيل)"""
+    global _journal, _pending
+    if _journal:
+        _journal.close()
+    _journal = None
+    _pending = []
+    _highest.clear()
+    _end_times.clear()
+
+
+def journal_enabled():
+    return _journal is not None
+
+
+def journal_bid(auction, bid, ladder):
+    """تسجيل مزايدة في السجل كمسار الكتابة الأساسي
+
+    النتيجة زوج (الحالة، القيمة) كما في submit_bid: ('accepted', موعد الانتهاء)
+    بعد أن تصبح المزايدة دائمة على القرص، أو ('too_low', أقل مبلغ مقبول) فوق أعلى
+    مزايدة بما فيها التي لم تُطبق بعد، أو ('inactive', None) بعد موعد الانتهاء.
+    وقت المزايدة وموعد الانتهاء يُحددان تحت القفل، وتمديد الإغلاق المرن يُحفظ مع السجل.
+    """
+    # auction_lifecycle تستورد هذه الوحدة عبر settlement
+    from src.services.auction_lifecycle import soft_close_end_time
+
+    amount = bid.bid_amount
+    floor = auction.current_highest_bid or auction.starting_price
+
+    with _state_lock:
+        now = datetime.utcnow()
+        end_time = _end_times.get(auction.id, auction.end_time)
+        if end_time is not None and end_time <= now:
+            return 'inactive', None
+        current = max(floor, _highest.get(auction.id, floor))
+        minimum = ladder.minimum_next(current)
+        if amount < minimum:
+            return 'too_low', minimum
+
+        bid.bid_time = now
+        record = {
+            'id': bid.id,
+            'auction_id': bid.auction_id,
+            'bidder_name': bid.bidder_name,
+            'bidder_phone': bid.bidder_phone,
+            'bid_amount': str(amount),
+            'bid_time': now.isoformat(),
+            'ip_address': bid.ip_address,
+            'user_agent': bid.user_agent
+        }
+        extended = soft_close_end_time(end_time, now)
+        if extended is not None:
+            record['previous_end_time'] = end_time.isoformat()
+            record['end_time'] = extended.isoformat()
+            _end_times[auction.id] = end_time = extended
+        _highest[auction.id] = amount
+        record = _journal.append(record)
+        _pending.append(record)
+
+    _journal.wait_durable(record['seq'])
+    return 'accepted', end_time
+
+
+def close_journal_auctions(auction_ids):
+    """إيقاف قبول مزايدات السجل لمزادات تُنهى يدوياً قبل موعدها
+
+    بعدها يطبق المستدعي المزايدات المقبولة بـ materialize_pending(wait=True) ثم يحدد الفائز.
+    """
+    if _journal is None:
+        return
+    now = datetime.utcnow()
+    with _state_lock:
+        for auction_id in auction_ids:
+            _end_times[auction_id] = now
+
+
+def materialize_pending(wait=False):
+    """تطبيق السجلات الدائمة على جدولي bids و auctions مع حفظ نقطة التطبيق
+
+    إدراج المزايدات وتحديث المزادات (مع تمديدات الإغلاق المرن) وأحداث bid_update و
+    auction_extended في صندوق الصادر ونقطة التطبيق تتم في معاملة واحدة، لذلك
+    إعادة التشغيل بعد أي توقف تكمل من آخر نقطة دون تكرار. حلقة اللقطات وعامل
+    التسوية يستدعيانها معاً، فتُنفذ كلها تحت _materialize_lock وإلا أدرج كلاهما
+    نفس الدفعة (IntegrityError) أو زاد total_bids مرتين.
+
+    مع wait=True تنتظر أولاً حتى تصبح كل المزايدات المقبولة حتى الآن دائمة، كي
+    يراها من يغلق المزاد قبل تحديد الفائز.
+    """
+    from src.services.bid_writer import bid_update_row
+    from src.services.auction_lifecycle import extension_outbox_row, track_deadline
+
+    global _pending
+    if _journal is None:
+        return 0
+
+    with _materialize_lock:
+        if wait:
+            with _state_lock:
+                last_seq = _pending[-1]['seq'] if _pending else 0
+            _journal.wait_durable(last_seq)
+        with _state_lock:
+            durable_seq = _journal.durable_seq
+            batch = [record for record in _pending if record['seq'] <= durable_seq]
+        if not batch:
+            return 0
+
+        try:
+            existing = set(db.session.execute(
+                db.select(Bid.id).where(Bid.id.in_([record['id'] for record in batch]))
+            ).scalars())
+            rows = [{
+                'id': record['id'],
+                'auction_id': record['auction_id'],
+                'bidder_name': record['bidder_name'],
+                'bidder_phone': record['bidder_phone'],
+                'bid_amount': Money.parse(record['bid_amount']),
+                'is_winning_bid': False,
+                'bid_time': datetime.fromisoformat(record['bid_time']),
+                'ip_address': record['ip_address'],
+                'user_agent': record['user_agent']
+            } for record in batch if record['id'] not in existing]
+
+            totals = {}
+            for row in rows:
+                count, highest = totals.get(row['auction_id'], (0, row['bid_amount']))
+                totals[row['auction_id']] = (count + 1, max(highest, row['bid_amount']))
+
+            extensions = {}  # معرف المزاد -> (أول موعد قبل التمديد، آخر موعد بعده)
+            deadlines = {}
+            for record in batch:
+                if record.get('end_time') and record['id'] not in existing:
+                    previous, _ = extensions.get(record['auction_id'], (record['previous_end_time'], None))
+                    extensions[record['auction_id']] = (previous, record['end_time'])
+
+            if rows:
+                db.session.execute(insert(Bid), rows)
+                highest = bindparam('highest', type_=Auction.current_highest_bid.type)
+                db.session.execute(
+                    update(Auction.__table__)
+                    .where(Auction.id == bindparam('auction_id'))
+                    .values(
+                        total_bids=db.func.coalesce(Auction.total_bids, 0) + bindparam('count'),
+                        current_highest_bid=case(
+                            (Auction.current_highest_bid == None, highest),
+                            (Auction.current_highest_bid < highest, highest),
+                            else_=Auction.current_highest_bid
+                        ),
+                        updated_at=datetime.utcnow()
+                    ),
+                    [{'auction_id': auction_id, 'count': count, 'highest': value}
+                     for auction_id, (count, value) in totals.items()]
+                )
+                if extensions:
+                    db.session.execute(
+                        update(Auction.__table__)
+                        .where(Auction.id == bindparam('auction_id'),
+                               Auction.end_time < bindparam('new_end_time'))
+                        .values(end_time=bindparam('new_end_time')),
+                        [{'auction_id': auction_id, 'new_end_time': datetime.fromisoformat(end_time)}
+                         for auction_id, (_, end_time) in extensions.items()]
+                    )
+
+                # حالة المزادات بعد التحديث لأحداث غرفة المزاد
+                auctions = {}
+                for auction, category in db.session.execute(
+                    db.select(Auction, Product.category)
+                    .outerjoin(Product, Product.id == Auction.product_id)
+                    .where(Auction.id.in_(totals))
+                    .execution_options(populate_existing=True)
+                ):
+                    auctions[auction.id] = (auction, ladder_for(auction.user_id, category))
+                latest = {row['auction_id']: row for row in rows}
+                db.session.execute(insert(OutboxMessage), [
+                    bid_update_row(auction, Bid(**latest[auction_id]), ladder)
+                    for auction_id, (auction, ladder) in auctions.items()
+                ] + [
+                    extension_outbox_row(auctions[auction_id][0], datetime.fromisoformat(previous))
+                    for auction_id, (previous, _) in extensions.items() if auction_id in auctions
+                ])
+                deadlines = {auction_id: auctions[auction_id][0].end_time
+                             for auction_id in extensions if auction_id in auctions}
+
+            checkpoint = db.session.get(BidJournalCheckpoint, 'bids')
+            if checkpoint is None:
+                checkpoint = BidJournalCheckpoint(name='bids')
+                db.session.add(checkpoint)
+            checkpoint.last_seq = batch[-1]['seq']
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for auction_id, end_time in deadlines.items():
+            track_deadline(auction_id, end_time)
+        record_bids([(row['auction_id'], row['bid_time'], row['bid_amount']) for row in rows])
+        last_seq = batch[-1]['seq']
+        with _state_lock:
+            _pending = [record for record in _pending if record['seq'] > last_seq]
+        _journal.drop_segments_through(last_seq)
+        return len(batch)
+
+
+def _snapshot_loop():
+    """تطبيق السجلات المتراكمة على قاعدة البيانات بشكل دوري"""
+    journal = _journal
+    interval = _app.config['BID_JOURNAL_SNAPSHOT_INTERVAL']
+
+    while _journal is journal:
+        time.sleep(interval)
+        with _app.app_context():
+            try:
+                materialize_pending()
+            except Exception as e:
+                print(f'Bid journal snapshot failed: {e}')
+            finally:
+                db.session.remove()
@@ -0,0 +1,31 @@
+"""إضافة عمود priority_time لجدول bids في القواعد المنشأة قبله
+
+create_all لا يضيف أعمدة لجداول موجودة. العمود فارغ للمزايدات الحالية فيُرتب
+الفائز بـ bid_time كما كان؛ مزايدات الوكيل القديمة الفائزة بالتساوي حُفظ فيها
+وقت التسجيل في bid_time نفسه.
+
+التشغيل يدوياً على قاعدة بيانات:
+    python -m src.services.bid_priority_migration sqlite:///src/database/app.db
+"""
+import sys
+
+from sqlalchemy import DateTime, create_engine, inspect, text
+
+
+def migrate_bid_priority(engine):
+    """إضافة العمود إن لم يوجد؛ آمن لإعادة التشغيل. يعيد True إذا أُضيف"""
+    inspector = inspect(engine)
+    if 'bids' not in inspector.get_table_names():
+        return False
+    if any(column['name'] == 'priority_time' for column in inspector.get_columns('bids')):
+        return False
+    column_type = DateTime().compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE bids ADD COLUMN priority_time {column_type}'))
+    return True
+
+
+if __name__ == '__main__':
+    url = sys.argv[1] if len(sys.argv) > 1 else 'sqlite:///src/database/app.db'
+    added = migrate_bid_priority(create_engine(url))
+    print('Added bids.priority_time' if added else 'bids.priority_time already exists')
@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.product import Product
+from src.models.bid import Bid
+from src.models.outbox import OutboxMessage
+from src.models.money import Money
+from src.services.outbox import outbox_row
+from src.services.proxy_bidding import apply_bid, register_proxy, current_leader, reset_proxy_books
+from src.services.bid_increments import ladder_for
+from src.services.bid_analytics import record_bids
+from src.services.auction_lifecycle import (is_past_deadline, extend_for_bid, extension_outbox_row,
+                                            track_deadline)
+from src.services.write_batcher import WriteBatcher
+
+_batcher = None
+
+
+def init_bid_writer(app):
+    """تهيئة مجمّع كتابة المزايدات (group commit) للتطبيق"""
+    global _batcher
+    app.config.setdefault('BID_BATCHING_ENABLED', True)
+    app.config.setdefault('BID_BATCH_MAX_SIZE', 256)
+    app.config.setdefault('BID_BATCH_MAX_WAIT', 0.003)
+
+    def process_batch(items):
+        with app.app_context():
+            try:
+                return write_bids(items)
+            finally:
+                db.session.remove()
+
+    _batcher = WriteBatcher(
+        process_batch,
+        max_batch=app.config['BID_BATCH_MAX_SIZE'],
+        max_wait=app.config['BID_BATCH_MAX_WAIT'],
+        name='bid-writer',
+        enabled=app.config['BID_BATCHING_ENABLED']
+    )
+
+
+def submit_bid(item):
+    """إرسال مزايدة (أو مزايدة آلية إذا احتوت max_amount) للكاتب وانتظار النتيجة
+
+    النتيجة زوج (الحالة، القيمة): ('accepted', dict) أو
+    ('too_low', أقل مبلغ مقبول) أو ('inactive', None).
+    """
+    if _batcher is None:
+        return write_bids([item])[0]
+    return _batcher.submit(item)
+
+
+def write_bids(items):
+    """كتابة دفعة مزايدات في معاملة واحدة
+
+    التحقق من حالة المزاد وأعلى مبلغ يُعاد داخل المعاملة وبترتيب الوصول،
+    لأن مزايدات أخرى في نفس الدفعة قد ترفع السعر. ردود المزايدات الآلية
+    تُحفظ في نفس المعاملة، ويُضاف تحديث bid_update واحد لكل مزاد تغير سعره.
+    المزايدة بعد موعد الانتهاء مرفوضة، والمزايدة في النافذة الأخيرة تمدد المزاد.
+    أقل زيادة تأتي من سلم الزيادات في الذاكرة؛ تصنيف المنتج يُقرأ مع المزاد في نفس الاستعلام.
+    """
+    now = datetime.utcnow()
+    try:
+        auctions = {}
+        ladders = {}
+        for auction, category in db.session.execute(
+            db.select(Auction, Product.category)
+            .outerjoin(Product, Product.id == Auction.product_id)
+            .where(Auction.id.in_({item['auction_id'] for item in items}))
+        ):
+            auctions[auction.id] = auction
+            ladders[auction.id] = ladder_for(auction.user_id, category)
+
+        results = []
+        latest = {}  # آخر مزايدة ظاهرة لكل مزاد في الدفعة
+        persisted = []  # كل المزايدات الظاهرة المحفوظة (يدوية وآلية)
+        extended = {}  # موعد الانتهاء الأصلي للمزادات الممددة
+        for item in items:
+            auction = auctions.get(item['auction_id'])
+            if not auction or auction.status != 'active' or is_past_deadline(auction, now):
+                results.append(('inactive', None))
+                continue
+
+            ladder = ladders[auction.id]
+            if 'max_amount' in item:
+                proxy, value = register_proxy(auction, item, now, ladder)
+                if proxy is None:
+                    results.append(('too_low', value))
+                    continue
+                results.append(('accepted', (proxy, auction)))
+                bids = value
+            else:
+                # المبالغ بالوحدة الصغرى فالمقارنة مقارنة أعداد صحيحة
+                item['bid_amount'] = Money.parse(item['bid_amount'])
+                minimum = ladder.minimum_next(auction.current_highest_bid or auction.starting_price)
+                if item['bid_amount'] < minimum:
+                    results.append(('too_low', minimum))
+                    continue
+
+                bid = Bid(**item)
+                db.session.add(bid)
+                auction.total_bids = (auction.total_bids or 0) + 1
+                results.append(('accepted', (bid, auction)))
+                bids = [bid] + apply_bid(auction, item['bidder_phone'], item['bid_amount'], now, ladder)
+
+            if bids:
+                persisted.extend(bids)
+                latest[auction.id] = bids[-1]
+                previous_end_time = extend_for_bid(auction, now)
+                if previous_end_time is not None:
+                    extended.setdefault(auction.id, previous_end_time)
+
+        # flush لتوليد المعرفات والأوقات قبل commit حتى لا تُعاد قراءة كل مزايدة بعده
+        db.session.flush()
+        events = [(bid.auction_id, bid.bid_time, bid.bid_amount) for bid in persisted]
+        results = [
+            (status, _accepted(value[0], value[1], ladders[value[1].id]) if status == 'accepted' else value)
+            for status, value in results
+        ]
+        if latest:
+            db.session.execute(insert(OutboxMessage), [
+                bid_update_row(auctions[auction_id], bid, ladders[auction_id]) for auction_id, bid in latest.items()
+            ] + [
+                extension_outbox_row(auctions[auction_id], previous) for auction_id, previous in extended.items()
+            ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # حالة المزايدات الآلية في الذاكرة قد لا تطابق القاعدة بعد التراجع
+        reset_proxy_books()
+        raise
+
+    for auction_id in extended:
+        track_deadline(auction_id, auctions[auction_id].end_time)
+    record_bids(events)
+    return results
+
+
+def _accepted(value, auction, ladder):
+    """نتيجة القبول: المزايدة (أو المزايدة الآلية) مع السعر الحالي بعد ردود المزايدات الآلية"""
+    result = value.to_dict() if isinstance(value, Bid) else {'proxy': value.to_dict()}
+    result['current_highest_bid'] = auction.current_highest_bid.to_json()
+    result['minimum_next_bid'] = ladder.minimum_next(auction.current_highest_bid).to_json()
+    result['is_leading'] = current_leader(auction.id) == value.bidder_phone
+    result['end_time'] = auction.end_time.isoformat() if auction.end_time else None
+    return result
+
+
+def bid_update_row(auction, bid, ladder):
+    """حدث bid_update لغرفة المزاد بآخر مزايدة وحالته بعدها (يستخدمه سجل المزايدات أيضاً)"""
+    return outbox_row('bid_update', f'auction_{auction.id}', {
+        'auction_id': auction.id,
+        'bid_data': {
+            'id': bid.id,
+            'bidder_name': bid.bidder_name,
+            'bid_amount': bid.bid_amount.to_json(),
+            'bid_time': bid.bid_time.isoformat() if bid.bid_time else None,
+            'current_highest_bid': auction.current_highest_bid.to_json(),
+            'minimum_next_bid': ladder.minimum_next(auction.current_highest_bid).to_json(),
+            'total_bids': auction.total_bids,
+            'end_time': auction.end_time.isoformat() if auction.end_time else None
+        }
+    })
@@ -0,0 +1,76 @@
+DEFAULT_POOL_SIZE = 20
+DEFAULT_POOL_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 30  # ثوانٍ ينتظرها الطلب اتصالاً حراً قبل الخطأ
+
+
+def gevent_patched():
+    """هل رُقعت المكتبة القياسية بـ gevent قبل استيراد التطبيق (src/wsgi.py أو عامل gunicorn)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+def async_mode():
+    """وضع Socket.IO المطابق للعملية: gevent بعد الترقيع وإلا threading
+
+    يُمرر صراحة لأن Flask-SocketIO يختار gevent تلقائياً بمجرد تثبيته حتى
+    دون ترقيع، فيعمل خادم التطوير بخيوط حقيقية وحلقة gevent معاً.
+    """
+    return 'gevent' if gevent_patched() else 'threading'
+
+
+def _gevent_wait_callback(connection, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(connection.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(connection.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f'Bad result from poll: {state!r}')
+
+
+def patch_database_drivers():
+    """جعل psycopg2 ينتظر الشبكة عبر gevent بدلاً من حجب العملية كلها
+
+    الترقيع لا يصل لمقابس libpq لأنها في C؛ دالة الانتظار تنقل كل انتظار إلى
+    حلقة gevent فتعمل الطلبات الأخرى أثناء الاستعلام. psycopg 3 يدعم gevent
+    بنفسه، و sqlite3 يبقى حاجباً (استعلامات محلية قصيرة، للتطوير فقط).
+    """
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return False
+    extensions.set_wait_callback(_gevent_wait_callback)
+    return True
+
+
+def init_cooperative(app):
+    """إعداد مجمع الاتصالات لوضع gevent؛ يُستدعى قبل db.init_app و init_read_replicas
+
+    كل طلب (وكل اتصال long-polling) greenlet، فآلاف الطلبات المتزامنة تتشارك
+    DB_POOL_SIZE + DB_POOL_OVERFLOW اتصالاً فقط: من لا يجد اتصالاً ينتظر في
+    QueuePool على قفل مرقّع، أي انتظاراً تعاونياً لا يوقف بقية الطلبات. في وضع
+    الخيوط يبقى إعداد المجمع الافتراضي كما هو.
+    """
+    app.config.setdefault('ASYNC_MODE', async_mode())
+    if app.config['ASYNC_MODE'] != 'gevent':
+        return
+    app.config.setdefault('DB_POOL_SIZE', DEFAULT_POOL_SIZE)
+    app.config.setdefault('DB_POOL_OVERFLOW', DEFAULT_POOL_OVERFLOW)
+    app.config.setdefault('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)
+    if ':memory:' in app.config.get('SQLALCHEMY_DATABASE_URI', ''):
+        return  # SQLite في الذاكرة اتصال واحد (StaticPool) بلا مجمع
+
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', app.config['DB_POOL_OVERFLOW'])
+    options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+    patch_database_drivers()
@@ -0,0 +1,77 @@
+import heapq
+import threading
+from datetime import datetime
+
+
+class DeadlineIndex:
+    """فهرس مواعيد انتهاء في الذاكرة: كومة صغرى (min-heap) مع إلغاء كسول
+
+    تغيير موعد مفتاح (تمديد مزاد مثلاً) يضيف إدخالاً جديداً فقط ويصبح القديم
+    غير صالح، فلا حاجة لإعادة فحص كل المزادات. wait_due تنام حتى أقرب موعد
+    بالضبط وتستيقظ مبكراً إذا أضيف موعد أقرب. الأوقات بتوقيت UTC بدون منطقة.
+    """
+
+    def __init__(self, clock=datetime.utcnow):
+        self._clock = clock
+        self._heap = []
+        self._deadlines = {}
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def deadline(self, key):
+        return self._deadlines.get(key)
+
+    def schedule(self, key, when):
+        """تعيين (أو تغيير) موعد انتهاء مفتاح"""
+        with self._condition:
+            if self._deadlines.get(key) == when:
+                return
+            self._deadlines[key] = when
+            heapq.heappush(self._heap, (when, key))
+            if self._heap[0][1] == key:
+                self._condition.notify_all()
+
+    def discard(self, key):
+        with self._condition:
+            self._deadlines.pop(key, None)
+
+    def _prune(self):
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_deadline(self):
+        with self._condition:
+            self._prune()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """إزالة وإرجاع كل المفاتيح التي حان موعدها بالترتيب [(key, when)]"""
+        now = now or self._clock()
+        due = []
+        with self._condition:
+            self._prune()
+            while self._heap and self._heap[0][0] <= now:
+                when, key = heapq.heappop(self._heap)
+                del self._deadlines[key]
+                due.append((key, when))
+                self._prune()
+        return due
+
+    def wait_due(self, timeout=None):
+        """الانتظار حتى يحين أقرب موعد (أو انتهاء المهلة) ثم إرجاع المفاتيح المستحقة"""
+        with self._condition:
+            self._prune()
+            now = self._clock()
+            wait = timeout
+            if self._heap:
+                until_next = max((self._heap[0][0] - now).total_seconds(), 0)
+                wait = until_next if wait is None else min(wait, until_next)
+            if wait is None or wait > 0:
+                self._condition.wait(wait)
+        return self.pop_due()
@@ -0,0 +1,110 @@
+"""ترحيل المعرفات القديمة (نص UUID بطول 36) إلى صيغة CompactId الثنائية
+
+التشغيل يدوياً على قاعدة بيانات:
+    python -m src.services.id_migration sqlite:///src/database/app.db
+"""
+import sys
+import uuid
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.models.user import db
+from src.models.ids import CompactId
+
+BATCH_SIZE = 5000
+
+
+def compact_id_columns(metadata=None):
+    """جميع أعمدة المعرفات (أساسية وأجنبية) من نوع CompactId لكل جدول"""
+    metadata = metadata or db.metadata
+    return {
+        table.name: [column.name for column in table.columns if isinstance(column.type, CompactId)]
+        for table in metadata.sorted_tables
+        if any(isinstance(column.type, CompactId) for column in table.columns)
+    }
+
+
+def migrate_legacy_ids(engine):
+    """تحويل كل المعرفات المخزنة كنص إلى الصيغة المضغوطة؛ آمن لإعادة التشغيل
+
+    يعيد عدد القيم التي تم تحويلها.
+    """
+    if engine.dialect.name == 'postgresql':
+        return _migrate_postgresql(engine)
+    return _migrate_sqlite(engine)
+
+
+def _migrate_sqlite(engine):
+    """دفعات بحسب rowid (keyset) مع commit لكل دفعة
+
+    لا تُحمّل كل الصفوف في الذاكرة ولا يُقفل الملف في معاملة واحدة طويلة، وإن
+    توقف الترحيل أكمل التشغيل التالي من الصفوف التي بقيت نصاً.
+    """
+    converted = 0
+    existing_tables = set(inspect(engine).get_table_names())
+    for table, columns in compact_id_columns().items():
+        if table not in existing_tables:
+            continue
+        for column in columns:
+            after = 0
+            while True:
+                with engine.begin() as conn:
+                    rows = conn.execute(text(
+                        f'SELECT rowid, "{column}" FROM "{table}" '
+                        f'WHERE rowid > :after AND typeof("{column}") = \'text\' ORDER BY rowid LIMIT :limit'
+                    ), {'after': after, 'limit': BATCH_SIZE}).fetchall()
+                    if not rows:
+                        break
+                    after = rows[-1][0]
+                    updates = []
+                    for rowid, value in rows:
+                        try:
+                            updates.append({'value': uuid.UUID(value).bytes, 'rowid': rowid})
+                        except ValueError:
+                            continue
+                    if updates:
+                        conn.execute(text(f'UPDATE "{table}" SET "{column}" = :value WHERE rowid = :rowid'), updates)
+                    converted += len(updates)
+    return converted
+
+
+def _migrate_postgresql(engine):
+    """تغيير نوع الأعمدة إلى uuid مع إسقاط المفاتيح الأجنبية مؤقتاً ثم إعادتها"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    columns = {table: cols for table, cols in compact_id_columns().items() if table in existing_tables}
+    pending = {
+        table: [col for col in cols
+                if not str(next(c['type'] for c in inspector.get_columns(table) if c['name'] == col)).startswith('UUID')]
+        for table, cols in columns.items()
+    }
+    pending = {table: cols for table, cols in pending.items() if cols}
+    if not pending:
+        return 0
+
+    foreign_keys = {table: inspector.get_foreign_keys(table) for table in columns}
+    with engine.begin() as conn:
+        for table, keys in foreign_keys.items():
+            for key in keys:
+                conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{key["name"]}"'))
+        for table, cols in pending.items():
+            for column in cols:
+                conn.execute(text(
+                    f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE uuid USING "{column}"::uuid'
+                ))
+        for table, keys in foreign_keys.items():
+            for key in keys:
+                local = ', '.join(f'"{c}"' for c in key['constrained_columns'])
+                remote = ', '.join(f'"{c}"' for c in key['referred_columns'])
+                conn.execute(text(
+                    f'ALTER TABLE "{table}" ADD CONSTRAINT "{key["name"]}" '
+                    f'FOREIGN KEY ({local}) REFERENCES "{key["referred_table"]}" ({remote})'
+                ))
+    return sum(len(cols) for cols in pending.values())
+
+
+if __name__ == '__main__':
+    import src.main  # noqa: F401 تحميل جميع النماذج
+
+    url = sys.argv[1] if len(sys.argv) > 1 else src.main.app.config['SQLALCHEMY_DATABASE_URI']
+    print(f'Converted {migrate_legacy_ids(create_engine(url))} ids')
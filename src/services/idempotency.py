@@ -0,0 +1,205 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import request, jsonify, make_response, Response
+from sqlalchemy import insert, update, delete
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import db
+from src.models.idempotency import IdempotencyKey
+from src.services.workers import start_background
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 100
+DEFAULT_TTL = 86400  # ثوانٍ
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_PURGE_INTERVAL = 3600  # ثوانٍ
+
+_app = None
+
+
+class ResponseCache:
+    """ذاكرة محدودة الحجم للاستجابات المحفوظة مع مدة صلاحية لكل عنصر
+
+    عند امتلاء الذاكرة يُحذف الأقدم استخداماً (LRU). القيم صفوف ثابتة
+    (البصمة، رمز الحالة، الجسم، نوع المحتوى) فتُعاد دون أي قراءة من القاعدة.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, clock=time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_cache = ResponseCache()
+_ttl = timedelta(seconds=DEFAULT_TTL)
+
+
+def init_idempotency(app):
+    """ضبط مدة الاحتفاظ بمفاتيح التكرار وحجم الذاكرة وتشغيل حذف المفاتيح المنتهية"""
+    global _app, _cache, _ttl
+    _app = app
+    app.config.setdefault('IDEMPOTENCY_TTL', DEFAULT_TTL)
+    app.config.setdefault('IDEMPOTENCY_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+    app.config.setdefault('IDEMPOTENCY_PURGE_INTERVAL', DEFAULT_PURGE_INTERVAL)
+    app.config.setdefault('IDEMPOTENCY_PURGE_ENABLED', True)
+    _ttl = timedelta(seconds=app.config['IDEMPOTENCY_TTL'])
+    _cache = ResponseCache(app.config['IDEMPOTENCY_CACHE_SIZE'])
+
+    if app.config['IDEMPOTENCY_PURGE_ENABLED']:
+        start_background(_purge_loop, 'idempotency-purge', leader_only=True)
+
+
+def request_fingerprint():
+    """بصمة الطلب: نفس المفتاح مع مسار أو جسم مختلف يُعد خطأ من العميل"""
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(entry, fingerprint):
+    stored_fingerprint, status_code, body, mimetype = entry
+    if stored_fingerprint != fingerprint:
+        return jsonify({'error': 'مفتاح Idempotency-Key مستخدم لطلب مختلف'}), 422
+    response = Response(body, status=status_code, mimetype=mimetype)
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _key_filter(scope, key):
+    return (IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+
+
+def _claim(scope, key, fingerprint, retry=True):
+    """حجز المفتاح بإدراج صف؛ القيد الفريد يضمن أن طلباً واحداً فقط ينفذ
+
+    يعيد None عند الحجز، أو الاستجابة المناسبة للتكرار (إعادة المحفوظة أو 409).
+    """
+    now = datetime.utcnow()
+    try:
+        db.session.execute(insert(IdempotencyKey).values(
+            scope=scope, key=key, fingerprint=fingerprint, created_at=now, expires_at=now + _ttl
+        ))
+        db.session.commit()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+
+    record = db.session.execute(db.select(IdempotencyKey).where(*_key_filter(scope, key))).scalar_one_or_none()
+    if record is None or record.expires_at <= now:
+        # المفتاح انتهت صلاحيته أو أُفرج عنه بعد فشل الطلب الأول: محاولة حجز واحدة أخرى
+        if retry:
+            db.session.execute(delete(IdempotencyKey).where(*_key_filter(scope, key), IdempotencyKey.expires_at <= now))
+            db.session.commit()
+            return _claim(scope, key, fingerprint, retry=False)
+        record = None
+    if record is None or record.status_code is None:
+        return jsonify({'error': 'طلب بنفس مفتاح Idempotency-Key قيد التنفيذ'}), 409
+
+    entry = (record.fingerprint, record.status_code, record.response_body, record.mimetype)
+    _cache.put((scope, key), entry, (record.expires_at - now).total_seconds())
+    return _replay(entry, fingerprint)
+
+
+def _store(scope, key, fingerprint, response):
+    body = response.get_data(as_text=True)
+    db.session.execute(
+        update(IdempotencyKey).where(*_key_filter(scope, key))
+        .values(status_code=response.status_code, response_body=body, mimetype=response.mimetype)
+    )
+    db.session.commit()
+    _cache.put((scope, key), (fingerprint, response.status_code, body, response.mimetype), _ttl.total_seconds())
+
+
+def _release(scope, key):
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(*_key_filter(scope, key)))
+    db.session.commit()
+
+
+def idempotent(scope):
+    """ديكوريتر: الطلب المعاد بنفس ترويسة Idempotency-Key يعيد الاستجابة الأولى
+
+    الإعادة من الذاكرة لا تلمس القاعدة؛ وإلا يُحجز المفتاح في جدول idempotency_keys
+    قبل تنفيذ الطلب. استجابات 5xx لا تُحفظ، فيمكن إعادة المحاولة بنفس المفتاح.
+    الطلب بدون الترويسة يُنفذ كالمعتاد.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = request.headers.get(HEADER)
+            if key is None:
+                return f(*args, **kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return jsonify({'error': 'مفتاح Idempotency-Key غير صالح'}), 400
+
+            fingerprint = request_fingerprint()
+            cached = _cache.get((scope, key))
+            if cached is not None:
+                return _replay(cached, fingerprint)
+
+            duplicate = _claim(scope, key, fingerprint)
+            if duplicate is not None:
+                return duplicate
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _release(scope, key)
+                raise
+            if response.status_code >= 500:
+                _release(scope, key)
+            else:
+                _store(scope, key, fingerprint, response)
+            return response
+        return decorated
+    return decorator
+
+
+def purge_idempotency_keys(now=None):
+    """حذف مفاتيح التكرار المنتهية صلاحيتها"""
+    result = db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or datetime.utcnow())))
+    db.session.commit()
+    return result.rowcount
+
+
+def _purge_loop():
+    while True:
+        time.sleep(_app.config['IDEMPOTENCY_PURGE_INTERVAL'])
+        with _app.app_context():
+            try:
+                purge_idempotency_keys()
+            except Exception as e:
+                print(f'Idempotency key purge failed: {e}')
+                db.session.rollback()
+            finally:
+                db.session.remove()
@@ -0,0 +1,42 @@
+"""إنشاء فهارس النماذج الناقصة في الجداول الموجودة مسبقاً
+
+create_all لا يضيف فهارس لجدول موجود، فالقواعد المنشأة قبل إضافة فهرس للنموذج
+(مثل ix_notifications_* على جدول notifications) تبقى بدونه. هنا يُنشأ كل فهرس
+ناقص بـ CREATE INDEX IF NOT EXISTS.
+
+التشغيل يدوياً على قاعدة بيانات:
+    python -m src.services.index_migration sqlite:///src/database/app.db
+"""
+import sys
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.schema import CreateIndex
+
+from src.models.user import db
+
+
+def migrate_indexes(engine, metadata=None):
+    """إنشاء الفهارس الناقصة؛ آمن لإعادة التشغيل. يعيد أسماء الفهارس التي أُنشئت"""
+    metadata = metadata or db.metadata
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    if not missing:
+        return []
+
+    with engine.begin() as conn:
+        for index in missing:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    return [index.name for index in missing]
+
+
+if __name__ == '__main__':
+    import src.main  # noqa: F401 تحميل جميع النماذج
+
+    url = sys.argv[1] if len(sys.argv) > 1 else src.main.app.config['SQLALCHEMY_DATABASE_URI']
+    print(f"Created indexes: {', '.join(migrate_indexes(create_engine(url))) or 'none'}")
@@ -0,0 +1,357 @@
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, func, update, bindparam, inspect, or_, and_
+
+from src.models.user import db
+from src.models.session import RoutingSession
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.order import Order
+from src.models.money import Money
+from src.models.merchant_rollup import MerchantRollup, MerchantDailyRevenue
+from src.models.upsert import upsert
+from src.services.workers import start_background
+
+PRODUCT_STATUSES = ('draft', 'active', 'sold', 'archived')
+COUNT_FIELDS = tuple(f'products_{status}' for status in PRODUCT_STATUSES) + ('active_auctions', 'pending_orders')
+DEFAULT_RECONCILE_INTERVAL = 900  # ثوانٍ
+DEFAULT_DASHBOARD_DAYS = 30
+
+_app = None
+
+
+class RollupDeltas:
+    """تغييرات ملخصات التجار المجمعة قبل تطبيقها في استعلامات ثابتة العدد
+
+    counts[(user_id, field)] مقدار تغيير عداد، و revenue[(user_id, day)] = [مبلغ، عدد طلبات].
+    كل دالة تضيف مساهمة صف بإشارة +1 (دخل في الملخص) أو -1 (خرج منه).
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.revenue = defaultdict(lambda: [0, 0])
+
+    def __bool__(self):
+        return any(self.counts.values()) or any(amount or orders for amount, orders in self.revenue.values())
+
+    def product(self, user_id, status, sign=1):
+        if status in PRODUCT_STATUSES:
+            self.counts[(user_id, f'products_{status}')] += sign
+
+    def auction(self, user_id, status, sign=1):
+        if status == 'active':
+            self.counts[(user_id, 'active_auctions')] += sign
+
+    def order(self, user_id, status, final_price, created_at, sign=1):
+        if status == 'pending':
+            self.counts[(user_id, 'pending_orders')] += sign
+        if status != 'cancelled' and created_at is not None:
+            entry = self.revenue[(user_id, created_at.date())]
+            entry[0] += sign * (final_price or 0)
+            entry[1] += sign
+
+
+# الحقول التي تؤثر في مساهمة كل نموذج في الملخصات
+_TRACKED = {
+    Product: ('user_id', 'status'),
+    Auction: ('user_id', 'status'),
+    Order: ('user_id', 'status', 'final_price', 'created_at'),
+}
+
+
+def _contribute(deltas, obj, values, sign):
+    if isinstance(obj, Product):
+        deltas.product(*values, sign=sign)
+    elif isinstance(obj, Auction):
+        deltas.auction(*values, sign=sign)
+    else:
+        deltas.order(*values, sign=sign)
+
+
+def _previous_values(obj, fields):
+    state = inspect(obj)
+    values = []
+    for field in fields:
+        history = state.attrs[field].history
+        values.append(history.deleted[0] if history.deleted else getattr(obj, field))
+    return tuple(values)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _load_deleted_values(session, flush_context, instances):
+    # قيم الصفوف المحذوفة لا يمكن تحميلها بعد تنفيذ DELETE
+    for obj in session.deleted:
+        for field in _TRACKED.get(type(obj), ()):
+            getattr(obj, field)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _rollup_flushed_changes(session, flush_context):
+    """تحديث الملخصات من تغييرات النماذج في نفس المعاملة
+
+    الكتابات الجماعية عبر Core (الإغلاق والتسوية) لا تمر بهذا الحدث وتستدعي
+    adjust_merchant_rollups بنفسها.
+    """
+    deltas = RollupDeltas()
+    for obj in session.new:
+        fields = _TRACKED.get(type(obj))
+        if fields:
+            _contribute(deltas, obj, tuple(getattr(obj, field) for field in fields), 1)
+    for obj in session.deleted:
+        fields = _TRACKED.get(type(obj))
+        if fields:
+            _contribute(deltas, obj, _previous_values(obj, fields), -1)
+    for obj in session.dirty:
+        fields = _TRACKED.get(type(obj))
+        if fields and obj not in session.deleted:
+            before = _previous_values(obj, fields)
+            after = tuple(getattr(obj, field) for field in fields)
+            if before != after:
+                _contribute(deltas, obj, before, -1)
+                _contribute(deltas, obj, after, 1)
+    if deltas:
+        adjust_merchant_rollups(deltas, session)
+
+
+def adjust_merchant_rollups(deltas, session=None):
+    """تطبيق التغييرات على جداول الملخصات ضمن المعاملة الحالية
+
+    يجب استدعاؤها بعد تنفيذ الكتابة، لأن الملخص غير الموجود يُنشأ من القيم
+    الفعلية الحالية دون تطبيق التغيير عليه (كما في عدادات الإشعارات).
+    """
+    session = session or db.session
+    counts = defaultdict(dict)
+    for (user_id, field), delta in deltas.counts.items():
+        if delta:
+            counts[user_id][field] = delta
+    revenue = {key: (Money(amount), orders) for key, (amount, orders) in deltas.revenue.items() if amount or orders}
+    if counts:
+        _adjust_counts(session, counts)
+    if revenue:
+        _adjust_revenue(session, revenue)
+
+
+def _adjust_counts(session, counts):
+    table = MerchantRollup.__table__
+    user_ids = list(counts)
+    existing = set(session.execute(
+        db.select(table.c.user_id).where(table.c.user_id.in_(user_ids))
+    ).scalars())
+    now = datetime.utcnow()
+    added = {field: table.c[field] + bindparam(f'delta_{field}') for field in COUNT_FIELDS}
+    deltas = {
+        user_id: {f'delta_{field}': counts[user_id].get(field, 0) for field in COUNT_FIELDS} for user_id in user_ids
+    }
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        # الملخص الذي أنشأه كاتب متزامن بعد الفحص يُضاف إليه التغيير بدلاً من خطأ التفرد
+        actual = _actual_counts(session, missing)
+        session.execute(upsert(session, table, {'updated_at': now, **added}), [
+            {'user_id': user_id, 'updated_at': now, **actual[user_id], **deltas[user_id]} for user_id in missing
+        ])
+    if existing:
+        session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('rollup_user_id'))
+            .values(updated_at=now, **added),
+            [{'rollup_user_id': user_id, **deltas[user_id]} for user_id in existing]
+        )
+
+
+def _adjust_revenue(session, revenue):
+    table = MerchantDailyRevenue.__table__
+    user_ids = {user_id for user_id, _ in revenue}
+    days = {day for _, day in revenue}
+    existing = {
+        (user_id, day) for user_id, day in session.execute(
+            db.select(table.c.user_id, table.c.day).where(table.c.user_id.in_(user_ids), table.c.day.in_(days))
+        )
+    } & set(revenue)
+    added = {'revenue': table.c.revenue + bindparam('amount'), 'orders': table.c.orders + bindparam('count')}
+    missing = [key for key in revenue if key not in existing]
+    if missing:
+        actual = _actual_revenue(session, {user_id for user_id, _ in missing}, {day for _, day in missing})
+        session.execute(upsert(session, table, added), [
+            {'user_id': user_id, 'day': day, 'revenue': actual.get((user_id, day), (Money(0), 0))[0],
+             'orders': actual.get((user_id, day), (Money(0), 0))[1],
+             'amount': revenue[(user_id, day)][0], 'count': revenue[(user_id, day)][1]}
+            for user_id, day in missing
+        ])
+    if existing:
+        session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('rollup_user_id'), table.c.day == bindparam('rollup_day'))
+            .values(**added),
+            [
+                {'rollup_user_id': user_id, 'rollup_day': day, 'amount': revenue[(user_id, day)][0],
+                 'count': revenue[(user_id, day)][1]}
+                for user_id, day in existing
+            ]
+        )
+
+
+def _actual_counts(session, user_ids):
+    """القيم الفعلية للعدادات من الجداول الأصلية لمجموعة تجار"""
+    rows = {user_id: dict.fromkeys(COUNT_FIELDS, 0) for user_id in user_ids}
+    for user_id, status, count in session.execute(
+        db.select(Product.user_id, Product.status, func.count())
+        .where(Product.user_id.in_(user_ids)).group_by(Product.user_id, Product.status)
+    ):
+        if status in PRODUCT_STATUSES:
+            rows[user_id][f'products_{status}'] = count
+    for model, status, field in ((Auction, 'active', 'active_auctions'), (Order, 'pending', 'pending_orders')):
+        for user_id, count in session.execute(
+            db.select(model.user_id, func.count())
+            .where(model.user_id.in_(user_ids), model.status == status).group_by(model.user_id)
+        ):
+            rows[user_id][field] = count
+    return rows
+
+
+def _as_date(value):
+    # SQLite يعيد date() كنص و Postgres كتاريخ
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _actual_revenue(session, user_ids=None, days=None, since=None):
+    """الإيراد الفعلي لكل (تاجر، يوم) من جدول الطلبات، بدون الطلبات الملغاة"""
+    day = func.date(Order.created_at)
+    conditions = [or_(Order.status == None, Order.status != 'cancelled')]
+    if user_ids is not None:
+        conditions.append(Order.user_id.in_(user_ids))
+    if days:
+        since = min(days)
+        conditions.append(Order.created_at < datetime.combine(max(days) + timedelta(days=1), datetime.min.time()))
+    if since is not None:
+        conditions.append(Order.created_at >= datetime.combine(since, datetime.min.time()))
+    result = {}
+    for user_id, order_day, amount, count in session.execute(
+        db.select(Order.user_id, day, func.sum(Order.final_price), func.count())
+        .where(*conditions).group_by(Order.user_id, day)
+    ):
+        key = (user_id, _as_date(order_day))
+        if days is None or key[1] in days:
+            result[key] = (Money(amount or 0), count)
+    return result
+
+
+def merchant_dashboard(user_id, days=DEFAULT_DASHBOARD_DAYS, today=None):
+    """ملخص التاجر من جداول الملخصات في استعلام واحد، أو None إذا لم يُنشأ ملخصه بعد"""
+    since = (today or datetime.utcnow().date()) - timedelta(days=days - 1)
+    rows = db.session.execute(
+        db.select(MerchantRollup, MerchantDailyRevenue)
+        .outerjoin(MerchantDailyRevenue, and_(
+            MerchantDailyRevenue.user_id == MerchantRollup.user_id, MerchantDailyRevenue.day >= since
+        ))
+        .where(MerchantRollup.user_id == user_id)
+        .order_by(MerchantDailyRevenue.day)
+    ).all()
+    if not rows:
+        return None
+    summary = rows[0][0].to_dict()
+    summary['revenue_by_day'] = [revenue.to_dict() for _, revenue in rows if revenue is not None and revenue.orders]
+    return summary
+
+
+def compute_merchant_dashboard(user_id, days=DEFAULT_DASHBOARD_DAYS, today=None):
+    """نفس الملخص محسوباً من الجداول الأصلية (للتجار الذين لم يُنشأ ملخصهم بعد)"""
+    since = (today or datetime.utcnow().date()) - timedelta(days=days - 1)
+    counts = _actual_counts(db.session, [user_id])[user_id]
+    revenue = _actual_revenue(db.session, [user_id], since=since)
+    return {
+        'user_id': user_id,
+        'products': {status: counts[f'products_{status}'] for status in PRODUCT_STATUSES},
+        'active_auctions': counts['active_auctions'],
+        'pending_orders': counts['pending_orders'],
+        'updated_at': None,
+        'revenue_by_day': [
+            {'day': day.isoformat(), 'revenue': amount.to_json(), 'orders': count}
+            for (_, day), (amount, count) in sorted(revenue.items())
+        ]
+    }
+
+
+def _count_of(model, user_id, *conditions):
+    return db.select(func.count()).select_from(model).where(model.user_id == user_id, *conditions).scalar_subquery()
+
+
+def reconcile_merchant_rollups():
+    """إعادة حساب كل الملخصات من الجداول الأصلية وتصحيح أي انحراف أو ملخص ناقص
+
+    الملخصات الناقصة تُنشأ صفرية أولاً، ثم يُعاد حساب كل جدول بجملة UPDATE واحدة
+    باستعلامات فرعية مرتبطة، فلا يُكتب عدد قُرئ قبل تغيير متزامن. يعيد عدد الصفوف المصححة.
+    """
+    session = db.session
+    now = datetime.utcnow()
+
+    rollups = MerchantRollup.__table__
+    user_ids = set()
+    for model in (Product, Auction, Order):
+        user_ids.update(session.execute(db.select(model.user_id).distinct()).scalars())
+    user_ids -= set(session.execute(db.select(rollups.c.user_id)).scalars())
+    user_ids.discard(None)
+    if user_ids:
+        session.execute(upsert(session, rollups), [
+            {'user_id': user_id, 'updated_at': now, **dict.fromkeys(COUNT_FIELDS, 0)} for user_id in user_ids
+        ])
+    actual = {
+        f'products_{status}': _count_of(Product, rollups.c.user_id, Product.status == status)
+        for status in PRODUCT_STATUSES
+    }
+    actual['active_auctions'] = _count_of(Auction, rollups.c.user_id, Auction.status == 'active')
+    actual['pending_orders'] = _count_of(Order, rollups.c.user_id, Order.status == 'pending')
+    fixed = session.execute(
+        update(rollups)
+        .where(or_(*(rollups.c[field] != value for field, value in actual.items())))
+        .values(updated_at=now, **actual)
+    ).rowcount
+
+    revenue = MerchantDailyRevenue.__table__
+    stored = set(session.execute(db.select(revenue.c.user_id, revenue.c.day)).all())
+    keys = [key for key in _actual_revenue(session) if key not in stored]
+    if keys:
+        session.execute(upsert(session, revenue), [
+            {'user_id': user_id, 'day': day, 'revenue': Money(0), 'orders': 0} for user_id, day in keys
+        ])
+    counted = (
+        Order.user_id == revenue.c.user_id, func.date(Order.created_at) == revenue.c.day,
+        or_(Order.status == None, Order.status != 'cancelled')
+    )
+    amount = db.select(func.coalesce(func.sum(Order.final_price), 0)).where(*counted).scalar_subquery()
+    orders = db.select(func.count()).select_from(Order).where(*counted).scalar_subquery()
+    fixed += session.execute(
+        update(revenue)
+        .where(or_(revenue.c.revenue != amount, revenue.c.orders != orders))
+        .values(revenue=amount, orders=orders)
+    ).rowcount
+
+    session.commit()
+    return fixed
+
+
+def init_merchant_rollups(app):
+    """تشغيل المطابقة الدورية لملخصات التجار (تنشئ أيضاً ملخصات البيانات القديمة)"""
+    global _app
+    _app = app
+    app.config.setdefault('MERCHANT_ROLLUP_RECONCILE_INTERVAL', DEFAULT_RECONCILE_INTERVAL)
+    app.config.setdefault('MERCHANT_ROLLUP_RECONCILE_ENABLED', True)
+
+    if app.config['MERCHANT_ROLLUP_RECONCILE_ENABLED']:
+        start_background(_reconcile_loop, 'merchant-rollups', leader_only=True)
+
+
+def _reconcile_loop():
+    interval = _app.config['MERCHANT_ROLLUP_RECONCILE_INTERVAL']
+
+    while True:
+        with _app.app_context():
+            try:
+                reconcile_merchant_rollups()
+            except Exception as e:
+                db.session.rollback()
+                print(f'Merchant rollup reconciliation failed: {e}')
+            finally:
+                db.session.remove()
+        time.sleep(interval)
@@ -0,0 +1,204 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# حدود فترات المدرج التكراري (cumulative) بصيغة Prometheus
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+BACKGROUND = '(background)'  # استعلامات خيوط الخلفية خارج أي طلب
+UNMATCHED = '(unmatched)'  # طلبات لا تطابق أي مسار، بدل تسمية كل رابط خاطئ
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+_listening = False
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        """أسطر _bucket التراكمية ثم _sum و _count"""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class MetricsRegistry:
+    """مقاييس كل مسار: زمن الاستجابة، وعدد الطلبات لكل حالة، واستعلامات القاعدة
+
+    التسمية حسب request.endpoint (مثل bid.get_bids) لا حسب الرابط، فيبقى عدد
+    السلاسل محدوداً بعدد المسارات مهما اختلفت المعرفات في الروابط.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.requests = {}
+        self.queries_per_request = {}
+        self.queries = {}
+        self.query_seconds = {}
+        self.rows = {}
+        self.gauges = {}
+
+    def record_request(self, endpoint, method, status, seconds, queries):
+        with self._lock:
+            key = (endpoint, method)
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.queries_per_request[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.queries_per_request[key].observe(queries)
+            status_key = (endpoint, method, status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+    def record_query(self, endpoint, seconds, rows):
+        with self._lock:
+            self.queries[endpoint] = self.queries.get(endpoint, 0) + 1
+            self.query_seconds[endpoint] = self.query_seconds.get(endpoint, 0) + seconds
+            self.rows[endpoint] = self.rows.get(endpoint, 0) + rows
+
+    def set_gauge(self, name, help_text, value):
+        with self._lock:
+            self.gauges[name] = (help_text, value)
+
+    def render(self):
+        """كل المقاييس بصيغة Prometheus النصية"""
+        with self._lock:
+            lines = [
+                '# HELP http_request_duration_seconds Request latency per endpoint.',
+                '# TYPE http_request_duration_seconds histogram'
+            ]
+            for (endpoint, method), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.samples('http_request_duration_seconds', _labels(endpoint=endpoint, method=method)))
+
+            lines += ['# HELP http_requests_total Requests per endpoint and status.', '# TYPE http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{_labels(endpoint=endpoint, method=method, status=status)}}} {count}')
+
+            lines += [
+                '# HELP db_queries_per_request SQL statements issued by one request.',
+                '# TYPE db_queries_per_request histogram'
+            ]
+            for (endpoint, method), histogram in sorted(self.queries_per_request.items()):
+                lines.extend(histogram.samples('db_queries_per_request', _labels(endpoint=endpoint, method=method)))
+
+            for name, kind, help_text, values in (
+                ('db_queries_total', 'counter', 'SQL statements per endpoint.', self.queries),
+                ('db_query_duration_seconds_total', 'counter', 'Time spent in SQL per endpoint.', self.query_seconds),
+                ('db_rows_total', 'counter', 'Rows reported by the driver per endpoint.', self.rows),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for endpoint, value in sorted(values.items()):
+                    formatted = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{{_labels(endpoint=endpoint)}}} {formatted}')
+
+            for name, (help_text, value) in sorted(self.gauges.items()):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_registry = MetricsRegistry()
+
+
+def init_metrics(app):
+    """تسجيل زمن كل مسار واستعلاماته، وعرضها على /metrics بصيغة Prometheus
+
+    عند METRICS_ENABLED = False لا يُسجل أي hook على الطلبات أو القاعدة، فلا
+    توجد أي تكلفة إضافية. أحداث الاستعلامات مسجلة على صنف Engine فتشمل القاعدة
+    الأساسية ونسخ القراءة معاً.
+
+    المقاييس في ذاكرة كل عملية: تحت gunicorn بأكثر من عامل يعرض /metrics عدادات
+    العامل الذي خدم طلب القراءة فقط، وتبدأ من الصفر عند إعادة تشغيله. لذلك مع
+    WEB_CONCURRENCY > 1 تُقرأ كل عملية على حدة (منفذ لكل عامل أو عامل واحد لكل
+    حاوية) وتُجمع في Prometheus بـ sum أو rate.
+    """
+    global _registry, _listening
+    app.config.setdefault('METRICS_ENABLED', True)
+    if not app.config['METRICS_ENABLED']:
+        return
+    _registry = MetricsRegistry()
+    app.extensions['metrics'] = _registry
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', _metrics_endpoint)
+    with _lock:
+        if not _listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            _listening = True
+
+
+def set_gauge(name, help_text, value):
+    """قيمة حالية تحسبها مهمة خلفية (في القائد وحده عادة، فلا تتكرر عند جمع العمال)"""
+    _registry.set_gauge(name, help_text, value)
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        _registry.record_request(
+            request.endpoint or UNMATCHED,
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            g.pop('metrics_queries', 0)
+        )
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    # SQLite لا يعيد rowcount لـ SELECT (-1)، بينما PostgreSQL و MySQL يعيدانه
+    rows = max(cursor.rowcount, 0)
+    endpoint = BACKGROUND
+    if has_request_context() and 'metrics_queries' in g:
+        g.metrics_queries += 1
+        endpoint = request.endpoint or UNMATCHED
+    _registry.record_query(endpoint, seconds, rows)
+
+
+def _metrics_endpoint():
+    return Response(_registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,80 @@
+"""ترحيل أعمدة المبالغ من Numeric(10,2) إلى أعداد صحيحة بالوحدة الصغرى (MoneyType)
+
+التشغيل يدوياً على قاعدة بيانات:
+    python -m src.services.money_migration sqlite:///src/database/app.db
+"""
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.models.user import db
+from src.models.money import MoneyType
+
+# SQLite لا يغير النوع المعلن للعمود، لذلك يُسجل الترحيل في PRAGMA user_version
+SQLITE_MONEY_VERSION = 1
+
+
+def money_columns(metadata=None):
+    """جميع أعمدة المبالغ من نوع MoneyType لكل جدول"""
+    metadata = metadata or db.metadata
+    return {
+        table.name: [column.name for column in table.columns if isinstance(column.type, MoneyType)]
+        for table in metadata.sorted_tables
+        if any(isinstance(column.type, MoneyType) for column in table.columns)
+    }
+
+
+def _legacy_columns(engine):
+    """أعمدة المبالغ التي ما زال نوعها المعلن عشرياً"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    legacy = {}
+    for table, columns in money_columns().items():
+        if table not in existing_tables:
+            continue
+        declared = {column['name']: str(column['type']).upper() for column in inspector.get_columns(table)}
+        names = [name for name in columns if declared.get(name, '').startswith(('NUMERIC', 'DECIMAL', 'FLOAT', 'REAL'))]
+        if names:
+            legacy[table] = names
+    return legacy
+
+
+def migrate_money_columns(engine):
+    """تحويل المبالغ القديمة إلى الوحدة الصغرى؛ آمن لإعادة التشغيل
+
+    يعيد عدد الأعمدة التي تم تحويلها.
+    """
+    if engine.dialect.name == 'postgresql':
+        return _migrate_postgresql(engine)
+    return _migrate_sqlite(engine)
+
+
+def _migrate_sqlite(engine):
+    with engine.begin() as conn:
+        if conn.execute(text('PRAGMA user_version')).scalar() >= SQLITE_MONEY_VERSION:
+            return 0
+        legacy = _legacy_columns(conn)
+        for table, columns in legacy.items():
+            assignments = ', '.join(f'"{c}" = CAST(ROUND("{c}" * 100) AS INTEGER)' for c in columns)
+            conn.execute(text(f'UPDATE "{table}" SET {assignments}'))
+        conn.execute(text(f'PRAGMA user_version = {SQLITE_MONEY_VERSION}'))
+    return sum(len(columns) for columns in legacy.values())
+
+
+def _migrate_postgresql(engine):
+    legacy = _legacy_columns(engine)
+    with engine.begin() as conn:
+        for table, columns in legacy.items():
+            for column in columns:
+                conn.execute(text(
+                    f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE bigint '
+                    f'USING round("{column}" * 100)::bigint'
+                ))
+    return sum(len(columns) for columns in legacy.values())
+
+
+if __name__ == '__main__':
+    import src.main  # noqa: F401 تحميل جميع النماذج
+
+    url = sys.argv[1] if len(sys.argv) > 1 else src.main.app.config['SQLALCHEMY_DATABASE_URI']
+    print(f'Converted {migrate_money_columns(create_engine(url))} money columns')
@@ -0,0 +1,213 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, update
+
+from src.models.user import db
+from src.models.outbox import OutboxMessage
+from src.models.ids import new_id
+from src.services.metrics import set_gauge
+from src.services.workers import start_background
+
+_app = None
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_POLL_INTERVAL = 0.5  # ثوانٍ
+MAX_ATTEMPTS = 8
+MAX_BACKOFF = 300  # ثوانٍ
+DEFAULT_SENT_RETENTION = 24 * 3600  # ثوانٍ: حذف الرسائل المرسلة بعدها
+DEFAULT_FAILED_RETENTION = 7 * 24 * 3600  # ثوانٍ: الفاشلة تبقى أطول للتحقيق ثم تُحذف
+DEFAULT_PURGE_INTERVAL = 60  # ثوانٍ
+
+
+def init_outbox_dispatcher(app):
+    """ربط موزّع صندوق الصادر بالتطبيق وتشغيله في الخلفية"""
+    global _app
+    _app = app
+    app.config.setdefault('OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    app.config.setdefault('OUTBOX_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+    app.config.setdefault('OUTBOX_DISPATCHER_ENABLED', True)
+    app.config.setdefault('OUTBOX_SENT_RETENTION', DEFAULT_SENT_RETENTION)
+    app.config.setdefault('OUTBOX_FAILED_RETENTION', DEFAULT_FAILED_RETENTION)
+    app.config.setdefault('OUTBOX_PURGE_INTERVAL', DEFAULT_PURGE_INTERVAL)
+
+    if app.config['OUTBOX_DISPATCHER_ENABLED']:
+        start_background(_dispatcher_loop, 'outbox-dispatcher', leader_only=True)
+
+
+def notification_payload(notification, data=None):
+    """بناء محتوى الإشعار المرسل عبر WebSocket من كائن إشعار أو صف قاموس"""
+    if isinstance(notification, dict):
+        get = notification.get
+    else:
+        get = lambda key: getattr(notification, key)
+    created_at = get('created_at')
+    return {
+        'id': get('id'),
+        'title': get('title'),
+        'message': get('message'),
+        'type': get('type'),
+        'created_at': created_at.isoformat() if created_at else None,
+        'data': data or {}
+    }
+
+
+def outbox_row(event, room, payload):
+    """صف صندوق صادر جاهز للإدراج الجماعي"""
+    now = datetime.utcnow()
+    return {
+        'id': new_id(),
+        'event': event,
+        'room': room,
+        'payload': json.dumps(payload, ensure_ascii=False),
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': now,
+        'created_at': now
+    }
+
+
+def notification_outbox_rows(notification_rows):
+    """صفوف صندوق الصادر لقائمة من صفوف الإشعارات (للإدراج الجماعي)"""
+    return [
+        outbox_row('new_notification', f"merchant_{row['user_id']}", notification_payload(row))
+        for row in notification_rows
+    ]
+
+
+def enqueue_notification(notification, data=None):
+    """إضافة إشعار لصندوق الصادر ضمن المعاملة الحالية (بدون commit)
+
+    يجب أن يكون الإشعار قد أُرسل للقاعدة عبر flush حتى يتوفر معرفه.
+    """
+    db.session.execute(insert(OutboxMessage), [
+        outbox_row('new_notification', f'merchant_{notification.user_id}',
+                   notification_payload(notification, data))
+    ])
+
+
+def dispatch_pending(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """إرسال دفعة من رسائل صندوق الصادر المعلقة وإرجاع عدد الرسائل المرسلة"""
+    from src.routes import realtime
+
+    if realtime.socketio is None:
+        return 0
+
+    now = now or datetime.utcnow()
+    messages = db.session.execute(
+        db.select(OutboxMessage.id, OutboxMessage.event, OutboxMessage.room,
+                  OutboxMessage.payload, OutboxMessage.attempts)
+        .where(OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now)
+        .order_by(OutboxMessage.created_at)
+        .limit(batch_size)
+    ).all()
+    if not messages:
+        return 0
+
+    sent_ids = []
+    failures = []
+    for message in messages:
+        try:
+            realtime.socketio.emit(message.event, json.loads(message.payload), room=message.room)
+            sent_ids.append(message.id)
+        except Exception as e:
+            attempts = message.attempts + 1
+            failures.append({
+                'id': message.id,
+                'attempts': attempts,
+                'last_error': str(e),
+                'status': 'failed' if attempts >= MAX_ATTEMPTS else 'pending',
+                'next_attempt_at': now + timedelta(seconds=min(2 ** attempts, MAX_BACKOFF))
+            })
+
+    try:
+        if sent_ids:
+            db.session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(sent_ids))
+                .values(status='sent', sent_at=now)
+            )
+        if failures:
+            db.session.execute(update(OutboxMessage), failures)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(sent_ids)
+
+
+def purge_outbox(sent_retention=DEFAULT_SENT_RETENTION, failed_retention=DEFAULT_FAILED_RETENTION,
+                 batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """حذف الرسائل المرسلة والفاشلة الأقدم من مدة الاحتفاظ على دفعات، وإرجاع عدد المحذوف
+
+    بدون الحذف يكبر الجدول بلا حد ويمسحه الموزّع في كل دورة. كل دفعة معاملة
+    قصيرة مستقلة؛ الشرط على next_attempt_at يستخدم فهرس (status, next_attempt_at).
+    """
+    now = now or datetime.utcnow()
+    sent_before = now - timedelta(seconds=sent_retention)
+    expired = db.or_(
+        db.and_(OutboxMessage.status == 'sent', OutboxMessage.next_attempt_at < sent_before,
+                OutboxMessage.sent_at < sent_before),
+        db.and_(OutboxMessage.status == 'failed',
+                OutboxMessage.next_attempt_at < now - timedelta(seconds=failed_retention))
+    )
+    purged = 0
+    try:
+        while True:
+            ids = db.session.execute(
+                db.select(OutboxMessage.id).where(expired).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(ids)))
+            db.session.commit()
+            purged += len(ids)
+    except Exception:
+        db.session.rollback()
+        raise
+    return purged
+
+
+def failed_count():
+    """عدد الرسائل التي استنفدت محاولاتها (للتنبيه قبل أن يحذفها purge_outbox)"""
+    return db.session.execute(
+        db.select(func.count()).select_from(OutboxMessage).where(OutboxMessage.status == 'failed')
+    ).scalar()
+
+
+def _dispatcher_loop():
+    """حلقة الموزّع: تفرغ صندوق الصادر على دفعات وتنتظر عند خلوه
+
+    كل OUTBOX_PURGE_INTERVAL تحذف الرسائل القديمة وتنشر عدد الفاشلة على /metrics
+    (outbox_failed_messages) في القائد وحده.
+    """
+    batch_size = _app.config['OUTBOX_BATCH_SIZE']
+    poll_interval = _app.config['OUTBOX_POLL_INTERVAL']
+    purge_interval = _app.config['OUTBOX_PURGE_INTERVAL']
+    next_purge = time.monotonic()
+
+    while True:
+        sent = 0
+        with _app.app_context():
+            try:
+                sent = dispatch_pending(batch_size)
+            except Exception as e:
+                print(f'Outbox dispatch failed: {e}')
+            finally:
+                db.session.remove()
+        if time.monotonic() >= next_purge:
+            next_purge = time.monotonic() + purge_interval
+            with _app.app_context():
+                try:
+                    purge_outbox(_app.config['OUTBOX_SENT_RETENTION'], _app.config['OUTBOX_FAILED_RETENTION'],
+                                 batch_size)
+                    set_gauge('outbox_failed_messages', 'Outbox messages that exhausted their attempts.',
+                              failed_count())
+                except Exception as e:
+                    print(f'Outbox purge failed: {e}')
+                finally:
+                    db.session.remove()
+        if sent < batch_size:
+            time.sleep(poll_interval)
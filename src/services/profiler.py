@@ -0,0 +1,196 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from src.services.cooperative import gevent_patched
+
+DEFAULT_INTERVAL = 0.01  # 100 عينة في الثانية
+MIN_INTERVAL = 0.001
+DEFAULT_MAX_SECONDS = 60
+MAX_STACK_DEPTH = 128
+
+_running = threading.Lock()  # جلسة تحليل واحدة في كل عملية
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _thread_cpu(ident):
+    """زمن المعالج المستهلك لخيط (ثوانٍ)، أو None إن لم يدعمه النظام"""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _frame_name(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class StackSampler:
+    """محلل إحصائي بخيط: يأخذ مكدس كل خيط كل interval ثانية ويعدّ المكدسات المتطابقة
+
+    لا يعتمد على الإشارات (SIGPROF تصل للخيط الرئيسي فقط وتتعارض مع gevent/eventlet)،
+    ولا يضيف أي تكلفة على الخيوط المحللة نفسها: التكلفة قراءة sys._current_frames()
+    في خيط العينة. العينات بزمن الساعة (wall clock): الخيط المنتظر يظهر في مكان
+    انتظاره، وزمن المعالج لكل خيط يُقاس منفصلاً من ساعة الخيط في النظام.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = max(interval, MIN_INTERVAL)
+        self.stacks = Counter()
+        self.samples = 0
+        self.thread_samples = Counter()
+        self.threads = []
+        self.duration = 0
+
+    def run(self, seconds):
+        own = self._own_ident()
+        threads = {ident: name for ident, name in self._thread_names().items() if ident != own}
+        cpu_before = {ident: _thread_cpu(ident) for ident in threads}
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while True:
+            for ident, frame in sys._current_frames().items():
+                if ident == own or self._skip(frame):
+                    continue
+                name = threads.get(ident)
+                if name is None:
+                    # خيط بدأ أثناء التحليل
+                    name = threads[ident] = self._thread_names().get(ident, str(ident))
+                    cpu_before[ident] = _thread_cpu(ident)
+                self.stacks[f'{self._label(ident, name)};{_collapse(frame)}'] += 1
+                self.thread_samples[ident] += 1
+            self.samples += 1
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._sleep(min(self.interval, remaining))
+
+        self.duration = time.perf_counter() - started
+        for ident, name in threads.items():
+            before, after = cpu_before.get(ident), _thread_cpu(ident)
+            self.threads.append({
+                'name': name,
+                'ident': ident,
+                'samples': self.thread_samples[ident],
+                'cpu_seconds': round(after - before, 6) if before is not None and after is not None else None
+            })
+        self.threads.sort(key=lambda thread: thread['cpu_seconds'] or 0, reverse=True)
+        return self
+
+    def _own_ident(self):
+        return threading.get_ident()
+
+    def _thread_names(self):
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def _label(self, ident, name):
+        return name
+
+    def _skip(self, frame):
+        return False
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
+
+    def collapsed(self):
+        """صيغة المكدسات المطوية: سطر لكل مكدس 'thread;f1;f2;... count'
+
+        تُقرأ مباشرة في flamegraph.pl و speedscope و py-spy/inferno.
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def to_dict(self):
+        return {
+            'duration': round(self.duration, 3),
+            'interval': self.interval,
+            'samples': self.samples,
+            'threads': self.threads,
+            'collapsed': self.collapsed()
+        }
+
+
+class GreenletSampler(StackSampler):
+    """المحلل في وضع gevent: كل الطلبات greenlets على خيط نظام واحد (خيط الـ hub)
+
+    حلقة عينات في greenlet لن تعمل إلا حين تتخلى بقية الـ greenlets عن المعالج،
+    فلا ترى إلا نفسها. لذلك تعمل العينات في خيط نظام حقيقي من threadpool الخاص
+    بـ gevent، ومكدس خيط الـ hub فيها هو مكدس الـ greenlet الذي يعمل الآن،
+    ويُعرف اسمه من greenlet.settrace الذي يسجل كل تبديل.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        from gevent import monkey
+        super().__init__(interval)
+        self._get_ident = monkey.get_original('_thread', 'get_ident')
+        self._real_sleep = monkey.get_original('time', 'sleep')
+        self.hub_ident = self._get_ident()
+        # معرف الخيط المرقّع هو معرف الـ greenlet الذي يشغله
+        self.greenlet_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.current = None
+        self._previous_trace = None
+
+    def trace(self, event, args):
+        if event in ('switch', 'throw'):
+            self.current = args[1]
+        if self._previous_trace is not None:
+            self._previous_trace(event, args)
+
+    def run(self, seconds):
+        import greenlet
+        from gevent import get_hub
+        self.current = greenlet.getcurrent()
+        self._previous_trace = greenlet.settrace(self.trace)
+        try:
+            return get_hub().threadpool.apply(super().run, (seconds,))
+        finally:
+            greenlet.settrace(self._previous_trace)
+
+    def _own_ident(self):
+        return self._get_ident()
+
+    def _thread_names(self):
+        return {self.hub_ident: 'gevent-hub'}
+
+    def _label(self, ident, name):
+        current = self.current
+        if ident != self.hub_ident or current is None:
+            return name
+        label = self.greenlet_names.get(id(current)) or getattr(current, 'name', None) or type(current).__name__
+        return f'{name};{label}'
+
+    def _skip(self, frame):
+        # لحظة التبديل نفسها: current صار الـ greenlet التالي والمكدس ما زال للسابق
+        return frame.f_code is GreenletSampler.trace.__code__
+
+    def _sleep(self, seconds):
+        self._real_sleep(seconds)
+
+
+def profile(seconds, interval=DEFAULT_INTERVAL, max_seconds=DEFAULT_MAX_SECONDS):
+    """تحليل العملية الحالية لمدة seconds (بحد أقصى max_seconds)
+
+    جلسة واحدة فقط في نفس الوقت: طلب ثانٍ أثناء التحليل يرفع ProfilerBusy بدلاً من
+    مضاعفة العينات على عملية تحت الضغط. بعد ترقيع gevent تُحلل الـ greenlets.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy('A profiling session is already running')
+    try:
+        sampler = GreenletSampler(interval) if gevent_patched() else StackSampler(interval)
+        return sampler.run(min(max(seconds, 0), max_seconds))
+    finally:
+        _running.release()
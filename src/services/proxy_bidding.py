@@ -0,0 +1,243 @@
+import heapq
+import threading
+
+from sqlalchemy import func, update
+
+from src.models.user import db
+from src.models.bid import Bid, WINNING_ORDER
+from src.models.proxy_bid import ProxyBid
+from src.models.ids import new_id
+from src.models.money import Money
+
+_books = {}
+_lock = threading.RLock()
+
+
+class Proxy:
+    """نسخة خفيفة من مزايدة آلية داخل الذاكرة (بدون ارتباط بجلسة القاعدة)"""
+
+    __slots__ = ('id', 'bidder_name', 'bidder_phone', 'max_amount', 'created_at', 'active')
+
+    def __init__(self, id, bidder_name, bidder_phone, max_amount, created_at=None):
+        self.id = id
+        self.bidder_name = bidder_name
+        self.bidder_phone = bidder_phone
+        self.max_amount = max_amount
+        self.created_at = created_at
+        self.active = True
+
+
+class ProxyBook:
+    """المزايدات الآلية لمزاد واحد في كومة عظمى (max-heap) على الحد الأقصى
+
+    أعلى حدين فقط يحددان السعر، لذلك كل مزايدة واردة تكلف O(log n).
+    عند تساوي الحدين يفوز الأسبق تسجيلاً. المزايدات المتجاوزة تُحذف من
+    الكومة بشكل كسول عندما تصل إلى قمتها.
+    """
+
+    def __init__(self, price, leader_phone=None, version=None):
+        self.price = price
+        self.leader_phone = leader_phone
+        self.version = version  # (عدد المزايدات الآلية، آخر updated_at) في القاعدة عند التحميل
+        self._heap = []
+        self._seq = 0
+        self._by_phone = {}
+
+    def __len__(self):
+        return sum(1 for proxy in self._by_phone.values() if proxy.active)
+
+    def proxy_for(self, bidder_phone):
+        proxy = self._by_phone.get(bidder_phone)
+        return proxy if proxy is not None and proxy.active else None
+
+    def add(self, proxy):
+        """إضافة مزايدة آلية أو رفع حدها الأقصى (الإدخال القديم يصبح غير صالح)"""
+        previous = self._by_phone.get(proxy.bidder_phone)
+        if previous is not None and previous is not proxy:
+            previous.active = False
+        self._by_phone[proxy.bidder_phone] = proxy
+        self._seq += 1
+        heapq.heappush(self._heap, (-proxy.max_amount, self._seq, proxy))
+
+    def _first(self):
+        heap = self._heap
+        while heap and not (heap[0][2].active and heap[0][2].max_amount == -heap[0][0]):
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _second(self):
+        if self._first() is None:
+            return None
+        entry = heapq.heappop(self._heap)
+        second = self._first()
+        heapq.heappush(self._heap, entry)
+        return second
+
+    def place(self, bidder_phone, amount):
+        """تسجيل مزايدة يدوية مقبولة كسعر حالي"""
+        self.price, self.leader_phone = amount, bidder_phone
+
+    def resolve(self, increment):
+        """حساب رد المزايدات الآلية على السعر الحالي
+
+        يعيد (visible, retired): المزايدات الظاهرة الواجب حفظها كقائمة
+        (proxy, amount, tie) بترتيب تصاعدي، والمزايدات الآلية التي تم تجاوزها.
+        tie تعني أن المزايدة الآلية فازت بالتساوي لأنها أسبق.
+        """
+        retired = []
+        top = self._first()
+        while top is not None and top.max_amount < self.price:
+            top.active = False
+            retired.append(top)
+            top = self._first()
+        if top is None:
+            return [], retired
+
+        runner_up = self._second()
+        if top.bidder_phone == self.leader_phone:
+            if runner_up is None or runner_up.max_amount <= self.price:
+                return [], retired
+            ceiling = runner_up.max_amount
+        else:
+            ceiling = self.price if runner_up is None else max(self.price, runner_up.max_amount)
+
+        new_price = min(top.max_amount, ceiling + increment(ceiling))
+        visible = []
+        if runner_up is not None and self.price < runner_up.max_amount < new_price:
+            visible.append((runner_up, runner_up.max_amount, False))
+        visible.append((top, new_price, new_price == ceiling))
+        if runner_up is not None and runner_up.max_amount <= new_price:
+            runner_up.active = False
+            retired.append(runner_up)
+
+        self.price, self.leader_phone = new_price, top.bidder_phone
+        return visible, retired
+
+
+def reset_proxy_books():
+    """مسح الحالة في الذاكرة؛ تُعاد قراءتها من القاعدة عند الحاجة (بعد rollback مثلاً)"""
+    with _lock:
+        _books.clear()
+
+
+def forget_auction(auction_id):
+    with _lock:
+        _books.pop(auction_id, None)
+
+
+def _proxies_version(auction_id):
+    count, latest = db.session.execute(
+        db.select(func.count(ProxyBid.id), func.max(ProxyBid.updated_at))
+        .where(ProxyBid.auction_id == auction_id)
+    ).one()
+    return count, latest
+
+
+def _book_for(auction):
+    """سجل المزاد من الذاكرة، أو تحميله من القاعدة إذا لم يوجد أو تغير من مسار آخر
+
+    عامل آخر قد يسجل مزايدة آلية أو يرفع حدها دون أن يتغير السعر، لذلك يُقارن
+    أيضاً عدد المزايدات الآلية للمزاد وآخر updated_at فيها بما كانا عليه عند التحميل.
+    """
+    price = auction.current_highest_bid or auction.starting_price
+    version = _proxies_version(auction.id)
+    book = _books.get(auction.id)
+    if book is not None and book.price == price and book.version == version:
+        return book
+
+    leader_phone = db.session.execute(
+        db.select(Bid.bidder_phone)
+        .where(Bid.auction_id == auction.id)
+        .order_by(*WINNING_ORDER)
+        .limit(1)
+    ).scalar()
+    book = ProxyBook(price, leader_phone, version)
+    for row in db.session.execute(
+        db.select(ProxyBid.id, ProxyBid.bidder_name, ProxyBid.bidder_phone,
+                  ProxyBid.max_amount, ProxyBid.created_at)
+        .where(ProxyBid.auction_id == auction.id, ProxyBid.status == 'active')
+        .order_by(ProxyBid.created_at)
+    ):
+        book.add(Proxy(*row))
+    _books[auction.id] = book
+    return book
+
+
+def _apply(auction, book, now, ladder):
+    """حفظ المزايدات الظاهرة الناتجة وتحديث المزاد ضمن المعاملة الحالية
+
+    المزايدة الآلية الفائزة بالتساوي تحمل وقت تسجيلها في priority_time، و bid_time
+    يبقى وقت الحفظ الفعلي.
+    """
+    visible, retired = book.resolve(ladder.increment)
+    if retired:
+        db.session.execute(
+            update(ProxyBid)
+            .where(ProxyBid.id.in_([proxy.id for proxy in retired]))
+            .values(status='outbid', updated_at=now)
+        )
+        # كتابة هذا العامل تغير النسخة أيضاً؛ يُعاد التحميل عند الطلب التالي
+        book.version = None
+
+    bids = [
+        Bid(id=new_id(), auction_id=auction.id, bidder_name=proxy.bidder_name,
+            bidder_phone=proxy.bidder_phone, bid_amount=amount, is_winning_bid=False,
+            bid_time=now, priority_time=proxy.created_at if tie else None)
+        for proxy, amount, tie in visible
+    ]
+    if bids:
+        db.session.add_all(bids)
+        auction.current_highest_bid = bids[-1].bid_amount
+        auction.total_bids = (auction.total_bids or 0) + len(bids)
+    return bids
+
+
+def apply_bid(auction, bidder_phone, amount, now, ladder):
+    """تطبيق مزايدة يدوية مقبولة على المزاد ثم رد المزايدات الآلية عليها
+
+    يعيد المزايدات الظاهرة التي أضافتها المزايدات الآلية.
+    """
+    with _lock:
+        book = _book_for(auction)
+        book.place(bidder_phone, amount)
+        auction.current_highest_bid = amount
+        return _apply(auction, book, now, ladder)
+
+
+def current_leader(auction_id):
+    """رقم هاتف صاحب أعلى مزايدة حسب آخر حالة في الذاكرة"""
+    book = _books.get(auction_id)
+    return book.leader_phone if book is not None else None
+
+
+def register_proxy(auction, item, now, ladder):
+    """تسجيل مزايدة آلية أو رفع حدها ثم حل المنافسة
+
+    الحد الأقصى الجديد يجب أن يبلغ أقل مزايدة تالية حسب سلم الزيادة (أو يتجاوز
+    الحد السابق عند الرفع). يعيد (ProxyBid, المزايدات الظاهرة) أو (None, أدنى حد مقبول).
+    """
+    max_amount = Money.parse(item['max_amount'])
+    with _lock:
+        book = _book_for(auction)
+        existing = book.proxy_for(item['bidder_phone'])
+        if existing:
+            if max_amount <= existing.max_amount:
+                return None, existing.max_amount + 1
+        else:
+            minimum = ladder.minimum_next(book.price)
+            if max_amount < minimum:
+                return None, minimum
+
+        if existing:
+            row = db.session.get(ProxyBid, existing.id)
+            row.max_amount = max_amount
+            existing.max_amount = max_amount
+            book.add(existing)
+        else:
+            row = ProxyBid(id=new_id(), auction_id=auction.id, bidder_name=item['bidder_name'],
+                           bidder_phone=item['bidder_phone'], max_amount=max_amount,
+                           status='active', created_at=now)
+            db.session.add(row)
+            book.add(Proxy(row.id, row.bidder_name, row.bidder_phone, max_amount, now))
+        book.version = None
+        return row, _apply(auction, book, now, ladder)
@@ -0,0 +1,41 @@
+"""إضافة pytest: فشل الاختبار إذا تجاوز عدد استعلاماته الميزانية أو كرر نفس الاستعلام
+
+    @pytest.mark.query_budget(5)              # خمسة استعلامات على الأكثر في جسم الاختبار
+    @pytest.mark.query_budget(20, repeats=3)  # ونفس البصمة ثلاث مرات على الأكثر (N+1)
+
+تُفعّل في conftest.py بـ pytest_plugins = ['src.services.pytest_query_budget'].
+إعداد الـ fixtures لا يُحسب، فقط ما ينفذه الاختبار نفسه (بما فيه طلبات test client).
+"""
+import pytest
+
+from src.services.query_inspector import record_queries
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'query_budget(max_queries, repeats=None): fail the test if it issues more SQL statements'
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        return (yield)
+
+    max_queries = marker.args[0] if marker.args else marker.kwargs.get('max_queries')
+    repeats = marker.kwargs.get('repeats')
+    with record_queries() as trace:
+        result = yield
+
+    problems = []
+    if max_queries is not None and len(trace) > max_queries:
+        problems.append(f'{len(trace)} queries, budget is {max_queries}')
+    if repeats is not None:
+        problems.extend(
+            f'{count}x {query_fingerprint} ({origin})'
+            for query_fingerprint, count, origin in trace.repeated(repeats + 1)
+        )
+    if problems:
+        pytest.fail('Query budget exceeded:\n  ' + '\n  '.join(problems), pytrace=False)
+    return result
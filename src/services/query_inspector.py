@@ -0,0 +1,159 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_PRODUCTION_SAMPLE_RATE = 0.01  # نسبة الطلبات المفحوصة خارج وضع التطوير
+DEFAULT_SLOW_QUERY_SECONDS = 0.25
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5  # تكرار نفس الاستعلام في طلب واحد يُعتبر N+1 من هنا
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_THIS_FILE = os.path.abspath(__file__)
+
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+_VALUE_LISTS = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)')
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+_active = ContextVar('query_traces', default=())
+_lock = threading.Lock()
+_listening = False
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement):
+    """نص الاستعلام بعد توحيد القيم: نفس الشكل بقيم مختلفة يعطي نفس البصمة
+
+    القيم النصية والرقمية تصبح ?، وقوائم IN الممددة (?, ?, ?) تصبح (...)،
+    والمسافات تُختصر، حتى تتطابق استعلامات الحلقة الواحدة مهما اختلفت معرفاتها.
+    """
+    normalized = _STRINGS.sub('?', statement)
+    normalized = _NUMBERS.sub('?', normalized)
+    normalized = _VALUE_LISTS.sub('(...)', normalized)
+    return _SPACES.sub(' ', normalized).strip()
+
+
+def _origin():
+    """أول إطار من كود التطبيق (خارج المكتبات وهذا الملف) نفّذ الاستعلام"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(APP_ROOT) and filename != _THIS_FILE
+                and 'site-packages' not in filename and os.sep + 'lib' + os.sep + 'python' not in filename):
+            return f'{os.path.relpath(filename, APP_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryTrace:
+    """الاستعلامات المنفذة داخل نطاق واحد (طلب أو اختبار) مع بصمتها ومدتها ومصدرها"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def record(self, statement, seconds, origin):
+        self.queries.append((fingerprint(statement), seconds, origin))
+
+    def repeated(self, threshold):
+        """البصمات المكررة threshold مرة أو أكثر: [(fingerprint, count, origin)]"""
+        counts = Counter(query[0] for query in self.queries)
+        origins = {}
+        for query_fingerprint, _, origin in self.queries:
+            origins.setdefault(query_fingerprint, origin)
+        return [(query_fingerprint, count, origins[query_fingerprint])
+                for query_fingerprint, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_seconds):
+        return [query for query in self.queries if query[1] >= threshold_seconds]
+
+
+@contextmanager
+def record_queries():
+    """تسجيل كل استعلامات هذا السياق (نفس الخيط) في QueryTrace"""
+    _ensure_listening()
+    trace = QueryTrace()
+    token = _active.set(_active.get() + (trace,))
+    try:
+        yield trace
+    finally:
+        _active.reset(token)
+
+
+def _ensure_listening():
+    global _listening
+    with _lock:
+        if not _listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            _listening = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() and context is not None:
+        context._inspector_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    traces = _active.get()
+    started = getattr(context, '_inspector_started', None)
+    if not traces or started is None:
+        return
+    seconds = time.perf_counter() - started
+    origin = _origin()
+    for trace in traces:
+        trace.record(statement, seconds, origin)
+
+
+def init_query_inspector(app):
+    """فحص عينة من الطلبات بحثاً عن استعلامات N+1 والاستعلامات البطيئة
+
+    QUERY_INSPECTOR_SAMPLE_RATE: نسبة الطلبات المفحوصة (كلها في وضع debug، و1%
+    افتراضياً في الإنتاج، و0 للتعطيل). الطلبات غير المختارة لا تسجل أي استعلام.
+    التحذيرات تُكتب في app.logger مع اسم المسار ومكان الاستعلام في الكود.
+    """
+    app.config.setdefault('QUERY_INSPECTOR_SAMPLE_RATE', 1.0 if app.debug else DEFAULT_PRODUCTION_SAMPLE_RATE)
+    app.config.setdefault('SLOW_QUERY_SECONDS', DEFAULT_SLOW_QUERY_SECONDS)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+    if not app.config['QUERY_INSPECTOR_SAMPLE_RATE']:
+        return
+    _ensure_listening()
+    app.before_request(_start_trace)
+    app.teardown_request(_finish_trace)
+
+
+def _start_trace():
+    if random.random() < current_app.config['QUERY_INSPECTOR_SAMPLE_RATE']:
+        trace = QueryTrace()
+        g.query_trace = trace
+        _active.set(_active.get() + (trace,))
+
+
+def _finish_trace(exc):
+    trace = g.pop('query_trace', None)
+    if trace is None:
+        return
+    _active.set(tuple(active for active in _active.get() if active is not trace))
+    report_trace(trace, request.endpoint or request.path)
+
+
+def report_trace(trace, route):
+    """تسجيل تحذير لكل بصمة متكررة (N+1) ولكل استعلام بطيء في الطلب"""
+    config = current_app.config
+    for query_fingerprint, count, origin in trace.repeated(config['N_PLUS_ONE_THRESHOLD']):
+        current_app.logger.warning('N+1 query in %s: %dx %s (%s)', route, count, query_fingerprint, origin)
+    for query_fingerprint, seconds, origin in trace.slow(config['SLOW_QUERY_SECONDS']):
+        current_app.logger.warning('Slow query in %s: %.3fs %s (%s)', route, seconds, query_fingerprint, origin)
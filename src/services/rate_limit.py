@@ -0,0 +1,255 @@
+import math
+import socket
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlparse
+
+import jwt
+from flask import request, jsonify
+
+DEFAULT_STORAGE_URL = 'memory://'
+# لكل قاعدة: rate رموز تُضاف كل ثانية، و burst سعة الدلو (أقصى دفعة متتالية)
+DEFAULT_LIMITS = {
+    'bid_ip': {'rate': 5, 'burst': 20},
+    'bid_bidder': {'rate': 2, 'burst': 10},
+    'bid_user': {'rate': 2, 'burst': 10},
+}
+SWEEP_EVERY = 10000  # طلبات بين كل تنظيف للمفاتيح الخاملة
+STORE_RETRY_DELAY = 5  # ثوانٍ: مدة تجاوز المخزن المشترك بعد تعذر الوصول إليه
+
+
+class MemoryBucketStore:
+    """دلاء الرموز في ذاكرة العملية بصيغة GCRA
+
+    كل مفتاح يُخزن كرقم واحد: وقت الوصول النظري (TAT) للطلب التالي، وهو
+    مكافئ لعدد الرموز المتبقية دون خيط يعيد تعبئة الدلاء. المفتاح الذي
+    مضى وقته النظري دلوه ممتلئ، فيُحذف عند التنظيف الدوري.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def __len__(self):
+        return len(self._tats)
+
+    def hit(self, key, interval, burst):
+        """استهلاك رمز: يعيد 0 عند السماح أو عدد الثواني حتى يتوفر رمز"""
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tats.get(key, now), now)
+            wait = tat + interval - burst * interval - now
+            if wait > 0:
+                return wait
+            self._tats[key] = tat + interval
+            self._hits += 1
+            if self._hits >= SWEEP_EVERY:
+                self._sweep(now)
+            return 0
+
+    def _sweep(self, now):
+        self._hits = 0
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+
+
+# نفس حساب GCRA ذرياً داخل الخادم وبساعته، فتتشارك كل العمليات نفس الدلاء
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local wait = tat + interval - burst * interval - now
+if wait > 0 then return tostring(wait) end
+redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', math.ceil((tat + interval - now) * 1000))
+return '0'
+"""
+
+
+class RespError(Exception):
+    pass
+
+
+class RespConnection:
+    """عميل صغير لبروتوكول RESP (Redis و Valkey و KeyDB) دون اعتماد إضافي"""
+
+    def __init__(self, host, port, db=0, password=None, timeout=0.5):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile('rb')
+        if password:
+            self.command('AUTH', password)
+        if db:
+            self.command('SELECT', db)
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def command(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self._sock.sendall(b''.join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError('Connection closed by server')
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode()
+        if kind == b'-':
+            raise RespError(body.decode())
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            return self._reader.read(length + 2)[:-2].decode()
+        if kind == b'*':
+            length = int(body)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise RespError(f'Unexpected reply: {line!r}')
+
+
+class RespBucketStore:
+    """دلاء مشتركة بين العمليات والخوادم عبر خادم يتحدث بروتوكول Redis
+
+    اتصال لكل خيط، والسكربت يُحمّل مرة ويُستدعى بـ EVALSHA. عند تعذر
+    الوصول للخادم يُسمح بالطلبات (fail open) لمدة STORE_RETRY_DELAY حتى لا
+    يتوقف المزاد أو ينتظر كل طلب مهلة الاتصال بسبب المحدِّد.
+    """
+
+    def __init__(self, url, prefix='rl:'):
+        parsed = urlparse(url)
+        self._address = (parsed.hostname or 'localhost', parsed.port or 6379)
+        self._db = int(parsed.path.lstrip('/') or 0)
+        self._password = parsed.password
+        self._prefix = prefix
+        self._local = threading.local()
+        self._sha = None
+        self._retry_at = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = RespConnection(*self._address, db=self._db, password=self._password)
+            self._local.connection = connection
+        return connection
+
+    def _evaluate(self, connection, key, interval, burst):
+        if self._sha is None:
+            self._sha = connection.command('SCRIPT', 'LOAD', _GCRA_SCRIPT)
+        try:
+            return connection.command('EVALSHA', self._sha, 1, key, repr(interval), burst)
+        except RespError as e:
+            if not str(e).startswith('NOSCRIPT'):
+                raise
+            self._sha = None
+            return connection.command('EVAL', _GCRA_SCRIPT, 1, key, repr(interval), burst)
+
+    def hit(self, key, interval, burst):
+        if time.monotonic() < self._retry_at:
+            return 0
+        try:
+            return float(self._evaluate(self._connection(), self._prefix + key, interval, burst))
+        except (OSError, RespError) as e:
+            print(f'Rate limit store unavailable: {e}')
+            self._retry_at = time.monotonic() + STORE_RETRY_DELAY
+            connection = getattr(self._local, 'connection', None)
+            if connection is not None:
+                self._local.connection = None
+                connection.close()
+            return 0
+
+
+def store_from_url(url):
+    scheme = urlparse(url).scheme
+    if scheme == 'memory':
+        return MemoryBucketStore()
+    if scheme in ('redis', 'valkey'):
+        return RespBucketStore(url)
+    raise ValueError(f'Unsupported rate limit storage: {url}')
+
+
+_store = MemoryBucketStore()
+_limits = {name: (1 / limit['rate'], limit['burst']) for name, limit in DEFAULT_LIMITS.items()}
+_enabled = False  # يُفعّل عند init_rate_limiting
+
+
+def init_rate_limiting(app):
+    """ضبط قواعد تحديد المعدل ومخزن الدلاء
+
+    RATE_LIMITS = {'bid_ip': {'rate': 5, 'burst': 20}, ...}
+    RATE_LIMIT_STORAGE_URL = 'memory://' لعملية واحدة، أو 'redis://host:6379/0'
+    لمشاركة الدلاء بين عدة عمليات.
+    """
+    global _store, _limits, _enabled
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    app.config.setdefault('RATE_LIMIT_STORAGE_URL', DEFAULT_STORAGE_URL)
+    app.config.setdefault('RATE_LIMITS', {})
+    limits = {**DEFAULT_LIMITS, **app.config['RATE_LIMITS']}
+    _limits = {name: (1 / limit['rate'], limit['burst']) for name, limit in limits.items()}
+    _store = store_from_url(app.config['RATE_LIMIT_STORAGE_URL'])
+    _enabled = app.config['RATE_LIMIT_ENABLED']
+
+
+def check_rate_limit(name, key):
+    """استهلاك رمز من دلو القاعدة للمفتاح: يعيد 0 أو ثواني الانتظار"""
+    interval, burst = _limits[name]
+    return _store.hit(f'{name}:{key}', interval, burst)
+
+
+def client_ip():
+    return request.remote_addr
+
+
+def bidder_phone():
+    data = request.get_json(silent=True)
+    return data.get('bidder_phone') if isinstance(data, dict) else None
+
+
+def bearer_user_id():
+    """معرف المستخدم من التوكن إن وجد، دون قراءة من القاعدة"""
+    from src.routes.auth import SECRET_KEY
+
+    token = request.headers.get('Authorization', '')
+    if not token:
+        return None
+    try:
+        return jwt.decode(token.removeprefix('Bearer '), SECRET_KEY, algorithms=['HS256']).get('user_id')
+    except jwt.InvalidTokenError:
+        return None
+
+
+def rate_limited(*rules):
+    """ديكوريتر يرفض الطلب بـ 429 قبل أي عمل على القاعدة إذا نفد دلو أي قاعدة
+
+    rules: أزواج (اسم القاعدة، دالة تستخرج المفتاح من الطلب)، والمفتاح None يتجاوز القاعدة.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if _enabled:
+                for name, key_func in rules:
+                    key = key_func()
+                    if key is None:
+                        continue
+                    wait = check_rate_limit(name, key)
+                    if wait:
+                        response = jsonify({'error': 'طلبات كثيرة، حاول لاحقاً', 'retry_after': round(wait, 3)})
+                        response.headers['Retry-After'] = str(math.ceil(wait))
+                        return response, 429
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+BID_RATE_LIMITS = (('bid_ip', client_ip), ('bid_bidder', bidder_phone), ('bid_user', bearer_user_id))
@@ -0,0 +1,73 @@
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import g, request, current_app
+from sqlalchemy import create_engine
+
+STICKY_COOKIE = 'primary_until'
+DEFAULT_STICKY_SECONDS = 5
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+_lock = threading.Lock()
+
+
+def init_read_replicas(app):
+    """إنشاء محركات نسخ القراءة وتفعيل الالتصاق بالأساسية بعد الكتابة
+
+    SQLALCHEMY_REPLICA_URIS = ['postgresql://replica1/...', ...]
+    بدون نسخ تبقى كل القراءات على القاعدة الأساسية. بعد أي كتابة ناجحة يُضبط
+    كوكي يبقي قراءات نفس العميل على الأساسية لمدة READ_YOUR_WRITES_SECONDS،
+    فلا يرى العميل بيانات أقدم من كتابته بسبب تأخر النسخ.
+    """
+    app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+    app.config.setdefault('READ_YOUR_WRITES_SECONDS', DEFAULT_STICKY_SECONDS)
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engines = [create_engine(uri, **options) for uri in app.config['SQLALCHEMY_REPLICA_URIS']]
+    app.extensions['read_replicas'] = itertools.cycle(engines) if engines else None
+    app.extensions['read_replica_engines'] = engines
+
+    app.after_request(_mark_write)
+
+
+def _mark_write(response):
+    sticky = current_app.config['READ_YOUR_WRITES_SECONDS']
+    if request.method in WRITE_METHODS and response.status_code < 400 and sticky:
+        response.set_cookie(STICKY_COOKIE, f'{time.time() + sticky:.3f}', max_age=sticky, httponly=True)
+    return response
+
+
+def _sticky_to_primary():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def next_replica(app):
+    """نسخة القراءة التالية بالتناوب، أو None إذا لا توجد نسخ (يعمل خارج الطلبات أيضاً)"""
+    replicas = app.extensions.get('read_replicas')
+    if replicas is None:
+        return None
+    with _lock:
+        return next(replicas)
+
+
+def replica_engine():
+    """نسخة القراءة التالية بالتناوب، أو None إذا لا توجد نسخ أو العميل كتب مؤخراً"""
+    if _sticky_to_primary():
+        return None
+    return next_replica(current_app)
+
+
+def read_replica(f):
+    """ديكوريتر لمعالجات القراءة فقط: استعلامات الطلب كلها تذهب لنسخة قراءة واحدة"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.read_engine = replica_engine()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.read_engine = None
+    return decorated
@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from src.models.user import db
+from src.models.notification import Notification
+from src.services.workers import start_background
+
+_app = None
+
+DEFAULT_TTL_DAYS = {'default': 30}
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_INTERVAL = 3600  # ثوانٍ
+
+
+def init_notification_retention(app):
+    """ربط مهمة الاحتفاظ بالإشعارات بالتطبيق وتشغيلها دورياً في الخلفية"""
+    global _app
+    _app = app
+    app.config.setdefault('NOTIFICATION_TTL_DAYS', DEFAULT_TTL_DAYS)
+    app.config.setdefault('NOTIFICATION_RETENTION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    app.config.setdefault('NOTIFICATION_RETENTION_INTERVAL', DEFAULT_INTERVAL)
+    app.config.setdefault('NOTIFICATION_ARCHIVE_DIR',
+                          os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'archive'))
+    app.config.setdefault('NOTIFICATION_RETENTION_ENABLED', True)
+
+    if app.config['NOTIFICATION_RETENTION_ENABLED']:
+        start_background(_retention_loop, 'notification-retention', leader_only=True)
+
+
+def _expired_conditions(ttl_days, now):
+    """شروط الإشعارات المقروءة المنتهية صلاحيتها لكل نوع حسب مدة الاحتفاظ الخاصة به"""
+    default_ttl = ttl_days.get('default')
+    typed = {notification_type: days for notification_type, days in ttl_days.items() if notification_type != 'default'}
+
+    conditions = [
+        db.and_(Notification.type == notification_type,
+                Notification.created_at < now - timedelta(days=days))
+        for notification_type, days in typed.items()
+    ]
+    if default_ttl is not None:
+        conditions.append(db.and_(Notification.type.not_in(typed) if typed else db.true(),
+                                  Notification.created_at < now - timedelta(days=default_ttl)))
+    return conditions
+
+
+def purge_notifications(ttl_days=None, batch_size=DEFAULT_BATCH_SIZE, archive_dir=None, now=None):
+    """حذف الإشعارات المقروءة الأقدم من مدة الاحتفاظ على دفعات محدودة
+
+    كل دفعة معاملة قصيرة مستقلة حتى لا يُقفل الجدول لفترة طويلة. عند تحديد
+    archive_dir تُكتب الصفوف أولاً إلى ملف JSONL مضغوط ثم تُحذف، لذلك قد
+    يتكرر صف في الأرشيف إذا توقفت العملية بين الكتابة والحذف لكنه لا يضيع.
+    """
+    ttl_days = ttl_days or DEFAULT_TTL_DAYS
+    now = now or datetime.utcnow()
+    conditions = _expired_conditions(ttl_days, now)
+    if not conditions:
+        return 0
+
+    archive = None
+    purged = 0
+    try:
+        while True:
+            notifications = db.session.execute(
+                db.select(Notification)
+                .where(Notification.is_read == True, db.or_(*conditions))
+                .order_by(Notification.created_at)
+                .limit(batch_size)
+            ).scalars().all()
+            if not notifications:
+                break
+
+            if archive_dir:
+                if archive is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    archive = gzip.open(
+                        os.path.join(archive_dir, f"notifications-{now.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"),
+                        'at', encoding='utf-8'
+                    )
+                for notification in notifications:
+                    archive.write(json.dumps(notification.to_dict(), ensure_ascii=False) + '\n')
+                archive.flush()
+
+            db.session.execute(
+                delete(Notification).where(Notification.id.in_([n.id for n in notifications])),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            db.session.expunge_all()
+            purged += len(notifications)
+
+            if len(notifications) < batch_size:
+                break
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if archive:
+            archive.close()
+
+    return purged
+
+
+def _retention_loop():
+    """تشغيل مهمة الاحتفاظ كل فترة محددة"""
+    while True:
+        with _app.app_context():
+            try:
+                purge_notifications(
+                    ttl_days=_app.config['NOTIFICATION_TTL_DAYS'],
+                    batch_size=_app.config['NOTIFICATION_RETENTION_BATCH_SIZE'],
+                    archive_dir=_app.config['NOTIFICATION_ARCHIVE_DIR']
+                )
+            except Exception as e:
+                print(f'Notification retention failed: {e}')
+            finally:
+                db.session.remove()
+        time.sleep(_app.config['NOTIFICATION_RETENTION_INTERVAL'])
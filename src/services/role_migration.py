@@ -0,0 +1,30 @@
+"""إضافة عمود role لجدول users في القواعد المنشأة قبله
+
+create_all لا يضيف أعمدة لجداول موجودة، فيُضاف العمود هنا بقيمة merchant لكل
+المستخدمين الحاليين. منح صلاحية المدير يدوياً:
+    UPDATE users SET role = 'admin' WHERE username = '...';
+
+التشغيل يدوياً على قاعدة بيانات:
+    python -m src.services.role_migration sqlite:///src/database/app.db
+"""
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+
+
+def migrate_user_roles(engine):
+    """إضافة العمود إن لم يوجد؛ آمن لإعادة التشغيل. يعيد True إذا أُضيف"""
+    inspector = inspect(engine)
+    if 'users' not in inspector.get_table_names():
+        return False
+    if any(column['name'] == 'role' for column in inspector.get_columns('users')):
+        return False
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'merchant'"))
+    return True
+
+
+if __name__ == '__main__':
+    url = sys.argv[1] if len(sys.argv) > 1 else 'sqlite:///src/database/app.db'
+    added = migrate_user_roles(create_engine(url))
+    print('Added users.role' if added else 'users.role already exists')
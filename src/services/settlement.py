@@ -0,0 +1,278 @@
+import heapq
+import queue
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, insert, update
+
+from src.models.user import db
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.bid import Bid, WINNING_ORDER
+from src.models.order import Order
+from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.models.proxy_bid import ProxyBid
+from src.models.ids import new_id
+from src.services.outbox import notification_outbox_rows
+from src.services.unread_counter import adjust_unread_counts
+from src.services.bid_journal import materialize_pending
+from src.services.proxy_bidding import forget_auction
+from src.services.merchant_rollups import RollupDeltas, adjust_merchant_rollups
+from src.services.workers import start_background, is_leader
+
+# طابور المزادات المنتهية بانتظار التسوية (إنشاء الطلب، إشعار التاجر، تحديث المنتج)
+_settlement_queue = queue.Queue()
+_app = None
+_retry_heap = []  # (موعد المحاولة التالية، معرف المزاد) لمزادات فشلت تسويتها
+_attempts = Counter()
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_SWEEP_INTERVAL = 5  # ثوانٍ
+RETRY_DELAY = 1  # ثوانٍ، تتضاعف مع كل محاولة فاشلة
+MAX_RETRY_DELAY = 300
+
+
+def init_settlement(app):
+    """ربط خط التسوية بالتطبيق وتشغيل العامل الخلفي"""
+    global _app
+    _app = app
+    app.config.setdefault('SETTLEMENT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    app.config.setdefault('SETTLEMENT_SWEEP_INTERVAL', DEFAULT_SWEEP_INTERVAL)
+    app.config.setdefault('SETTLEMENT_WORKER_ENABLED', True)
+
+    if app.config['SETTLEMENT_WORKER_ENABLED']:
+        # الطابور محلي لكل عملية، والبحث الدوري عن المزادات المنتهية للقائد فقط
+        start_background(_worker_loop, 'settlement-worker')
+
+
+def enqueue_settlement(auction_id):
+    """إضافة مزاد منتهٍ إلى طابور التسوية"""
+    _settlement_queue.put(auction_id)
+
+
+def close_expired_auctions(now=None):
+    """إنهاء جميع المزادات النشطة التي تجاوزت وقت انتهائها وإرجاع معرفاتها"""
+    now = now or datetime.utcnow()
+    expired = db.session.execute(
+        db.select(Auction.id, Auction.user_id).where(Auction.status == 'active', Auction.end_time <= now)
+    ).all()
+    expired_ids = [auction_id for auction_id, _ in expired]
+    if expired_ids:
+        db.session.execute(
+            update(Auction)
+            .where(Auction.id.in_(expired_ids), Auction.status == 'active')
+            .values(status='ended', updated_at=now)
+        )
+        deltas = RollupDeltas()
+        for _, user_id in expired:
+            deltas.auction(user_id, 'active', -1)
+        adjust_merchant_rollups(deltas)
+        db.session.commit()
+    return expired_ids
+
+
+def settle_auctions(auction_ids):
+    """تسوية دفعة من المزادات المنتهية في معاملة واحدة
+
+    عدد الاستعلامات ثابت لكل دفعة مهما كان عدد المزادات: تحديد الفائزين،
+    تحديث المزادات والمزايدات والمنتجات، ثم إدراج الطلبات والإشعارات دفعة واحدة.
+    إرسال الإشعارات للتجار يتم عبر صندوق الصادر ضمن نفس المعاملة.
+    المزادات التي لها طلب مسبق يتم تجاهلها، لذلك يمكن إعادة التسوية بأمان.
+    """
+    auction_ids = list(dict.fromkeys(auction_ids))
+    if not auction_ids:
+        return []
+
+    try:
+        auctions = {
+            auction.id: auction for auction in db.session.execute(
+                db.select(Auction).where(Auction.id.in_(auction_ids), Auction.status == 'ended')
+            ).scalars()
+        }
+        if not auctions:
+            return []
+
+        already_settled = {row[0] for row in db.session.execute(
+            db.select(Order.auction_id).where(Order.auction_id.in_(auctions.keys()))
+        )}
+        pending = [auction for auction_id, auction in auctions.items() if auction_id not in already_settled]
+        if not pending:
+            return []
+
+        # أعلى مزايدة لكل مزاد (الأقدم عند التعادل) في استعلام واحد
+        ranked = db.select(
+            Bid,
+            func.row_number().over(
+                partition_by=Bid.auction_id,
+                order_by=WINNING_ORDER
+            ).label('rank')
+        ).where(Bid.auction_id.in_([auction.id for auction in pending])).subquery()
+        ranked_bid = db.aliased(Bid, ranked)
+        winners = {
+            bid.auction_id: bid for bid in db.session.execute(
+                db.select(ranked_bid).where(ranked.c.rank == 1)
+            ).scalars()
+        }
+
+        now = datetime.utcnow()
+        auction_rows = []
+        order_rows = []
+        notification_rows = []
+        for auction in pending:
+            bid = winners.get(auction.id)
+            if not bid:
+                continue
+
+            order_id = new_id()
+            auction_rows.append({
+                'id': auction.id,
+                'winner_bid_id': bid.id,
+                'current_highest_bid': bid.bid_amount,
+                'updated_at': now
+            })
+            order_rows.append({
+                'id': order_id,
+                'auction_id': auction.id,
+                'bid_id': bid.id,
+                'user_id': auction.user_id,
+                'customer_name': bid.bidder_name,
+                'customer_phone': bid.bidder_phone,
+                'final_price': bid.bid_amount,
+                'delivery_address': '',
+                'notes': '',
+                'created_at': now,
+                'updated_at': now
+            })
+            notification_rows.append({
+                'id': new_id(),
+                'user_id': auction.user_id,
+                'type': 'auction_ended',
+                'title': 'انتهى المزاد',
+                'message': f'فاز {bid.bidder_name} بالمزاد بمبلغ {bid.bid_amount}',
+                'related_auction_id': auction.id,
+                'related_order_id': order_id,
+                'created_at': now
+            })
+
+        if auction_rows:
+            sold_products = db.session.execute(
+                db.select(Product.user_id, Product.status)
+                .where(Product.id.in_([auctions[row['id']].product_id for row in auction_rows]))
+            ).all()
+            db.session.execute(update(Auction), auction_rows)
+            db.session.execute(
+                update(Bid)
+                .where(Bid.id.in_([row['winner_bid_id'] for row in auction_rows]))
+                .values(is_winning_bid=True)
+            )
+            db.session.execute(
+                update(Product)
+                .where(Product.id.in_([auctions[row['id']].product_id for row in auction_rows]))
+                .values(status='sold', updated_at=now)
+            )
+            db.session.execute(insert(Order), order_rows)
+            db.session.execute(insert(Notification), notification_rows)
+            db.session.execute(insert(OutboxMessage), notification_outbox_rows(notification_rows))
+            adjust_unread_counts(Counter(row['user_id'] for row in notification_rows))
+
+            deltas = RollupDeltas()
+            for user_id, status in sold_products:
+                deltas.product(user_id, status, -1)
+                deltas.product(user_id, 'sold', 1)
+            for row in order_rows:
+                deltas.order(row['user_id'], 'pending', row['final_price'], row['created_at'])
+            adjust_merchant_rollups(deltas)
+
+        # المزايدات الآلية للمزادات المنتهية لم تعد نشطة
+        db.session.execute(
+            update(ProxyBid)
+            .where(ProxyBid.auction_id.in_([auction.id for auction in pending]), ProxyBid.status == 'active')
+            .values(status='closed', updated_at=now)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for auction in pending:
+        forget_auction(auction.id)
+    return order_rows
+
+
+def _drain_batch(batch_size, timeout):
+    """سحب دفعة من الطابور، مع انتظار أول عنصر حتى انتهاء المهلة"""
+    batch = []
+    try:
+        batch.append(_settlement_queue.get(timeout=timeout))
+        while len(batch) < batch_size:
+            batch.append(_settlement_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _retry_later(auction_ids):
+    """إعادة المزادات للطابور بعد مهلة متزايدة: المزاد المنتهي لا يجده البحث الدوري ثانية"""
+    now = time.monotonic()
+    for auction_id in auction_ids:
+        _attempts[auction_id] += 1
+        delay = min(RETRY_DELAY * 2 ** (_attempts[auction_id] - 1), MAX_RETRY_DELAY)
+        heapq.heappush(_retry_heap, (now + delay, auction_id))
+
+
+def _due_retries():
+    now = time.monotonic()
+    due = []
+    while _retry_heap and _retry_heap[0][0] <= now:
+        due.append(heapq.heappop(_retry_heap)[1])
+    return due
+
+
+def settle_queued(auction_ids, batch_size=DEFAULT_BATCH_SIZE):
+    """تسوية المزادات دفعة بعد دفعة؛ الدفعة الفاشلة تُسوّى مزاداً مزاداً
+
+    مزاد واحد معطوب لا يُسقط بقية دفعته، وما فشل وحده يُعاد لاحقاً بـ _retry_later.
+    """
+    for start in range(0, len(auction_ids), batch_size):
+        chunk = auction_ids[start:start + batch_size]
+        failed = []
+        try:
+            settle_auctions(chunk)
+        except Exception as e:
+            print(f'Settlement batch failed, settling one at a time: {e}')
+            for auction_id in chunk:
+                try:
+                    settle_auctions([auction_id])
+                except Exception as e:
+                    print(f'Settling auction {auction_id} failed: {e}')
+                    failed.append(auction_id)
+        _retry_later(failed)
+        for auction_id in chunk:
+            if auction_id not in failed:
+                _attempts.pop(auction_id, None)
+
+
+def _worker_loop():
+    """العامل الخلفي: يسوّي المزادات المضافة للطابور ويغلق المزادات المنتهية دورياً"""
+    batch_size = _app.config['SETTLEMENT_BATCH_SIZE']
+    sweep_interval = _app.config['SETTLEMENT_SWEEP_INTERVAL']
+
+    while True:
+        batch = _drain_batch(batch_size, sweep_interval) + _due_retries()
+        with _app.app_context():
+            try:
+                try:
+                    materialize_pending()
+                    if is_leader():
+                        batch.extend(close_expired_auctions())
+                except Exception as e:
+                    # دون تطبيق سجل المزايدات قد يفوز غير صاحب أعلى مزايدة، فتنتظر التسوية
+                    print(f'Settlement sweep failed: {e}')
+                    db.session.rollback()
+                    _retry_later(batch)
+                    continue
+                settle_queued(batch, batch_size)
+            finally:
+                db.session.remove()
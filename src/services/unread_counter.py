@@ -0,0 +1,142 @@
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, insert, update, bindparam, case
+
+from src.models.user import db
+from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.models.unread_counter import UnreadNotificationCounter
+from src.models.upsert import upsert
+from src.services.outbox import outbox_row
+from src.services.workers import start_background
+
+_app = None
+
+DEFAULT_RECONCILE_INTERVAL = 300  # ثوانٍ
+
+
+def init_unread_counters(app):
+    """تشغيل المطابقة الدورية لعدادات الإشعارات غير المقروءة"""
+    global _app
+    _app = app
+    app.config.setdefault('UNREAD_RECONCILE_INTERVAL', DEFAULT_RECONCILE_INTERVAL)
+    app.config.setdefault('UNREAD_RECONCILE_ENABLED', True)
+
+    if app.config['UNREAD_RECONCILE_ENABLED']:
+        start_background(_reconcile_loop, 'unread-reconciler', leader_only=True)
+
+
+def unread_deltas(*conditions):
+    """عدد الإشعارات غير المقروءة المطابقة للشروط لكل مستخدم (بإشارة سالبة)
+
+    تُستدعى قبل تحديث أو حذف جماعي لمعرفة مقدار إنقاص كل عداد.
+    """
+    rows = db.session.execute(
+        db.select(Notification.user_id, func.count())
+        .where(Notification.is_read == False, *conditions)
+        .group_by(Notification.user_id)
+    )
+    return {user_id: -count for user_id, count in rows}
+
+
+def adjust_unread_counts(deltas):
+    """تعديل عدادات المستخدمين ضمن المعاملة الحالية ودفع القيم الجديدة لغرف التجار
+
+    deltas: قاموس أو Counter من معرف المستخدم إلى مقدار التغيير.
+    يجب استدعاؤها بعد تنفيذ الإدراج/التحديث/الحذف، لأن العداد غير الموجود
+    يُنشأ من العدد الفعلي الحالي دون تطبيق مقدار التغيير عليه.
+    عدد الاستعلامات ثابت مهما كان عدد المستخدمين.
+    """
+    deltas = {user_id: delta for user_id, delta in Counter(deltas).items() if delta}
+    if not deltas:
+        return {}
+
+    user_ids = list(deltas)
+    existing = set(db.session.execute(
+        db.select(UnreadNotificationCounter.user_id).where(UnreadNotificationCounter.user_id.in_(user_ids))
+    ).scalars())
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    table = UnreadNotificationCounter.__table__
+    new_count = table.c.unread_count + bindparam('delta')
+    clamped = case((new_count < 0, 0), else_=new_count)
+    if missing:
+        # العداد الجديد يبدأ من العدد الفعلي حتى لا يعتمد على تاريخ سابق للعدادات؛
+        # وإن أنشأه كاتب متزامن بعد الفحص يُضاف إليه مقدار التغيير بدلاً من خطأ التفرد
+        actual = dict(db.session.execute(
+            db.select(Notification.user_id, func.count())
+            .where(Notification.user_id.in_(missing), Notification.is_read == False)
+            .group_by(Notification.user_id)
+        ).all())
+        db.session.execute(upsert(db.session, table, {'unread_count': clamped, 'updated_at': datetime.utcnow()}), [
+            {'user_id': user_id, 'unread_count': actual.get(user_id, 0), 'updated_at': datetime.utcnow(),
+             'delta': deltas[user_id]}
+            for user_id in missing
+        ])
+
+    if existing:
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('counter_user_id'))
+            .values(unread_count=clamped, updated_at=datetime.utcnow()),
+            [{'counter_user_id': user_id, 'delta': deltas[user_id]} for user_id in existing]
+        )
+
+    counts = dict(db.session.execute(
+        db.select(UnreadNotificationCounter.user_id, UnreadNotificationCounter.unread_count)
+        .where(UnreadNotificationCounter.user_id.in_(user_ids))
+    ).all())
+    _push_counts(counts)
+    return counts
+
+
+def _push_counts(counts):
+    if counts:
+        db.session.execute(insert(OutboxMessage), [
+            outbox_row('unread_count', f'merchant_{user_id}', {'user_id': user_id, 'unread_count': count})
+            for user_id, count in counts.items()
+        ])
+
+
+def get_unread_count(user_id):
+    """قراءة العداد بمفتاحه الأساسي، وإرجاع None إذا لم يُنشأ بعد"""
+    counter = db.session.get(UnreadNotificationCounter, user_id)
+    return counter.unread_count if counter else None
+
+
+def reconcile_unread_counts():
+    """إعادة حساب جميع العدادات من جدول الإشعارات وتصحيح أي انحراف
+
+    القراءة والتصحيح في جملة UPDATE واحدة، فلا يُكتب عدد قُرئ قبل تغيير متزامن.
+    """
+    table = UnreadNotificationCounter.__table__
+    actual = (
+        db.select(func.count()).select_from(Notification)
+        .where(Notification.user_id == table.c.user_id, Notification.is_read == False)
+        .scalar_subquery()
+    )
+    counts = dict(db.session.execute(
+        update(table)
+        .where(table.c.unread_count != actual)
+        .values(unread_count=actual, updated_at=datetime.utcnow())
+        .returning(table.c.user_id, table.c.unread_count)
+    ).all())
+    _push_counts(counts)
+    db.session.commit()
+    return len(counts)
+
+
+def _reconcile_loop():
+    interval = _app.config['UNREAD_RECONCILE_INTERVAL']
+
+    while True:
+        time.sleep(interval)
+        with _app.app_context():
+            try:
+                reconcile_unread_counts()
+            except Exception as e:
+                db.session.rollback()
+                print(f'Unread counter reconciliation failed: {e}')
+            finally:
+                db.session.remove()
@@ -0,0 +1,200 @@
+import fcntl
+import os
+import signal
+import threading
+import time
+
+DEFAULT_RETRY_INTERVAL = 5  # ثوانٍ بين محاولات العمال الآخرين أخذ القيادة
+ADVISORY_LOCK_KEY = 0x62696466  # مفتاح قفل PostgreSQL الاستشاري لمالك المهام المجدولة
+
+_lock = threading.Lock()
+_deferred = False  # تحت gunicorn: الخيوط الخلفية تبدأ في العامل بعد fork لا في العملية الرئيسية
+_forked = False
+_pending = []  # مهام سُجلت قبل fork
+_leader_jobs = []  # مهام بانتظار انتخاب هذه العملية
+_engines = []
+_election = None
+
+
+class FileLease:
+    """قيادة بقفل flock على ملف: يتحرر تلقائياً عند خروج العملية (لمضيف واحد)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        handle = open(self.path, 'a+')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f'{os.getpid()}\n')
+        handle.flush()
+        self._file = handle
+        return True
+
+    def held(self):
+        return self._file is not None
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class AdvisoryLease:
+    """قيادة بقفل PostgreSQL استشاري على اتصال مخصص (لعدة مضيفات)
+
+    القفل مرتبط بالاتصال: إن انقطع تحرر القفل وقد تنتخب عملية أخرى، لذلك
+    held() يفحص الاتصال في كل دورة.
+    """
+
+    def __init__(self, url, key=ADVISORY_LOCK_KEY):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+        self.key = key
+        self._engine = create_engine(url, poolclass=NullPool)
+        self._connection = None
+
+    def acquire(self):
+        from sqlalchemy import text
+        connection = self._engine.connect()
+        try:
+            got = connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not got:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def held(self):
+        from sqlalchemy import text
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text('SELECT 1'))
+            self._connection.commit()
+            return True
+        except Exception:
+            self.release()
+            return False
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+def make_lease(target):
+    """postgresql://... لقفل استشاري، وأي قيمة أخرى مسار ملف القفل"""
+    if target.startswith('postgresql'):
+        return AdvisoryLease(target)
+    return FileLease(target)
+
+
+class LeaderElection:
+    """محاولة أخذ القيادة كل interval ثانية حتى تنجح، ثم تشغيل مهام القائد
+
+    مهام القائد حلقات بلا إيقاف، فإن فُقدت القيادة (انقطاع اتصال القفل) تنهي
+    العملية نفسها بـ SIGTERM ليعيد gunicorn تشغيلها، فلا يعمل قائدان معاً.
+    """
+
+    def __init__(self, lease, interval=DEFAULT_RETRY_INTERVAL):
+        self.lease = lease
+        self.interval = interval
+        self.is_leader = False
+
+    def start(self):
+        threading.Thread(target=self._run, name='leader-election', daemon=True).start()
+
+    def _run(self):
+        while not self.is_leader:
+            try:
+                if self.lease.acquire():
+                    _elected()
+                    break
+            except Exception as e:
+                print(f'Leader election failed: {e}')
+            time.sleep(self.interval)
+
+        while True:
+            time.sleep(self.interval)
+            if not self.lease.held():
+                print('Leadership lost, restarting worker')
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+
+
+def defer_until_fork():
+    """يُستدعى في gunicorn.conf.py قبل تحميل التطبيق: لا خيوط خلفية في العملية الرئيسية"""
+    global _deferred
+    _deferred = True
+
+
+def is_deferred():
+    """هل تعمل العملية تحت gunicorn.conf.py (الخيوط الخلفية بعد fork)"""
+    return _deferred
+
+
+def start_background(target, name, leader_only=False):
+    """تشغيل حلقة خلفية في خيط؛ leader_only للمهام التي تملكها عملية واحدة فقط
+
+    دون gunicorn (خادم التطوير والاختبارات) تبدأ فوراً. تحت gunicorn تُؤجل
+    لما بعد fork، ومهام القائد تبدأ فقط في العامل المنتخب.
+    """
+    with _lock:
+        if _deferred and not _forked:
+            _pending.append((target, name, leader_only))
+            return
+        if leader_only and _election is not None and not _election.is_leader:
+            _leader_jobs.append((target, name))
+            return
+    threading.Thread(target=target, name=name, daemon=True).start()
+
+
+def is_leader():
+    """هل هذه العملية مالكة المهام المجدولة (دائماً True دون انتخاب)"""
+    return _election is None or _election.is_leader
+
+
+def dispose_after_fork(*engines):
+    """محركات تُفرغ مجمعاتها في العامل بعد fork فينشئ كل عامل اتصالاته بنفسه"""
+    _engines.extend(engines)
+
+
+def after_fork(lease_target, interval=DEFAULT_RETRY_INTERVAL):
+    """post_fork في gunicorn: مجمعات جديدة، ثم المهام المؤجلة، ثم انتخاب القائد
+
+    close=False: اتصالات العملية الرئيسية الموروثة تُترك لها ولا تُغلق من العامل.
+    """
+    global _forked, _election
+    for engine in _engines:
+        engine.dispose(close=False)
+    with _lock:
+        _forked = True
+        _election = LeaderElection(make_lease(lease_target), interval)
+        pending, _pending[:] = list(_pending), []
+    for target, name, leader_only in pending:
+        start_background(target, name, leader_only)
+    _election.start()
+
+
+def _elected():
+    with _lock:
+        _election.is_leader = True
+        jobs, _leader_jobs[:] = list(_leader_jobs), []
+    print(f'Worker {os.getpid()} elected to run scheduled jobs')
+    for target, name in jobs:
+        threading.Thread(target=target, name=name, daemon=True).start()
@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.003  # ثوانٍ
+
+
+class WriteBatcher:
+    """تجميع عمليات الكتابة القادمة من طلبات متزامنة وتنفيذها في معاملة واحدة
+
+    كل طلب يستدعي submit وينتظر نتيجته. خيط كاتب واحد يجمع العناصر حتى
+    يصل عددها إلى max_batch أو تمر max_wait ثانية منذ أول عنصر، ثم يستدعي
+    process_batch مرة واحدة للدفعة كاملة. process_batch يعيد قائمة نتائج
+    بنفس ترتيب العناصر. إذا رفع استثناء تُعاد الدفعة عنصراً عنصراً بالترتيب،
+    فلا يفشل إلا طلب العنصر المعيب (مزاد حُذف أثناء الدفعة مثلاً).
+
+    عند enabled=False تُنفذ كل عملية مباشرة في خيط الطلب (دفعة من عنصر واحد).
+    """
+
+    def __init__(self, process_batch, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT,
+                 name='write-batcher', enabled=True):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, item, timeout=None):
+        """إرسال عنصر للدفعة التالية وانتظار نتيجته"""
+        if not self.enabled:
+            return self.process_batch([item])[0]
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout)
+
+    def _ensure_started(self):
+        # يبدأ الخيط عند أول استخدام حتى لا ينشأ عند الاستيراد أو في العمليات الفرعية قبل fork
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._worker.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    futures[0].set_exception(e)
+                else:
+                    self._run_one_by_one(batch)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def _run_one_by_one(self, batch):
+        for item, future in batch:
+            try:
+                [result] = self.process_batch([item])
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
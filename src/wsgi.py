@@ -0,0 +1,18 @@
+"""نقطة دخول وضع التشغيل غير المتزامن (gevent)
+
+الترقيع يسبق أي استيراد آخر حتى تصبح الخيوط والأقفال والمقابس في التطبيق
+وخدماته الخلفية تعاونية، فلا يُستورد src.main قبل هذا الملف:
+
+    gunicorn -c gunicorn.conf.py src.wsgi:app     # الإنتاج
+    python -m src.wsgi                            # gevent.pywsgi بدون gunicorn
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+from src.main import app, socketio  # noqa: E402
+
+if __name__ == '__main__':
+    socketio.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5001)))
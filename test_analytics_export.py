@@ -0,0 +1,108 @@
+import time
+import uuid
+import pyarrow as pa
+import pyarrow.dataset as ds
+import jwt
+from datetime import datetime
+from src.models.user import db, User
+from src.routes.auth import SECRET_KEY
+from src.models.bid import Bid
+from src.models.ids import new_id, min_id_at
+from src.services.bid_analytics import to_millis
+from src.services.analytics_export import export_tables, load_watermarks
+
+
+def export(directory, **options):
+    # نهاية النطاق مفتوحة: صف في نفس الملي ثانية يُصدّر في التشغيل التالي
+    time.sleep(0.002)
+    return export_tables(str(directory), **options)
+
+
+def read_export(directory, table, fmt='parquet'):
+    dataset = ds.dataset(str(directory / table), format=fmt, partitioning='hive')
+    return sorted(dataset.to_table().to_pylist(), key=lambda row: row['id'])
+
+# -----------------------------------------------------------------------------
+# اختبارات تصدير التحليلات
+# -----------------------------------------------------------------------------
+def test_min_id_at_orders_before_later_ids():
+    moment = datetime.utcnow()
+    time.sleep(0.002)
+    assert min_id_at(to_millis(moment)) <= new_id()
+    assert min_id_at(to_millis(moment)) > min_id_at(to_millis(moment) - 1)
+
+
+def test_export_is_partitioned_and_incremental(app_context, make_auction, tmp_path):
+    app_context.config['ANALYTICS_EXPORT_SETTLE_SECONDS'] = 0
+    first = make_auction([15, 30])
+    second = make_auction([20])
+
+    summary = export(tmp_path)
+    assert {table: result['rows'] for table, result in summary.items()} == {'bids': 3, 'auctions': 2, 'orders': 0}
+    today = datetime.utcnow().date().isoformat()
+    assert (tmp_path / 'bids' / f'date={today}' / f'merchant_id={first.user_id}').is_dir()
+    assert (tmp_path / 'bids' / f'date={today}' / f'merchant_id={second.user_id}').is_dir()
+
+    bids = read_export(tmp_path, 'bids')
+    assert sorted(row['bid_amount'] for row in bids) == [1500, 2000, 3000]  # بالوحدة الصغرى
+    assert {row['merchant_id'] for row in bids} == {first.user_id, second.user_id}
+    assert set(load_watermarks(str(tmp_path))) == {'bids', 'auctions', 'orders'}
+
+    time.sleep(0.002)
+    db.session.add(Bid(auction_id=first.id, bidder_name='late', bidder_phone='0599', bid_amount=40))
+    first.current_highest_bid = 40
+    db.session.commit()
+
+    summary = export(tmp_path)
+    assert summary['bids']['rows'] == 1 and summary['auctions']['rows'] == 1
+    assert len(read_export(tmp_path, 'bids')) == 4
+    assert [row['bidder_name'] for row in read_export(tmp_path, 'bids') if row['bid_amount'] == 4000] == ['late']
+
+
+def test_legacy_uuid4_bids_are_exported_once(app_context, make_auction, tmp_path):
+    app_context.config['ANALYTICS_EXPORT_SETTLE_SECONDS'] = 0
+    auction = make_auction([15])
+    legacy_id = str(uuid.uuid4())
+    db.session.add(Bid(id=legacy_id, auction_id=auction.id, bidder_name='legacy', bidder_phone='0598', bid_amount=10))
+    db.session.commit()
+
+    assert export(tmp_path, tables=['bids'], full=True)['bids']['rows'] == 2
+    assert legacy_id in {row['id'] for row in read_export(tmp_path, 'bids')}
+    assert export(tmp_path, tables=['bids'])['bids']['rows'] == 0
+
+
+def test_export_arrow_ipc_files(app_context, make_auction, tmp_path):
+    app_context.config['ANALYTICS_EXPORT_SETTLE_SECONDS'] = 0
+    make_auction([15])
+
+    export(tmp_path, tables=['auctions'], fmt='ipc')
+    assert [row['starting_price'] for row in read_export(tmp_path, 'auctions', 'ipc')] == [1000]
+    assert not (tmp_path / 'bids').exists()
+
+
+def test_export_endpoint_streams_arrow(client, make_auction):
+    make_auction([15, 30])
+    assert client.get('/api/exports/bids').status_code == 401
+    headers = {}
+    for role in ('user', 'admin'):
+        user = User(username=role, email=f'{role}@example.com', full_name=role, password_hash='x', role=role)
+        db.session.add(user)
+        db.session.commit()
+        headers[role] = {'Authorization': 'Bearer ' + jwt.encode({'user_id': user.id}, SECRET_KEY, algorithm='HS256')}
+    assert client.get('/api/exports/bids', headers=headers['user']).status_code == 403
+
+    response = client.get('/api/exports/bids', headers=headers['admin'])
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.apache.arrow.stream'
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert sorted(table.column('bid_amount').to_pylist()) == [1500, 3000]
+
+    assert client.get('/api/exports/users', headers=headers['admin']).status_code == 404
+    assert client.get('/api/exports/bids?from=yesterday', headers=headers['admin']).status_code == 400
+    assert client.get('/api/exports/bids?from=2026-02-01&to=2026-01-01', headers=headers['admin']).status_code == 400
+
+    # حدود بمنطقة زمنية تُحول إلى UTC بدلاً من قطع التدفق بعد الترويسات
+    response = client.get('/api/exports/bids', headers=headers['admin'],
+                          query_string={'from': '2000-01-01T03:00:00+03:00', 'to': '2100-01-01T00:00:00Z'})
+    assert response.status_code == 200
+    assert pa.ipc.open_stream(response.data).read_all().num_rows == 2
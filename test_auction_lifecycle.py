@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from src.models.auction import Auction
+from src.models.outbox import OutboxMessage
+from src.services.deadlines import DeadlineIndex
+from src.services import workers
+from src.services.auction_lifecycle import close_due_auctions, load_deadlines, track_deadline, _index
+
+
+def bid(client, auction_id, amount):
+    return client.post(f'/api/auctions/{auction_id}/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount
+    })
+
+# -----------------------------------------------------------------------------
+# اختبارات فهرس المواعيد والإغلاق المرن
+# -----------------------------------------------------------------------------
+def test_deadline_index_reschedules_without_rescanning():
+    base = datetime(2026, 1, 1)
+    index = DeadlineIndex()
+    index.schedule('a', base + timedelta(seconds=10))
+    index.schedule('b', base + timedelta(seconds=5))
+    index.schedule('a', base + timedelta(seconds=30))  # تمديد
+
+    assert index.next_deadline() == base + timedelta(seconds=5)
+    assert index.pop_due(base + timedelta(seconds=20)) == [('b', base + timedelta(seconds=5))]
+    assert index.pop_due(base + timedelta(seconds=29)) == []
+    assert [key for key, _ in index.pop_due(base + timedelta(seconds=30))] == ['a']
+    assert len(index) == 0
+
+
+def test_deadline_index_wakes_for_earlier_deadline():
+    index = DeadlineIndex()
+    index.schedule('late', datetime.utcnow() + timedelta(hours=1))
+    due = []
+    waiter = threading.Thread(target=lambda: due.extend(index.wait_due(timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    index.schedule('soon', datetime.utcnow() + timedelta(milliseconds=50))
+    waiter.join()
+    while not due:
+        due.extend(index.wait_due(timeout=1))
+    assert [key for key, _ in due] == ['soon']
+    assert time.perf_counter() - started < 1
+
+
+def test_bid_in_final_window_extends_auction(client, make_auction):
+    end_time = datetime.utcnow() + timedelta(seconds=30)
+    auction = make_auction([], end_time=end_time)
+
+    response = bid(client, auction.id, 20)
+    assert response.status_code == 201
+    assert response.get_json()['end_time'] == (end_time + timedelta(seconds=120)).isoformat()
+    assert OutboxMessage.query.filter_by(event='auction_extended').count() == 1
+    assert _index.deadline(auction.id) == end_time + timedelta(seconds=120)
+
+
+def test_start_accepts_end_time_with_utc_offset(client, make_auction):
+    product_id = make_auction([]).product_id
+    local = datetime.now(timezone(timedelta(hours=3))).replace(microsecond=0) + timedelta(hours=1)
+
+    response = client.post(f'/api/auctions/{product_id}/start', json={'end_time': local.isoformat()})
+    assert response.status_code == 201
+    end_time = datetime.fromisoformat(response.get_json()['end_time'])
+    assert end_time == local.astimezone(timezone.utc).replace(tzinfo=None)
+    _index.discard(response.get_json()['id'])
+
+
+def test_bid_after_deadline_is_rejected(client, make_auction):
+    auction = make_auction([], end_time=datetime.utcnow() - timedelta(seconds=1))
+    assert bid(client, auction.id, 20).status_code == 400
+
+
+def test_close_due_auctions_respects_database_deadline(make_auction):
+    now = datetime.utcnow()
+    expired = make_auction([20], end_time=now - timedelta(seconds=1))
+    extended = make_auction([20], end_time=now + timedelta(minutes=2))
+
+    closed = close_due_auctions([(expired.id, now), (extended.id, now)], now=now)
+
+    assert closed == [expired.id]
+    assert Auction.query.filter_by(id=expired.id).one().status == 'ended'
+    assert Auction.query.filter_by(id=extended.id).one().status == 'active'
+    assert _index.deadline(extended.id) == now + timedelta(minutes=2)
+
+
+def test_leader_rescan_finds_deadlines_tracked_by_other_workers(make_auction, monkeypatch):
+    now = datetime.utcnow()
+    soon = make_auction([], end_time=now + timedelta(seconds=3))
+    later = make_auction([], end_time=now + timedelta(hours=1))
+
+    class Follower:
+        is_leader = False
+    monkeypatch.setattr(workers, '_election', Follower())
+    track_deadline(soon.id, soon.end_time)  # عامل آخر: فهرسه لا يقرؤه أحد
+    assert soon.id not in _index
+
+    monkeypatch.setattr(workers, '_election', None)
+    assert load_deadlines(until=now + timedelta(seconds=10)) == 1
+    assert _index.deadline(soon.id) == soon.end_time
+    assert later.id not in _index
+    _index.discard(soon.id)
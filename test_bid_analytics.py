@@ -0,0 +1,137 @@
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from src.models.user import db
+from src.services.bid_analytics import BidSeriesStore, ohlc, bid_rate, init_bid_analytics, to_millis
+
+BASE = datetime(2026, 1, 1)
+
+
+def events(auction_id, *points):
+    return [(auction_id, BASE + timedelta(seconds=second), amount) for second, amount in points]
+
+# -----------------------------------------------------------------------------
+# اختبارات السلاسل الزمنية للمزايدات
+# -----------------------------------------------------------------------------
+def test_ohlc_and_rate_per_bucket():
+    times = np.array([0, 10_000, 59_000, 60_000, 185_000], dtype=np.int64)
+    amounts = np.array([100, 300, 200, 400, 500], dtype=np.int64)
+
+    starts, opens, highs, lows, closes, counts = ohlc(times, amounts, 60_000)
+    assert starts.tolist() == [0, 60_000, 180_000]
+    assert (opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist()) == (
+        [100, 400, 500], [300, 400, 500], [100, 400, 500], [200, 400, 500]
+    )
+    assert counts.tolist() == [3, 1, 1]
+
+    origin, rate = bid_rate(times, 60_000, 0, 185_001)
+    assert origin == 0 and rate.tolist() == [3, 1, 0, 1]
+
+
+def test_store_sorts_late_events_and_slices_by_time():
+    store = BidSeriesStore()
+    store.record(events('a', (30, 300), (10, 100)))
+    store.record(events('a', (20, 200)))
+
+    times, amounts = store.series('a')
+    assert amounts.tolist() == [100, 200, 300]
+    _, amounts = store.series('a', start=BASE + timedelta(seconds=15), end=BASE + timedelta(seconds=30))
+    assert amounts.tolist() == [200]
+    assert store.series('missing')[0].size == 0
+
+
+def test_store_persists_evicted_series(tmp_path):
+    store = BidSeriesStore(str(tmp_path), max_series=1)
+    store.record(events('a', (1, 100), (2, 200)))
+    store.record(events('b', (1, 50)))  # يُخرج a من الذاكرة ويحفظه
+    assert len(store) == 1
+
+    store.flush()
+    reopened = BidSeriesStore(str(tmp_path))
+    assert reopened.series('a')[1].tolist() == [100, 200]
+    assert reopened.series('b')[1].tolist() == [50]
+
+
+def test_flush_merges_with_series_written_by_another_process(tmp_path):
+    old, new = BidSeriesStore(str(tmp_path)), BidSeriesStore(str(tmp_path))
+    old.record(events('a', (1, 100), (3, 300)))
+    new.record(events('a', (2, 200)))
+    new.flush()
+    old.flush()
+
+    assert BidSeriesStore(str(tmp_path)).series('a')[1].tolist() == [100, 200, 300]
+    assert old.series('a')[1].tolist() == [100, 200, 300]
+
+
+def test_missing_series_is_backfilled_once_without_duplicates():
+    saved = events('a', (1, 100), (2, 200))
+    calls = []
+    def loader(auction_id):
+        calls.append(auction_id)
+        return [to_millis(moment) for _, moment, _ in saved], [amount for _, _, amount in saved]
+
+    store = BidSeriesStore(loader=loader)
+    # المزايدة الثانية حُفظت قبل التعبئة ثم وصلت للتسجيل بعدها
+    store.record(saved[1:])
+    store.record(events('a', (3, 300)))
+    assert store.series('a')[1].tolist() == [100, 200, 300]
+    assert calls == ['a']
+
+
+def test_unknown_auction_is_not_backfilled_or_cached(client, make_auction):
+    init_bid_analytics(client.application)
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    missing = '01900000-0000-7000-8000-000000000000'
+    assert client.get(f'/api/auctions/{missing}/bids/series').get_json()['total_bids'] == 0
+    assert len(statements) == 1 and 'FROM bids' not in statements[0]
+
+
+def test_series_expire_and_reload_with_max_age():
+    saved = events('a', (1, 100))
+    store = BidSeriesStore(loader=lambda auction_id: (
+        [to_millis(moment) for _, moment, _ in saved], [amount for _, _, amount in saved]), max_age=0)
+    assert store.series('a')[1].tolist() == [100]
+
+    # مزايدة سجلها عامل آخر تظهر بعد انتهاء المدة
+    saved += events('a', (2, 200))
+    assert store.series('a')[1].tolist() == [100, 200]
+
+
+def test_series_endpoint_accepts_times_with_utc_offset(client, make_auction):
+    init_bid_analytics(client.application)
+    auction_id = make_auction([15], status='active').id
+
+    response = client.get(f'/api/auctions/{auction_id}/bids/series',
+                          query_string={'from': '2000-01-01T03:00:00+03:00', 'to': '2100-01-01T00:00:00Z'})
+    assert response.status_code == 200
+    assert response.get_json()['total_bids'] == 1
+
+
+def test_series_endpoint_backfills_bids_saved_before_startup(client, make_auction):
+    init_bid_analytics(client.application)
+    auction_id = make_auction([15, 30], status='active').id  # مباشرة في القاعدة دون record_bids
+
+    series = client.get(f'/api/auctions/{auction_id}/bids/series?bucket=3600').get_json()
+    assert series['total_bids'] == 2
+    assert series['ohlc'][0]['high'] == 30
+
+
+def test_series_endpoint_does_not_read_bids_table(client, make_auction):
+    auction_id = make_auction([], status='active').id
+    for amount in (20, 25, 30):
+        client.post(f'/api/auctions/{auction_id}/bid', json={
+            'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount
+        })
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    response = client.get(f'/api/auctions/{auction_id}/bids/series?bucket=3600')
+
+    assert response.status_code == 200
+    series = response.get_json()
+    assert series['total_bids'] == 3
+    assert [(b['open'], b['high'], b['close'], b['bids']) for b in series['ohlc']] == [(20, 30, 30, 3)]
+    assert sum(series['rate']['bids']) == 3
+    assert statements == []
@@ -0,0 +1,69 @@
+import json
+import pytest
+from src.models.user import db
+from src.models.product import Product
+from src.models.outbox import OutboxMessage
+from src.models.money import Money
+from src.services.bid_increments import IncrementLadder, init_bid_increments, ladder_for
+
+
+@pytest.fixture()
+def ladders(app_context):
+    """سلالم تجريبية لتصنيف وتاجر، مع إعادة السلم الافتراضي بعد الاختبار"""
+    def configure(config):
+        app_context.config['BID_INCREMENT_LADDERS'] = config
+        init_bid_increments(app_context)
+    yield configure
+    configure({})
+
+
+def bid(client, auction_id, amount):
+    return client.post(f'/api/auctions/{auction_id}/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount
+    })
+
+# -----------------------------------------------------------------------------
+# اختبارات سلالم أقل زيادة للمزايدة
+# -----------------------------------------------------------------------------
+def test_ladder_picks_step_for_amount():
+    ladder = IncrementLadder([('0', '0.05'), ('25', '1.00'), ('100', '2.50')])
+    assert str(ladder.increment(Money.parse('24.99'))) == '0.05'
+    assert str(ladder.increment(Money.parse(25))) == '1.00'
+    assert str(ladder.minimum_next(Money.parse(100))) == '102.50'
+
+    with pytest.raises(ValueError):
+        IncrementLadder([('1', '0.05')])
+
+
+def test_merchant_ladder_takes_precedence_over_category(ladders):
+    ladders({
+        'categories': {'coins': [['0', '5.00']]},
+        'merchants': {'m1': [['0', '10.00']]}
+    })
+    amount = Money.parse(10)
+    assert str(ladder_for('m1', 'coins').increment(amount)) == '10.00'
+    assert str(ladder_for('m2', 'coins').increment(amount)) == '5.00'
+    assert str(ladder_for('m2', 'books').increment(amount)) == '0.50'
+
+
+def test_bid_below_minimum_increment_is_rejected(client, make_auction, ladders):
+    ladders({'categories': {'coins': [['0', '5.00']]}})
+    auction = make_auction([], status='active')
+    Product.query.filter_by(id=auction.product_id).one().category = 'coins'
+    db.session.commit()
+
+    response = bid(client, auction.id, 14)
+    assert response.status_code == 400
+    assert response.get_json()['minimum_next_bid'] == 15
+
+    response = bid(client, auction.id, 15)
+    assert response.status_code == 201
+    assert response.get_json()['minimum_next_bid'] == 20
+
+
+def test_minimum_next_bid_in_realtime_update(client, make_auction):
+    auction = make_auction([], status='active')
+    assert bid(client, auction.id, 30).get_json()['minimum_next_bid'] == 31
+
+    message = OutboxMessage.query.filter_by(event='bid_update').one()
+    assert json.loads(message.payload)['bid_data']['minimum_next_bid'] == 31
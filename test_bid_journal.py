@@ -0,0 +1,180 @@
+import os
+import threading
+import pytest
+from datetime import datetime, timedelta
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.outbox import OutboxMessage
+from src.models.bid_journal import BidJournalCheckpoint
+from src.services import workers
+from src.services.bid_journal import BidJournal, init_bid_journal, shutdown_bid_journal, materialize_pending
+from src.services.auction_lifecycle import close_due_auctions, _index
+
+
+@pytest.fixture()
+def journal_app(app_context, tmp_path):
+    app_context.config.update({
+        "BID_JOURNAL_DIR": str(tmp_path / 'journal'),
+        "BID_JOURNAL_SNAPSHOTS_ENABLED": False,
+        "BID_JOURNAL_GROUP_COMMIT_WINDOW": 0
+    })
+    init_bid_journal(app_context)
+    yield app_context
+    shutdown_bid_journal()
+
+
+def place_bid(client, auction_id, amount):
+    return client.post(f'/api/auctions/{auction_id}/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount
+    })
+
+# -----------------------------------------------------------------------------
+# اختبارات سجل المزايدات
+# -----------------------------------------------------------------------------
+def test_journaled_bids_are_validated_and_materialized(journal_app, make_auction):
+    client = journal_app.test_client()
+    auction = make_auction([], status='active')
+
+    assert place_bid(client, auction.id, 20).status_code == 201
+    assert place_bid(client, auction.id, 15).status_code == 400
+    assert place_bid(client, auction.id, 25).status_code == 201
+    assert Bid.query.count() == 0
+
+    assert materialize_pending() == 2
+    db.session.expire_all()
+    refreshed = db.session.get(Auction, auction.id)
+    assert refreshed.total_bids == 2
+    assert refreshed.current_highest_bid.to_json() == 25
+    assert Bid.query.count() == 2
+    assert db.session.get(BidJournalCheckpoint, 'bids').last_seq == 2
+
+
+def test_journal_rejects_bids_after_deadline(journal_app, make_auction):
+    client = journal_app.test_client()
+    auction = make_auction([], end_time=datetime.utcnow() - timedelta(seconds=1))
+
+    assert place_bid(client, auction.id, 20).status_code == 400
+    assert materialize_pending() == 0
+
+
+def test_journaled_bid_in_final_window_extends_and_notifies(journal_app, make_auction):
+    client = journal_app.test_client()
+    end_time = datetime.utcnow() + timedelta(seconds=30)
+    auction = make_auction([], end_time=end_time)
+
+    response = place_bid(client, auction.id, 20)
+    assert response.status_code == 201
+    assert response.get_json()['end_time'] == (end_time + timedelta(seconds=120)).isoformat()
+    assert place_bid(client, auction.id, 25).status_code == 201
+
+    assert materialize_pending() == 2
+    db.session.expire_all()
+    assert db.session.get(Auction, auction.id).end_time == end_time + timedelta(seconds=120)
+    events = {message.event: message for message in OutboxMessage.query.all()}
+    assert sorted(events) == ['auction_extended', 'bid_update']
+    assert OutboxMessage.query.count() == 2
+    assert '"bid_amount": 25' in events['bid_update'].payload
+    assert end_time.isoformat() in events['auction_extended'].payload
+
+
+def test_ending_an_auction_applies_journaled_bids_first(journal_app, make_auction):
+    client = journal_app.test_client()
+    auction = make_auction([], status='active')
+    place_bid(client, auction.id, 20)
+
+    response = client.post(f'/api/auctions/{auction.id}/end')
+    assert response.status_code == 200
+    assert response.get_json()['winner_bid']['bid_amount'] == 20
+    assert place_bid(client, auction.id, 30).status_code == 400
+    assert materialize_pending() == 0
+
+
+def test_deadline_timer_sees_extension_still_in_journal(journal_app, make_auction):
+    client = journal_app.test_client()
+    end_time = datetime.utcnow() + timedelta(seconds=30)
+    auction = make_auction([], end_time=end_time)
+    place_bid(client, auction.id, 20)
+
+    # المؤقت يستيقظ على الموعد القديم قبل أن تطبق حلقة اللقطات التمديد
+    assert close_due_auctions([(auction.id, end_time)], now=end_time) == []
+    db.session.expire_all()
+    assert db.session.get(Auction, auction.id).status == 'active'
+    assert _index.deadline(auction.id) == end_time + timedelta(seconds=120)
+    _index.discard(auction.id)
+
+
+def test_restart_replays_journal_after_last_checkpoint(journal_app, make_auction):
+    client = journal_app.test_client()
+    auction = make_auction([], status='active')
+    place_bid(client, auction.id, 20)
+    materialize_pending()
+    place_bid(client, auction.id, 30)
+
+    # محاكاة توقف العملية قبل التطبيق التالي ثم إعادة التشغيل
+    shutdown_bid_journal()
+    init_bid_journal(journal_app)
+
+    db.session.expire_all()
+    refreshed = db.session.get(Auction, auction.id)
+    assert refreshed.total_bids == 2
+    assert refreshed.current_highest_bid.to_json() == 30
+    assert sorted(bid.bid_amount.to_json() for bid in Bid.query.all()) == [20, 30]
+
+
+def test_concurrent_materialize_applies_a_batch_once(journal_app, make_auction, monkeypatch):
+    client = journal_app.test_client()
+    auction = make_auction([], status='active')
+    place_bid(client, auction.id, 20)
+    place_bid(client, auction.id, 25)
+
+    # عامل التسوية يطبق السجل بينما حلقة اللقطات في منتصف معاملتها
+    results = []
+    def settlement_worker():
+        with journal_app.app_context():
+            results.append(materialize_pending())
+    rival = threading.Thread(target=settlement_worker)
+    commit = db.session.commit
+    def commit_while_rival_runs():
+        if rival.ident is None:
+            rival.start()
+            rival.join(0.1)
+        commit()
+    monkeypatch.setattr(db.session, 'commit', commit_while_rival_runs)
+
+    assert materialize_pending() == 2
+    rival.join(1)
+    assert results == [0]
+    assert db.session.get(Auction, auction.id).total_bids == 2
+
+
+def test_torn_tail_record_is_discarded_on_open(journal_app, make_auction):
+    client = journal_app.test_client()
+    auction = make_auction([], status='active')
+    place_bid(client, auction.id, 20)
+    shutdown_bid_journal()
+
+    journal_dir = journal_app.config['BID_JOURNAL_DIR']
+    [segment] = os.listdir(journal_dir)
+    with open(os.path.join(journal_dir, segment), 'ab') as f:
+        f.write(b'{"seq": 2, "id": "trunc')
+
+    init_bid_journal(journal_app)
+    assert Bid.query.count() == 1
+
+
+def test_flusher_starts_in_the_worker_not_the_preloading_master(monkeypatch, tmp_path):
+    for name, value in (('_deferred', False), ('_forked', False), ('_pending', []),
+                        ('_leader_jobs', []), ('_engines', []), ('_election', None)):
+        monkeypatch.setattr(workers, name, value)
+    workers.defer_until_fork()
+
+    journal = BidJournal(str(tmp_path / 'journal'), group_commit_window=0)
+    journal.open()
+    record = journal.append({'id': 'b1'})
+    assert [name for _, name, _ in workers._pending] == ['bid-journal-flusher']
+
+    workers.after_fork(str(tmp_path / 'scheduler.lock'), interval=0.02)
+    journal.wait_durable(record['seq'])
+    assert journal.durable_seq == record['seq']
+    journal.close()
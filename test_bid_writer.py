@@ -0,0 +1,94 @@
+import threading
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.money import Money
+from src.services.bid_writer import write_bids
+from src.services.write_batcher import WriteBatcher
+
+
+def bid_item(auction_id, amount):
+    return {'auction_id': auction_id, 'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount}
+
+# -----------------------------------------------------------------------------
+# اختبارات تجميع كتابة المزايدات
+# -----------------------------------------------------------------------------
+def test_write_batcher_groups_concurrent_submissions():
+    batches = []
+    release = threading.Event()
+
+    def process_batch(items):
+        release.wait()
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = WriteBatcher(process_batch, max_batch=64, max_wait=0.05)
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(i))) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * 2 for i in range(20)}
+    assert len(batches) < 20
+    assert sorted(item for batch in batches for item in batch) == list(range(20))
+
+
+def test_write_batcher_propagates_batch_errors():
+    def process_batch(items):
+        raise RuntimeError('db down')
+
+    batcher = WriteBatcher(process_batch)
+    try:
+        batcher.submit(1, timeout=1)
+    except RuntimeError as e:
+        assert str(e) == 'db down'
+    else:
+        assert False, 'expected RuntimeError'
+
+
+def test_write_batcher_fails_only_the_bad_item():
+    calls = []
+    release = threading.Event()
+
+    def process_batch(items):
+        release.wait()
+        calls.append(list(items))
+        if 'bad' in items:
+            raise ValueError('constraint violated')
+        return [item.upper() for item in items]
+
+    batcher = WriteBatcher(process_batch, max_batch=64, max_wait=0.05)
+    results = {}
+    def submit(item):
+        try:
+            results[item] = batcher.submit(item, timeout=1)
+        except ValueError as e:
+            results[item] = e
+    threads = [threading.Thread(target=submit, args=(item,)) for item in ('a', 'bad', 'c')]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results['a'] == 'A' and results['c'] == 'C'
+    assert isinstance(results['bad'], ValueError)
+    assert any(len(batch) > 1 for batch in calls)
+
+
+def test_write_bids_revalidates_in_arrival_order(make_auction):
+    auction = make_auction([], status='active')
+    closed = make_auction([], status='ended')
+
+    results = write_bids([
+        bid_item(auction.id, 20), bid_item(auction.id, 15), bid_item(auction.id, 30), bid_item(closed.id, 50)
+    ])
+
+    assert [status for status, _ in results] == ['accepted', 'too_low', 'accepted', 'inactive']
+    assert results[1][1] == Money.parse('20.50')  # أقل مزايدة تالية حسب سلم الزيادة
+    assert Bid.query.count() == 2
+    refreshed = Auction.query.filter_by(id=auction.id).one()
+    assert refreshed.total_bids == 2
+    assert refreshed.current_highest_bid.to_json() == 30
@@ -0,0 +1,32 @@
+from flask import Flask
+from src.services.cooperative import DEFAULT_POOL_SIZE, async_mode, init_cooperative
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update({"SQLALCHEMY_DATABASE_URI": "sqlite:///bench.db", **config})
+    return app
+
+# -----------------------------------------------------------------------------
+# اختبارات وضع التشغيل غير المتزامن
+# -----------------------------------------------------------------------------
+def test_threaded_process_keeps_default_pool():
+    # الاختبارات تعمل دون ترقيع gevent
+    assert async_mode() == 'threading'
+    app = make_app()
+    init_cooperative(app)
+    assert app.config['ASYNC_MODE'] == 'threading'
+    assert 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config
+
+
+def test_gevent_mode_bounds_the_connection_pool():
+    app = make_app(ASYNC_MODE='gevent', DB_POOL_OVERFLOW=0,
+                   SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 30}, 'pool_timeout': 5})
+    init_cooperative(app)
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {
+        'connect_args': {'timeout': 30}, 'pool_size': DEFAULT_POOL_SIZE, 'max_overflow': 0, 'pool_timeout': 5
+    }
+
+    memory = make_app(ASYNC_MODE='gevent', SQLALCHEMY_DATABASE_URI='sqlite:///:memory:')
+    init_cooperative(memory)
+    assert 'SQLALCHEMY_ENGINE_OPTIONS' not in memory.config
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from src.models.user import db
+from src.models.bid import Bid
+from src.models.order import Order
+from src.models.idempotency import IdempotencyKey
+from src.services import idempotency
+from src.services.idempotency import ResponseCache, purge_idempotency_keys
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(idempotency, '_cache', ResponseCache())
+
+
+def bid(client, auction_id, amount, key):
+    return client.post(f'/api/auctions/{auction_id}/bid', headers={'Idempotency-Key': key}, json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': amount
+    })
+
+
+def count_queries():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+# -----------------------------------------------------------------------------
+# اختبارات مفاتيح منع التكرار (Idempotency-Key)
+# -----------------------------------------------------------------------------
+def test_retried_bid_replays_response_without_queries(client, make_auction):
+    auction = make_auction([], status='active')
+    first = bid(client, auction.id, 20, 'retry-1')
+    assert first.status_code == 201
+
+    statements = count_queries()
+    retry = bid(client, auction.id, 20, 'retry-1')
+    assert retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert statements == []
+    assert Bid.query.count() == 1
+
+
+def test_replay_from_database_in_another_worker(client, make_auction, monkeypatch):
+    auction = make_auction([], status='active')
+    first = bid(client, auction.id, 20, 'retry-2')
+
+    monkeypatch.setattr(idempotency, '_cache', ResponseCache())  # عملية أخرى بذاكرة فارغة
+    retry = bid(client, auction.id, 20, 'retry-2')
+    assert retry.get_json() == first.get_json()
+    assert Bid.query.count() == 1
+
+
+def test_key_reused_for_different_request_is_rejected(client, make_auction):
+    auction = make_auction([], status='active')
+    assert bid(client, auction.id, 20, 'retry-3').status_code == 201
+    assert bid(client, auction.id, 25, 'retry-3').status_code == 422
+
+
+def test_retried_order_returns_same_order(client, make_auction):
+    auction = make_auction([20])
+    bid_id = Bid.query.filter_by(auction_id=auction.id).one().id
+    payload = {'auction_id': auction.id, 'bid_id': bid_id}
+
+    first = client.post('/api/orders', headers={'Idempotency-Key': 'order-1'}, json=payload)
+    retry = client.post('/api/orders', headers={'Idempotency-Key': 'order-1'}, json=payload)
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json()['id'] == first.get_json()['id']
+    assert Order.query.count() == 1
+
+
+def test_response_cache_is_bounded_and_expires():
+    now = [0.0]
+    cache = ResponseCache(max_size=2, clock=lambda: now[0])
+    cache.put('a', 1, ttl=10)
+    cache.put('b', 2, ttl=10)
+    cache.get('a')
+    cache.put('c', 3, ttl=10)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+    now[0] = 10
+    assert cache.get('a') is None and len(cache) == 1
+
+
+def test_purge_removes_expired_keys(client, make_auction):
+    auction = make_auction([], status='active')
+    bid(client, auction.id, 20, 'retry-4')
+
+    assert purge_idempotency_keys() == 0
+    assert purge_idempotency_keys(now=datetime.utcnow() + timedelta(days=2)) == 1
+    assert IdempotencyKey.query.count() == 0
@@ -0,0 +1,64 @@
+import uuid
+from sqlalchemy import event, text
+from src.models.user import db, User
+from src.models.auction import Auction
+from src.models.ids import uuid7, new_id
+from src.services import id_migration
+from src.services.id_migration import migrate_legacy_ids
+
+# -----------------------------------------------------------------------------
+# اختبارات المعرفات المرتبة زمنياً والمخزنة بصيغة مضغوطة
+# -----------------------------------------------------------------------------
+def test_uuid7_is_time_ordered():
+    ids = [uuid7() for _ in range(1000)]
+    assert all(value.version == 7 for value in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_ids_are_stored_as_16_bytes(make_auction):
+    auction = make_auction([20, 30])
+    stored = db.session.execute(text('SELECT typeof(id), length(id) FROM auctions')).one()
+    assert tuple(stored) == ('blob', 16)
+    assert db.session.get(Auction, auction.id).id == auction.id
+    assert len(auction.id) == 36
+
+
+def test_invalid_id_returns_404(client, make_auction):
+    make_auction([20])
+    assert client.get('/api/auctions/not-a-uuid').status_code == 404
+    assert client.get(f'/api/auctions/{new_id()}').status_code == 404
+
+
+def test_migrate_legacy_text_ids(app_context, make_auction):
+    auction = make_auction([20])
+    legacy_id = str(uuid.uuid4())
+    db.session.execute(text(
+        "INSERT INTO users (id, username, email, password_hash, full_name, subscription_plan, is_active) "
+        "VALUES (:id, 'legacy', 'legacy@example.com', 'x', 'Legacy', 'free', 1)"
+    ), {'id': legacy_id})
+    db.session.execute(text('UPDATE auctions SET user_id = :id'), {'id': legacy_id})
+    db.session.commit()
+
+    assert migrate_legacy_ids(db.engine) == 2
+    assert migrate_legacy_ids(db.engine) == 0
+    db.session.expire_all()
+    assert db.session.execute(text("SELECT typeof(id) FROM users WHERE username = 'legacy'")).scalar() == 'blob'
+    assert db.session.get(User, legacy_id).username == 'legacy'
+    assert db.session.get(Auction, auction.id).user_id == legacy_id
+
+
+def test_migrate_legacy_ids_in_keyset_batches(app_context, monkeypatch):
+    monkeypatch.setattr(id_migration, 'BATCH_SIZE', 2)
+    for i, user_id in enumerate([str(uuid.uuid4()) for _ in range(3)] + ['not-a-uuid']):
+        db.session.execute(text(
+            "INSERT INTO users (id, username, email, password_hash, full_name, subscription_plan, is_active) "
+            "VALUES (:id, :name, :email, 'x', 'Legacy', 'free', 1)"
+        ), {'id': user_id, 'name': f'legacy{i}', 'email': f'legacy{i}@example.com'})
+    db.session.commit()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    assert migrate_legacy_ids(db.engine) == 3
+    assert sum('LIMIT' in statement and 'users' in statement for statement in statements) == 3
+    assert db.session.execute(text("SELECT count(*) FROM users WHERE typeof(id) = 'text'")).scalar() == 1
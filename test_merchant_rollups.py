@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from src.models.user import db
+from src.models.order import Order
+from src.models.merchant_rollup import MerchantRollup, MerchantDailyRevenue
+from src.services.settlement import settle_auctions, close_expired_auctions
+from src.services.merchant_rollups import compute_merchant_dashboard, reconcile_merchant_rollups
+
+
+def dashboard(client, user_id):
+    response = client.get(f'/api/users/{user_id}/dashboard')
+    assert response.status_code == 200
+    summary = response.get_json()
+    summary.pop('updated_at')
+    return summary
+
+
+def expected(user_id):
+    summary = compute_merchant_dashboard(user_id)
+    summary.pop('updated_at')
+    return summary
+
+# -----------------------------------------------------------------------------
+# اختبارات ملخصات لوحة التاجر
+# -----------------------------------------------------------------------------
+def test_rollups_follow_model_changes(client, make_auction):
+    auction = make_auction([], status='active')
+
+    summary = dashboard(client, auction.user_id)
+    assert summary['products'] == {'draft': 1, 'active': 0, 'sold': 0, 'archived': 0}
+    assert summary['active_auctions'] == 1
+
+    response = client.post(f'/api/auctions/{auction.id}/end')
+    assert response.status_code == 200
+    assert dashboard(client, auction.user_id)['active_auctions'] == 0
+
+
+def test_rollups_follow_bulk_close_and_settlement(client, make_auction):
+    expired = make_auction([15, 30], end_time=datetime.utcnow() - timedelta(seconds=1))
+    assert dashboard(client, expired.user_id)['active_auctions'] == 1
+
+    close_expired_auctions()
+    settle_auctions([expired.id])
+
+    summary = dashboard(client, expired.user_id)
+    assert summary == expected(expired.user_id)
+    assert summary['active_auctions'] == 0
+    assert summary['pending_orders'] == 1
+    assert summary['products']['sold'] == 1
+    assert summary['revenue_by_day'] == [
+        {'day': datetime.utcnow().date().isoformat(), 'revenue': 30, 'orders': 1}
+    ]
+
+    order = Order.query.one()
+    client.put(f'/api/orders/{order.id}', json={'status': 'cancelled'})
+    summary = dashboard(client, expired.user_id)
+    assert summary['pending_orders'] == 0
+    assert summary['revenue_by_day'] == []
+
+
+def test_dashboard_is_a_single_query(client, make_auction):
+    user_id = make_auction([], status='active').user_id
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    dashboard(client, user_id)
+    assert len(statements) == 1
+
+
+def test_reconcile_repairs_drift_and_backfills(client, make_auction):
+    auction = make_auction([], status='active')
+    rollup = db.session.get(MerchantRollup, auction.user_id)
+    rollup.active_auctions = 7
+    db.session.commit()
+
+    assert reconcile_merchant_rollups() == 1
+    assert dashboard(client, auction.user_id) == expected(auction.user_id)
+
+    db.session.delete(db.session.get(MerchantRollup, auction.user_id))
+    db.session.commit()
+    reconcile_merchant_rollups()
+    assert db.session.get(MerchantRollup, auction.user_id).active_auctions == 1
+
+
+def test_reconcile_repairs_revenue_in_place(client, make_auction):
+    expired = make_auction([15, 30], end_time=datetime.utcnow() - timedelta(seconds=1))
+    close_expired_auctions()
+    settle_auctions([expired.id])
+    revenue = MerchantDailyRevenue.query.one()
+    revenue.orders = 4
+    db.session.commit()
+
+    assert reconcile_merchant_rollups() == 1
+    assert dashboard(client, expired.user_id) == expected(expired.user_id)
+
+    db.session.delete(MerchantDailyRevenue.query.one())
+    db.session.commit()
+    assert reconcile_merchant_rollups() == 1
+    assert dashboard(client, expired.user_id) == expected(expired.user_id)
+    assert reconcile_merchant_rollups() == 0
+
+
+def test_rollup_created_concurrently_gets_the_delta(client, make_auction):
+    auction = make_auction([], status='active')
+    db.session.delete(db.session.get(MerchantRollup, auction.user_id))
+    db.session.commit()
+    rollups = MerchantRollup.__table__
+    created = []
+
+    @event.listens_for(db.engine, 'before_execute')
+    def concurrent_writer(conn, clause, multiparams, params, options):
+        # كاتب آخر ينشئ الملخص بين فحص الوجود والإدراج
+        if not created and getattr(clause, 'table', None) is rollups and clause.is_insert:
+            created.append(True)
+            conn.execute(insert(rollups).values(user_id=auction.user_id, active_auctions=5))
+
+    response = client.post(f'/api/auctions/{auction.id}/end')
+    event.remove(db.engine, 'before_execute', concurrent_writer)
+    assert response.status_code == 200
+    assert created and db.session.get(MerchantRollup, auction.user_id).active_auctions == 4
@@ -0,0 +1,57 @@
+from flask import Flask
+from src.services.metrics import Histogram, init_metrics
+
+
+def sample(text, line_start):
+    values = [line.rsplit(' ', 1)[1] for line in text.splitlines() if line.startswith(line_start)]
+    assert len(values) == 1, line_start
+    return float(values[0])
+
+# -----------------------------------------------------------------------------
+# اختبارات مقاييس المسارات والاستعلامات
+# -----------------------------------------------------------------------------
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 9):
+        histogram.observe(value)
+
+    assert list(histogram.samples('x', 'a="b"')) == [
+        'x_bucket{a="b",le="1"} 2',
+        'x_bucket{a="b",le="5"} 3',
+        'x_bucket{a="b",le="+Inf"} 4',
+        'x_sum{a="b"} 13.500000',
+        'x_count{a="b"} 4',
+    ]
+
+
+def test_metrics_per_endpoint(app_context, client, make_auction):
+    init_metrics(app_context)
+    auction = make_auction([15, 30], status='active')
+
+    client.get(f'/api/auctions/{auction.id}/bids')
+    client.get(f'/api/auctions/{auction.id}/bids')
+    client.get('/api/no-such-route')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+
+    labels = 'endpoint="bid.get_auction_bids",method="GET"'
+    assert sample(text, f'http_request_duration_seconds_count{{{labels}}}') == 2
+    assert sample(text, f'http_requests_total{{{labels},status="200"}}') == 2
+    # المزاد في جلسة الاختبار المشتركة، فيبقى استعلام المزايدات فقط في كل طلب
+    assert sample(text, f'db_queries_per_request_sum{{{labels}}}') == 2
+    assert sample(text, 'db_queries_total{endpoint="bid.get_auction_bids"}') == 2
+    assert sample(text, 'db_query_duration_seconds_total{endpoint="bid.get_auction_bids"}') > 0
+    assert sample(text, 'http_requests_total{endpoint="(unmatched)",method="GET",status="404"}') == 1
+
+
+def test_disabled_metrics_register_nothing():
+    app = Flask(__name__)
+    app.config['METRICS_ENABLED'] = False
+    init_metrics(app)
+
+    assert 'metrics' not in app.extensions
+    assert not app.before_request_funcs and not app.after_request_funcs
+    assert app.test_client().get('/metrics').status_code == 404
@@ -0,0 +1,72 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import create_engine, text
+from src.models.user import db
+from src.models.money import Money
+from src.services.money_migration import migrate_money_columns
+
+# -----------------------------------------------------------------------------
+# اختبارات المبالغ بالوحدة الصغرى
+# -----------------------------------------------------------------------------
+def test_money_parse_and_format():
+    assert Money.parse('19.99') == 1999
+    assert Money.parse(19.99) == 1999
+    assert Money.parse(0.1 + 0.2) == 30
+    assert Money.parse(10) == 1000
+    assert Money.parse(Decimal('12.50')) == 1250
+    assert Money.parse('7.5') == Money.parse('7.50')
+    assert str(Money(5)) == '0.05'
+    assert str(Money(-1250)) == '-12.50'
+    assert Money(1999).to_json() == 19.99
+    assert isinstance(Money(100) + Money(50), Money)
+    assert sum([Money(100), Money(250)]) == Money(350)
+    for invalid in ('abc', '', '1.234', '1.2.3', None, True, float('nan')):
+        with pytest.raises(ValueError):
+            Money.parse(invalid)
+
+
+def test_arithmetic_results_stay_in_cents(make_auction):
+    price = Money(1050)
+    for result in (price * 3, 3 * price, price // 4, price % 100, -price, abs(-price), price - 50):
+        assert isinstance(result, Money)
+    assert price * 3 == 3150 and price // 4 == 262
+    assert price // Money(100) == 10 and not isinstance(price // Money(100), Money)
+
+    # نتيجة عادية int كانت تُحفظ كوحدة كبرى (×100)
+    auction = make_auction([])
+    auction.current_highest_bid = auction.starting_price * 2
+    db.session.commit()
+    assert db.session.execute(text('SELECT current_highest_bid FROM auctions')).scalar() == 2000
+
+
+def test_bid_amounts_are_integer_cents(client, make_auction):
+    auction = make_auction([], status='active')
+    response = client.post(f'/api/auctions/{auction.id}/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': 20.1
+    })
+    assert response.status_code == 201
+    assert response.get_json()['bid_amount'] == 20.1
+    assert db.session.execute(text('SELECT bid_amount, typeof(bid_amount) FROM bids')).one() == (2010, 'integer')
+
+    # نفس المبلغ بصيغة نصية لا يبلغ أعلى مزايدة مضافاً إليها أقل زيادة
+    response = client.post(f'/api/auctions/{auction.id}/bid', json={
+        'bidder_name': 'Sara', 'bidder_phone': '0501', 'bid_amount': '20.10'
+    })
+    assert response.status_code == 400
+    assert '20.60' in response.get_json()['error']
+    response = client.post(f'/api/auctions/{auction.id}/bid', json={
+        'bidder_name': 'Sara', 'bidder_phone': '0501', 'bid_amount': 'twenty'
+    })
+    assert response.status_code == 400
+
+
+def test_migrate_legacy_numeric_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE products (id BLOB PRIMARY KEY, starting_price NUMERIC(10, 2) NOT NULL)'))
+        conn.execute(text("INSERT INTO products VALUES (x'01', 12.5), (x'02', 19.99)"))
+
+    assert migrate_money_columns(engine) == 1
+    assert migrate_money_columns(engine) == 0
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT starting_price FROM products ORDER BY id')).scalars().all() == [1250, 1999]
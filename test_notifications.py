@@ -0,0 +1,136 @@
+import json
+from sqlalchemy import event, insert, inspect, text
+from src.models.user import db, User
+from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.models.unread_counter import UnreadNotificationCounter
+from src.services.unread_counter import reconcile_unread_counts
+from src.services.index_migration import migrate_indexes
+
+
+def create_users(count):
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', full_name='User', password_hash='x')
+             for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+# -----------------------------------------------------------------------------
+# اختبارات واجهات الإشعارات الجماعية
+# -----------------------------------------------------------------------------
+def test_bulk_create_fans_out_to_existing_users(client):
+    user_ids = create_users(3)
+
+    response = client.post('/api/notifications/bulk', json={
+        'user_ids': user_ids + ['missing'], 'type': 'info', 'title': 'عنوان', 'message': 'رسالة'
+    })
+
+    assert response.status_code == 201
+    assert response.get_json() == {'created_count': 3, 'missing_user_ids': ['missing']}
+    assert {n.user_id for n in Notification.query.all()} == set(user_ids)
+    assert OutboxMessage.query.filter_by(event='new_notification').count() == 3
+
+
+def test_bulk_create_requires_recipients(client):
+    response = client.post('/api/notifications/bulk', json={'type': 'info', 'title': 'عنوان', 'message': 'رسالة'})
+    assert response.status_code == 400
+
+
+def test_bulk_create_filter_requires_boolean_is_active(client):
+    create_users(2)
+    payload = {'type': 'info', 'title': 'عنوان', 'message': 'رسالة'}
+
+    response = client.post('/api/notifications/bulk', json={**payload, 'user_filter': {'is_active': 'false'}})
+    assert response.status_code == 400
+    assert Notification.query.count() == 0
+
+    response = client.post('/api/notifications/bulk', json={**payload, 'user_filter': {'is_active': True}})
+    assert response.get_json() == {'created_count': 2}
+
+
+def test_bulk_mark_read_and_delete_by_filter(client):
+    user_ids = create_users(2)
+    client.post('/api/notifications/bulk', json={
+        'user_ids': user_ids, 'type': 'info', 'title': 'عنوان', 'message': 'رسالة'
+    })
+    ids = [n.id for n in Notification.query.all()]
+
+    response = client.put('/api/notifications/read', json={'ids': ids[:1]})
+    assert response.get_json() == {'updated_count': 1}
+
+    assert client.delete('/api/notifications', json={}).status_code == 400
+    # "false" نص وليس قيمة منطقية، فلا يُفسر كـ True ويحذف المقروءة
+    for invalid in ('false', 0, None):
+        assert client.delete('/api/notifications', json={'is_read': invalid}).status_code == 400
+    assert Notification.query.count() == 2
+    response = client.delete('/api/notifications', json={'is_read': True})
+    assert response.get_json() == {'deleted_count': 1}
+    assert [n.id for n in Notification.query.all()] == ids[1:]
+
+
+def test_unread_counter_tracks_create_read_and_delete(client):
+    user_id = create_users(1)[0]
+    for _ in range(3):
+        client.post('/api/notifications', json={
+            'user_id': user_id, 'type': 'info', 'title': 'عنوان', 'message': 'رسالة'
+        })
+    ids = [n.id for n in Notification.query.all()]
+    assert db.session.get(UnreadNotificationCounter, user_id).unread_count == 3
+
+    client.put(f'/api/notifications/{ids[0]}/read')
+    client.put(f'/api/notifications/{ids[0]}/read')
+    client.delete(f'/api/notifications/{ids[1]}')
+    assert client.get(f'/api/users/{user_id}/notifications/unread/count').get_json() == {'unread_count': 1}
+
+    client.put(f'/api/users/{user_id}/notifications/mark-all-read')
+    assert client.get(f'/api/users/{user_id}/notifications/unread/count').get_json() == {'unread_count': 0}
+
+    pushed = OutboxMessage.query.filter_by(event='unread_count').order_by(OutboxMessage.created_at).all()
+    assert json.loads(pushed[-1].payload) == {'user_id': user_id, 'unread_count': 0}
+
+
+def test_reconcile_unread_counts_fixes_drift(client):
+    user_id = create_users(1)[0]
+    client.post('/api/notifications/bulk', json={
+        'user_ids': [user_id, user_id], 'type': 'info', 'title': 'عنوان', 'message': 'رسالة'
+    })
+    db.session.get(UnreadNotificationCounter, user_id).unread_count = 7
+    db.session.commit()
+
+    assert reconcile_unread_counts() == 1
+    assert client.get(f'/api/users/{user_id}/notifications/unread/count').get_json() == {'unread_count': 1}
+    pushed = OutboxMessage.query.filter_by(event='unread_count').order_by(OutboxMessage.created_at).all()
+    assert json.loads(pushed[-1].payload) == {'user_id': user_id, 'unread_count': 1}
+    assert reconcile_unread_counts() == 0
+
+
+def test_counter_created_concurrently_is_incremented(client):
+    user_id = create_users(1)[0]
+    counters = UnreadNotificationCounter.__table__
+    created = []
+
+    @event.listens_for(db.engine, 'before_execute')
+    def concurrent_writer(conn, clause, multiparams, params, options):
+        # كاتب آخر ينشئ العداد بين فحص الوجود والإدراج
+        if not created and getattr(clause, 'table', None) is counters and clause.is_insert:
+            created.append(True)
+            conn.execute(insert(counters).values(user_id=user_id, unread_count=5))
+
+    response = client.post('/api/notifications', json={
+        'user_id': user_id, 'type': 'info', 'title': 'عنوان', 'message': 'رسالة'
+    })
+    event.remove(db.engine, 'before_execute', concurrent_writer)
+    assert response.status_code == 201
+    assert created and db.session.get(UnreadNotificationCounter, user_id).unread_count == 6
+
+
+def test_missing_notification_indexes_are_created_on_startup(app_context):
+    # جدول notifications أُنشئ قبل إضافة الفهارس للنموذج
+    for name in ('ix_notifications_user_read_created', 'ix_notifications_read_created'):
+        db.session.execute(text(f'DROP INDEX {name}'))
+    db.session.commit()
+
+    assert sorted(migrate_indexes(db.engine)) == ['ix_notifications_read_created', 'ix_notifications_user_read_created']
+    assert migrate_indexes(db.engine) == []
+    names = {index['name'] for index in inspect(db.engine).get_indexes('notifications')}
+    assert {'ix_notifications_user_read_created', 'ix_notifications_read_created'} <= names
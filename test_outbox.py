@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, timedelta
+from src.models.user import db, User
+from src.models.notification import Notification
+from src.models.outbox import OutboxMessage
+from src.routes import realtime
+from src.services.outbox import enqueue_notification, dispatch_pending, purge_outbox, failed_count, outbox_row
+from src.services.metrics import MetricsRegistry
+
+
+class RecordingSocketIO:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.emitted = []
+
+    def emit(self, event, data, room=None):
+        if self.fail:
+            raise ConnectionError('socket down')
+        self.emitted.append((event, data, room))
+
+
+def create_notification():
+    user = User(username='merchant', email='m@example.com', full_name='Merchant', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    notification = Notification(user_id=user.id, type='new_bid', title='مزايدة جديدة', message='100')
+    db.session.add(notification)
+    db.session.flush()
+    enqueue_notification(notification, {'amount': 100})
+    db.session.commit()
+    return notification
+
+# -----------------------------------------------------------------------------
+# اختبارات صندوق الصادر
+# -----------------------------------------------------------------------------
+def test_dispatch_pending_emits_to_merchant_room_and_marks_sent(app_context, monkeypatch):
+    socket = RecordingSocketIO()
+    monkeypatch.setattr(realtime, 'socketio', socket)
+    notification = create_notification()
+
+    assert dispatch_pending() == 1
+
+    event, payload, room = socket.emitted[0]
+    assert event == 'new_notification'
+    assert room == f'merchant_{notification.user_id}'
+    assert payload['id'] == notification.id
+    assert payload['data'] == {'amount': 100}
+    assert OutboxMessage.query.one().status == 'sent'
+    assert dispatch_pending() == 0
+
+
+def test_dispatch_pending_schedules_retry_on_emit_failure(app_context, monkeypatch):
+    monkeypatch.setattr(realtime, 'socketio', RecordingSocketIO(fail=True))
+    create_notification()
+    now = datetime.utcnow()
+
+    assert dispatch_pending(now=now) == 0
+
+    message = OutboxMessage.query.one()
+    assert message.status == 'pending'
+    assert message.attempts == 1
+    assert message.next_attempt_at > now
+    assert 'socket down' in message.last_error
+
+    socket = RecordingSocketIO()
+    monkeypatch.setattr(realtime, 'socketio', socket)
+    assert dispatch_pending(now=now) == 0
+    assert dispatch_pending(now=now + timedelta(minutes=1)) == 1
+    assert json.loads(message.payload)['title'] == socket.emitted[0][1]['title']
+
+
+def test_purge_outbox_deletes_old_sent_and_failed_messages(app_context):
+    now = datetime.utcnow()
+    def message(status, age):
+        row = outbox_row('bid_update', 'auction_1', {})
+        row.update(status=status, next_attempt_at=now - age, created_at=now - age,
+                   sent_at=now - age if status == 'sent' else None)
+        return row
+    db.session.execute(db.insert(OutboxMessage), [
+        message('sent', timedelta(days=2)), message('sent', timedelta(hours=1)),
+        message('failed', timedelta(days=8)), message('failed', timedelta(days=1)),
+        message('pending', timedelta(days=30))
+    ])
+    db.session.commit()
+
+    assert purge_outbox(now=now, batch_size=1) == 2
+    assert sorted(status for status, in db.session.query(OutboxMessage.status)) == ['failed', 'pending', 'sent']
+    assert failed_count() == 1
+
+    registry = MetricsRegistry()
+    registry.set_gauge('outbox_failed_messages', 'Failed.', failed_count())
+    assert 'outbox_failed_messages 1' in registry.render().splitlines()
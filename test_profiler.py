@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import threading
+import jwt
+from sqlalchemy import create_engine, text
+from src.models.user import db, User
+from src.routes.auth import SECRET_KEY
+from src.services import profiler
+from src.services.role_migration import migrate_user_roles
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def make_user(role):
+    user = User(username=role, email=f'{role}@example.com', full_name=role, password_hash='x', role=role)
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': 'Bearer ' + jwt.encode({'user_id': user.id}, SECRET_KEY, algorithm='HS256')}
+
+# -----------------------------------------------------------------------------
+# اختبارات المحلل الإحصائي
+# -----------------------------------------------------------------------------
+def test_sampler_collects_stacks_and_thread_cpu():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name='busy-worker')
+    worker.start()
+    try:
+        result = profiler.profile(0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.samples > 5
+    busy = [line for line in result.collapsed().splitlines() if line.startswith('busy-worker;')]
+    assert busy and all('spin (test_profiler.py:' in line for line in busy)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in busy) > 5
+
+    thread = next(thread for thread in result.threads if thread['name'] == 'busy-worker')
+    assert thread['cpu_seconds'] is None or thread['cpu_seconds'] > 0
+
+
+def test_one_session_at_a_time():
+    assert profiler._running.acquire(blocking=False)
+    try:
+        try:
+            profiler.profile(0.01)
+            assert False, 'expected ProfilerBusy'
+        except profiler.ProfilerBusy:
+            pass
+    finally:
+        profiler._running.release()
+
+
+GEVENT_SCRIPT = '''
+from gevent import monkey; monkey.patch_all()
+import gevent
+from src.services import profiler
+done = False
+def busy_request():
+    while not done:
+        sum(range(20000))
+        gevent.sleep(0)
+worker = gevent.spawn(busy_request)
+result = profiler.profile(0.3, interval=0.005)
+done = True
+worker.join()
+print(result.collapsed())
+'''
+
+
+def test_gevent_mode_samples_the_running_greenlet():
+    # عملية منفصلة: الترقيع لا يُلغى بعد تطبيقه
+    root = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT], cwd=root, capture_output=True,
+                            text=True, timeout=30, check=True).stdout
+    busy = [line for line in output.splitlines() if 'busy_request (<string>:' in line]
+    assert busy and all(line.startswith('gevent-hub;Greenlet-') for line in busy)
+
+
+def test_profile_endpoint_requires_admin(client):
+    assert client.post('/api/admin/profile?seconds=0.01').status_code == 401
+    assert client.post('/api/admin/profile?seconds=0.01', headers=make_user('merchant')).status_code == 403
+
+    admin = make_user('admin')
+    response = client.post('/api/admin/profile?seconds=0.05', headers=admin)
+    assert response.status_code == 200
+    assert response.get_json()['samples'] >= 1
+
+    # الطلب نفسه في خيط العينة فلا يُحلل: خيط آخر يضمن مكدساً في الملف
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name='busy-worker')
+    worker.start()
+    try:
+        response = client.post('/api/admin/profile?seconds=0.05&format=collapsed', headers=admin)
+    finally:
+        stop.set()
+        worker.join()
+    assert response.mimetype == 'text/plain'
+    assert response.get_data(as_text=True).strip()
+    assert client.post('/api/admin/profile?seconds=0', headers=admin).status_code == 400
+
+
+def test_role_column_is_added_to_existing_users_table():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE users (id VARCHAR(36) PRIMARY KEY, username VARCHAR(50))'))
+        conn.execute(text("INSERT INTO users VALUES ('1', 'old')"))
+
+    assert migrate_user_roles(engine) is True
+    assert migrate_user_roles(engine) is False
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT role FROM users')).scalar() == 'merchant'
@@ -0,0 +1,134 @@
+from datetime import datetime
+from sqlalchemy import create_engine, text, update
+from src.models.user import db
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.proxy_bid import ProxyBid
+from src.models.outbox import OutboxMessage
+from src.models.money import Money
+from src.services.proxy_bidding import Proxy, ProxyBook
+from src.services.settlement import settle_auctions
+from src.services.bid_priority_migration import migrate_bid_priority
+
+
+def one_unit(amount):
+    return Money(100)
+
+
+def proxy(phone, max_amount):
+    return Proxy(phone, f'bidder {phone}', phone, Money.parse(max_amount))
+
+
+def bid(client, auction_id, phone, amount):
+    return client.post(f'/api/auctions/{auction_id}/bid', json={
+        'bidder_name': f'bidder {phone}', 'bidder_phone': phone, 'bid_amount': amount
+    })
+
+
+def proxy_bid(client, auction_id, phone, max_amount):
+    return client.post(f'/api/auctions/{auction_id}/proxy-bid', json={
+        'bidder_name': f'bidder {phone}', 'bidder_phone': phone, 'max_amount': max_amount
+    })
+
+# -----------------------------------------------------------------------------
+# اختبارات محرك المزايدة الآلية
+# -----------------------------------------------------------------------------
+def test_proxy_book_prices_at_runner_up_plus_increment():
+    book = ProxyBook(Money.parse(10))
+    book.add(proxy('a', 50))
+    visible, _ = book.resolve(one_unit)
+    assert [(p.bidder_phone, str(amount)) for p, amount, _ in visible] == [('a', '11.00')]
+
+    book.add(proxy('b', 80))
+    visible, retired = book.resolve(one_unit)
+    assert [(p.bidder_phone, str(amount)) for p, amount, _ in visible] == [('a', '50.00'), ('b', '51.00')]
+    assert [p.bidder_phone for p in retired] == ['a']
+    assert book.leader_phone == 'b' and len(book) == 1
+
+    # مزايدة يدوية أقل من الحد الأقصى يرد عليها المحرك فوراً
+    book.place('c', Money.parse(60))
+    visible, _ = book.resolve(one_unit)
+    assert [(p.bidder_phone, str(amount)) for p, amount, _ in visible] == [('b', '61.00')]
+
+
+def test_proxy_book_tie_goes_to_earlier_proxy():
+    book = ProxyBook(Money.parse(10))
+    book.add(proxy('a', 50))
+    book.resolve(one_unit)
+    book.add(proxy('b', 50))
+    visible, retired = book.resolve(one_unit)
+    assert [(p.bidder_phone, str(amount), tie) for p, amount, tie in visible] == [('a', '50.00', True)]
+    assert [p.bidder_phone for p in retired] == ['b']
+
+
+def test_proxy_bids_persist_only_visible_bids(client, make_auction):
+    auction = make_auction([], status='active')
+
+    response = proxy_bid(client, auction.id, '0501', 100)
+    assert response.status_code == 201
+    assert response.get_json()['current_highest_bid'] == 10.5
+    assert response.get_json()['is_leading'] is True
+
+    response = bid(client, auction.id, '0502', 40)
+    assert response.status_code == 201
+    assert response.get_json()['current_highest_bid'] == 41
+    assert response.get_json()['is_leading'] is False
+
+    # الحد الأقصى أقل من السعر الحالي مضافاً إليه أقل زيادة مرفوض
+    response = proxy_bid(client, auction.id, '0503', 41)
+    assert response.status_code == 400
+    assert response.get_json()['minimum_next_bid'] == 42
+
+    response = bid(client, auction.id, '0502', 150)
+    assert response.get_json()['is_leading'] is True
+    assert ProxyBid.query.one().status == 'outbid'
+
+    amounts = [b.bid_amount.to_json() for b in Bid.query.order_by(Bid.bid_amount).all()]
+    assert amounts == [10.5, 40, 41, 150]
+    assert OutboxMessage.query.filter_by(event='bid_update').count() == 3
+
+
+def test_end_auction_tie_goes_to_earlier_proxy_like_settlement(client, make_auction):
+    auction = make_auction([], status='active')
+
+    assert proxy_bid(client, auction.id, '0501', 50).status_code == 201
+    bid(client, auction.id, '0502', 50)
+
+    response = client.post(f'/api/auctions/{auction.id}/end')
+    assert response.status_code == 200
+    assert response.get_json()['winner_bid']['bidder_phone'] == '0501'
+
+    settle_auctions([auction.id])
+    winners = Bid.query.filter_by(auction_id=auction.id, is_winning_bid=True).all()
+    assert [b.bidder_phone for b in winners] == ['0501']
+    assert Auction.query.get(auction.id).winner_bid_id == winners[0].id
+
+    # bid_time وقت الحفظ الفعلي؛ الأسبقية (وقت تسجيل المزايدة الآلية) في عمود منفصل
+    assert winners[0].priority_time == ProxyBid.query.one().created_at
+    assert winners[0].bid_time > winners[0].priority_time
+
+
+def test_proxy_raised_by_another_worker_reloads_the_book(client, make_auction):
+    auction = make_auction([], status='active')
+    assert proxy_bid(client, auction.id, '0501', 50).status_code == 201
+
+    # عامل آخر يرفع الحد دون تغيير السعر، فلا يعلم به سجل هذا العامل
+    db.session.execute(update(ProxyBid).values(max_amount=Money.parse(100), updated_at=datetime.utcnow()))
+    db.session.commit()
+
+    response = bid(client, auction.id, '0502', 60)
+    assert response.status_code == 201
+    assert response.get_json()['current_highest_bid'] == 61
+    assert response.get_json()['is_leading'] is False
+
+
+def test_bid_priority_migration_adds_column_once():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE bids (id VARCHAR(36) PRIMARY KEY, bid_time DATETIME)'))
+        conn.execute(text("INSERT INTO bids VALUES ('1', '2026-01-01 00:00:00')"))
+
+    assert migrate_bid_priority(engine) is True
+    assert migrate_bid_priority(engine) is False
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT priority_time FROM bids')).scalar() is None
@@ -0,0 +1,73 @@
+import logging
+import pytest
+from src.models.user import db, User
+from src.services.query_inspector import fingerprint, init_query_inspector, record_queries
+
+
+def lookup_users(count):
+    for user_id in range(count):
+        db.session.execute(db.select(User).where(User.id == user_id)).all()
+
+# -----------------------------------------------------------------------------
+# اختبارات كشف استعلامات N+1 والاستعلامات البطيئة
+# -----------------------------------------------------------------------------
+def test_fingerprint_ignores_values_and_in_list_length():
+    assert fingerprint("SELECT * FROM users WHERE id = 5 AND name = 'it''s'") == \
+        fingerprint("SELECT * FROM users\n  WHERE id = 12 AND name = 'x'")
+    assert fingerprint('SELECT * FROM bids WHERE auction_id IN (?, ?, ?)') == \
+        fingerprint('SELECT * FROM bids WHERE auction_id IN (?, ?)')
+    assert fingerprint('SELECT anon_1.id FROM t LIMIT ?') == 'SELECT anon_1.id FROM t LIMIT ?'
+
+
+def test_request_n_plus_one_and_slow_queries_are_logged(app_context, client, caplog):
+    app_context.config.update(QUERY_INSPECTOR_SAMPLE_RATE=1.0, N_PLUS_ONE_THRESHOLD=3, SLOW_QUERY_SECONDS=0)
+    init_query_inspector(app_context)
+
+    @app_context.route('/loop')
+    def loop():
+        lookup_users(4)
+        return 'ok'
+
+    with caplog.at_level(logging.WARNING):
+        client.get('/loop')
+
+    n_plus_one = [record.getMessage() for record in caplog.records if record.getMessage().startswith('N+1')]
+    assert len(n_plus_one) == 1
+    assert n_plus_one[0].startswith('N+1 query in loop: 4x SELECT')
+    assert 'WHERE users.id = ?' in n_plus_one[0]
+    assert 'test_query_inspector.py' in n_plus_one[0] and 'in lookup_users' in n_plus_one[0]
+    assert sum(record.getMessage().startswith('Slow query in loop') for record in caplog.records) == 4
+
+
+def test_unsampled_requests_record_nothing(app_context, client, caplog):
+    app_context.config.update(QUERY_INSPECTOR_SAMPLE_RATE=0, N_PLUS_ONE_THRESHOLD=1)
+    init_query_inspector(app_context)
+    client.get('/api/bids')
+
+    assert not caplog.records
+    assert not app_context.before_request_funcs
+
+
+def test_record_queries_nests(app_context):
+    with record_queries() as outer:
+        lookup_users(1)
+        with record_queries() as inner:
+            lookup_users(2)
+    assert (len(outer), len(inner)) == (3, 2)
+
+
+@pytest.mark.query_budget(2)
+def test_budget_allows_queries_within_limit(app_context):
+    lookup_users(2)
+
+
+@pytest.mark.xfail(strict=True, reason='يتجاوز الميزانية')
+@pytest.mark.query_budget(2)
+def test_budget_fails_over_limit(app_context):
+    lookup_users(3)
+
+
+@pytest.mark.xfail(strict=True, reason='نفس الاستعلام في حلقة')
+@pytest.mark.query_budget(10, repeats=2)
+def test_budget_fails_on_repeated_queries(app_context):
+    lookup_users(3)
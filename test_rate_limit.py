@@ -0,0 +1,65 @@
+import socket
+import pytest
+from src.services.rate_limit import MemoryBucketStore, RespBucketStore, init_rate_limiting
+
+
+@pytest.fixture()
+def rate_limits(app_context):
+    """تفعيل تحديد المعدل بقواعد صغيرة، ثم تعطيله بعد الاختبار"""
+    app_context.config.update({
+        'RATE_LIMIT_ENABLED': True,
+        'RATE_LIMITS': {
+            'bid_ip': {'rate': 0.01, 'burst': 5},
+            'bid_bidder': {'rate': 0.01, 'burst': 2}
+        }
+    })
+    init_rate_limiting(app_context)
+    yield
+    app_context.config['RATE_LIMIT_ENABLED'] = False
+    init_rate_limiting(app_context)
+
+
+def bid(client, phone):
+    return client.post('/api/auctions/missing/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': phone, 'bid_amount': 20
+    })
+
+# -----------------------------------------------------------------------------
+# اختبارات تحديد معدل المزايدات
+# -----------------------------------------------------------------------------
+def test_bucket_allows_burst_then_refills():
+    now = [100.0]
+    store = MemoryBucketStore(clock=lambda: now[0])
+
+    assert [store.hit('k', 0.5, 3) for _ in range(3)] == [0, 0, 0]
+    assert store.hit('k', 0.5, 3) == pytest.approx(0.5)
+
+    now[0] += 0.5
+    assert store.hit('k', 0.5, 3) == 0
+    assert store.hit('k', 0.5, 3) > 0
+
+    now[0] += 10  # الدلو ممتلئ من جديد
+    assert [store.hit('k', 0.5, 3) for _ in range(3)] == [0, 0, 0]
+
+
+def test_throttled_bid_is_rejected_before_lookup(client, rate_limits):
+    # المزاد غير موجود: 404 تعني أن الطلب وصل للقاعدة، و 429 أنه رُفض قبلها
+    assert [bid(client, '0500').status_code for _ in range(3)] == [404, 404, 429]
+
+    response = bid(client, '0500')
+    assert response.headers['Retry-After'] == '100'
+    assert response.get_json()['retry_after'] > 0
+
+
+def test_ip_bucket_is_shared_between_bidders(client, rate_limits):
+    statuses = [bid(client, f'05{i:02}').status_code for i in range(6)]
+    assert statuses == [404] * 5 + [429]
+
+
+def test_shared_store_fails_open_when_unreachable():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    store = RespBucketStore(f'redis://127.0.0.1:{port}/0')
+    assert store.hit('k', 1, 1) == 0
+    assert store.hit('k', 1, 1) == 0
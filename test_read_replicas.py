@@ -0,0 +1,90 @@
+import pytest
+from flask import Flask, g
+from sqlalchemy import create_engine, text
+from src.models.user import db, User
+from src.models.product import Product
+from src.models.auction import Auction
+from src.routes.auction import auction_bp
+from src.services.read_replicas import init_read_replicas, read_replica, STICKY_COOKIE
+
+# -----------------------------------------------------------------------------
+# إعداد قاعدة أساسية ونسخة قراءة في ملفي SQLite منفصلين (بدون نسخ بينهما)
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def replicated_app(tmp_path):
+    replica_uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    app = Flask(__name__)
+    app.config.update({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+        "SQLALCHEMY_REPLICA_URIS": [replica_uri],
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False
+    })
+    db.init_app(app)
+    init_read_replicas(app)
+    app.register_blueprint(auction_bp, url_prefix='/api')
+    replica = create_engine(replica_uri)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(replica)
+        yield app, replica
+        db.session.remove()
+    replica.dispose()
+
+
+def seed_auction():
+    merchant = User(username='merchant', email='m@example.com', full_name='Merchant', password_hash='x')
+    db.session.add(merchant)
+    db.session.flush()
+    product = Product(user_id=merchant.id, name='Lamp', starting_price=10)
+    db.session.add(product)
+    db.session.flush()
+    auction = Auction(product_id=product.id, user_id=merchant.id, starting_price=10, status='active')
+    db.session.add(auction)
+    db.session.commit()
+    return auction.id
+
+# -----------------------------------------------------------------------------
+# اختبارات توجيه القراءات
+# -----------------------------------------------------------------------------
+def test_reads_go_to_replica_until_client_writes(replicated_app):
+    app, _ = replicated_app
+    client = app.test_client()
+    auction_id = seed_auction()  # على الأساسية فقط، كأن النسخة متأخرة
+    db.session.remove()
+
+    assert client.get('/api/auctions').get_json() == []
+
+    response = client.post(f'/api/auctions/{auction_id}/bid', json={
+        'bidder_name': 'Ali', 'bidder_phone': '0500', 'bid_amount': 20
+    })
+    assert response.status_code == 201
+    assert [a['id'] for a in client.get('/api/auctions').get_json()] == [auction_id]
+
+
+def test_expired_stickiness_reads_replica(replicated_app):
+    app, _ = replicated_app
+    client = app.test_client()
+    seed_auction()
+    db.session.remove()
+
+    client.set_cookie(STICKY_COOKIE, '0')
+    assert client.get('/api/auctions').get_json() == []
+
+
+def test_writes_inside_read_handler_go_to_primary(replicated_app):
+    app, replica = replicated_app
+
+    @read_replica
+    def handler():
+        assert g.read_engine is not None
+        db.session.add(User(username='u', email='u@example.com', full_name='U', password_hash='x'))
+        db.session.commit()
+        return db.session.execute(db.select(User)).scalars().all()
+
+    with app.test_request_context('/'):
+        assert handler() == []  # القراءة بعد الكتابة من النسخة
+
+    assert User.query.count() == 1
+    with replica.connect() as connection:
+        assert connection.execute(text('SELECT count(*) FROM users')).scalar() == 0
@@ -0,0 +1,50 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from src.models.user import db, User
+from src.models.notification import Notification
+from src.services.retention import purge_notifications
+
+
+def create_notifications(specs):
+    user = User(username='merchant', email='m@example.com', full_name='Merchant', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    for notification_type, age_days, is_read in specs:
+        db.session.add(Notification(user_id=user.id, type=notification_type, title=notification_type,
+                                    message='-', is_read=is_read,
+                                    created_at=now - timedelta(days=age_days)))
+    db.session.commit()
+
+# -----------------------------------------------------------------------------
+# اختبارات مهمة الاحتفاظ بالإشعارات
+# -----------------------------------------------------------------------------
+def test_purge_applies_per_type_ttl_to_read_notifications_only(app_context, tmp_path):
+    create_notifications([
+        ('new_bid', 10, True),         # أقدم من 7 أيام -> يحذف
+        ('new_bid', 3, True),          # حديث -> يبقى
+        ('order_confirmed', 10, True), # المدة الافتراضية 30 يوماً -> يبقى
+        ('order_confirmed', 40, True), # -> يحذف
+        ('new_bid', 40, False),        # غير مقروء -> يبقى
+    ])
+
+    purged = purge_notifications(ttl_days={'default': 30, 'new_bid': 7}, batch_size=1,
+                                 archive_dir=str(tmp_path))
+
+    assert purged == 2
+    remaining = sorted((n.type, n.is_read) for n in Notification.query.all())
+    assert remaining == [('new_bid', False), ('new_bid', True), ('order_confirmed', True)]
+
+    [archive] = os.listdir(tmp_path)
+    with gzip.open(tmp_path / archive, 'rt', encoding='utf-8') as f:
+        archived = [json.loads(line) for line in f]
+    assert sorted(row['type'] for row in archived) == ['new_bid', 'order_confirmed']
+
+
+def test_purge_without_archive_dir_only_deletes(app_context, tmp_path):
+    create_notifications([('new_bid', 60, True)])
+
+    assert purge_notifications() == 1
+    assert Notification.query.count() == 0
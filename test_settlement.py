@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from src.models.user import db
+from src.models.product import Product
+from src.models.auction import Auction
+from src.models.bid import Bid
+from src.models.order import Order
+from src.models.notification import Notification
+from src.services import settlement
+from src.services.settlement import settle_auctions, settle_queued, close_expired_auctions
+
+# -----------------------------------------------------------------------------
+# اختبارات خط التسوية
+# -----------------------------------------------------------------------------
+def test_settle_auctions_creates_orders_notifications_and_marks_products(make_auction):
+    won = make_auction([15, 30, 20])
+    unsold = make_auction([])
+
+    orders = settle_auctions([won.id, unsold.id])
+
+    assert len(orders) == 1
+    order = Order.query.one()
+    assert order.auction_id == won.id
+    assert order.final_price.to_json() == 30
+    assert order.customer_name == 'bidder1'
+
+    winning_bid = db.session.get(Bid, order.bid_id)
+    assert winning_bid.is_winning_bid
+    assert db.session.get(Auction, won.id).winner_bid_id == winning_bid.id
+    assert db.session.get(Product, won.product_id).status == 'sold'
+    assert db.session.get(Product, unsold.product_id).status == 'draft'
+
+    notification = Notification.query.one()
+    assert notification.user_id == won.user_id
+    assert notification.related_order_id == order.id
+
+
+def test_settle_auctions_is_idempotent(make_auction):
+    auction = make_auction([12])
+
+    settle_auctions([auction.id])
+    assert settle_auctions([auction.id, auction.id]) == []
+    assert Order.query.count() == 1
+
+
+def test_close_expired_auctions_only_ends_past_deadlines(make_auction):
+    expired = make_auction([11], end_time=datetime.utcnow() - timedelta(seconds=1))
+    running = make_auction([11], end_time=datetime.utcnow() + timedelta(hours=1))
+
+    assert close_expired_auctions() == [expired.id]
+    assert db.session.get(Auction, expired.id).status == 'ended'
+    assert db.session.get(Auction, running.id).status == 'active'
+
+
+def test_failed_batch_settles_the_rest_and_retries_the_broken_auction(make_auction, monkeypatch):
+    good, broken = make_auction([12]), make_auction([15])
+    monkeypatch.setattr(settlement, '_retry_heap', [])
+    monkeypatch.setattr(settlement, '_attempts', settlement.Counter())
+
+    def flaky(auction_ids):
+        if broken.id in auction_ids:
+            raise RuntimeError('constraint violation')
+        return settle_auctions(auction_ids)
+    monkeypatch.setattr(settlement, 'settle_auctions', flaky)
+
+    settle_queued([good.id, broken.id])
+    assert [order.auction_id for order in Order.query.all()] == [good.id]
+    assert [auction_id for _, auction_id in settlement._retry_heap] == [broken.id]
+    assert settlement._attempts[broken.id] == 1
+
+    # المحاولة التالية بعد زوال العطل
+    monkeypatch.setattr(settlement, 'settle_auctions', settle_auctions)
+    settlement._retry_heap[0] = (0, broken.id)
+    settle_queued(settlement._due_retries())
+    assert Order.query.count() == 2
+    assert not settlement._retry_heap and broken.id not in settlement._attempts
@@ -0,0 +1,63 @@
+import threading
+import time
+from src.services import workers
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def isolate(monkeypatch):
+    # حالة العملية في الوحدة عامة؛ كل اختبار يبدأ كعملية gunicorn رئيسية جديدة
+    for name, value in (('_deferred', False), ('_forked', False), ('_pending', []),
+                        ('_leader_jobs', []), ('_engines', []), ('_election', None)):
+        monkeypatch.setattr(workers, name, value)
+
+# -----------------------------------------------------------------------------
+# اختبارات العمال وانتخاب مالك المهام المجدولة
+# -----------------------------------------------------------------------------
+def test_file_lease_is_exclusive(tmp_path):
+    path = str(tmp_path / 'scheduler.lock')
+    first, second = workers.FileLease(path), workers.FileLease(path)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_without_prefork_jobs_start_immediately(monkeypatch):
+    isolate(monkeypatch)
+    ran = threading.Event()
+    workers.start_background(ran.set, 'job', leader_only=True)
+    assert ran.wait(1)
+    assert workers.is_leader()
+
+
+def test_jobs_wait_for_fork_and_leader_jobs_for_election(monkeypatch, tmp_path):
+    isolate(monkeypatch)
+    path = str(tmp_path / 'scheduler.lock')
+    rival = workers.FileLease(path)
+    assert rival.acquire()  # عامل آخر يملك المهام المجدولة
+
+    local, scheduled = threading.Event(), threading.Event()
+    workers.defer_until_fork()
+    workers.start_background(local.set, 'per-worker')
+    workers.start_background(scheduled.set, 'scheduled', leader_only=True)
+    assert workers._pending and not local.is_set()
+
+    workers.after_fork(path, interval=0.02)
+    assert local.wait(1)
+    assert not scheduled.wait(0.1)
+    assert not workers.is_leader()
+
+    rival.release()  # خروج القائد
+    assert scheduled.wait(2)
+    assert wait_for(workers.is_leader)
+
+    late = threading.Event()
+    workers.start_background(late.set, 'late', leader_only=True)
+    assert late.wait(1)